@@ -0,0 +1,110 @@
+"""CLI import time benchmark
+
+Times commands that do not render (``hysim --version`` and
+``hysim --help``) and the import of the CLI module in fresh interpreters,
+and checks that the CLI module does not import the heavy dependencies of
+the simulator. Exits with status 1 if a command is slower than the limit or
+a heavy dependency is imported, so it can run as a check in CI.
+
+Usage:
+
+    python benchmarks/import_time.py --repeat 5 --limit 0.5
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+# Modules that only the commands running cases may import
+HEAVY_MODULES = [
+    "mitsuba",
+    "drjit",
+    "spiceypy",
+    "imageio",
+    "numpy",
+    "yaml",
+    "pkg_resources",
+    "hysim.sim",
+]
+
+# Commands timed in a fresh interpreter
+COMMANDS = {
+    "import": ["-c", "import hysim.cli"],
+    "version": ["-m", "hysim.cli", "--version"],
+    "help": ["-m", "hysim.cli", "--help"],
+}
+
+
+def time_command(arguments: list, repeat: int) -> float:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *arguments],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def imported_heavy_modules() -> list:
+    check = (
+        "import sys, json, hysim.cli; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} "
+        "if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", check],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--limit",
+        type=float,
+        default=0.5,
+        help="Maximum time of each command in seconds",
+    )
+    parser.add_argument(
+        "--output", default=None, help="Path of json file of the results"
+    )
+    args = parser.parse_args()
+
+    baseline = time_command(["-c", "pass"], args.repeat)
+    print(f"{'interpreter':<12} {baseline:8.3f}s")
+
+    results = {"interpreter": baseline, "commands": {}}
+    slow = []
+    for name, arguments in COMMANDS.items():
+        duration = time_command(arguments, args.repeat)
+        results["commands"][name] = duration
+        print(f"{name:<12} {duration:8.3f}s")
+        if duration > args.limit:
+            slow.append(name)
+
+    heavy = imported_heavy_modules()
+    results["heavy_modules"] = heavy
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+
+    if heavy:
+        print(f"hysim.cli imports heavy modules: {', '.join(heavy)}")
+    if slow:
+        print(f"Slower than {args.limit}s: {', '.join(slow)}")
+    return 1 if heavy or slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Orbit geometry benchmark
+
+Compares the scalar path (MissionInputProcessor.set_epoch and the position
+properties called once per epoch) with the batched path
+(MissionInputProcessor.compute_geometry) for a window of epochs.
+
+Usage:
+
+    python benchmarks/orbit_geometry.py --epochs 10000 --frame tle
+"""
+import time
+import argparse
+
+import numpy as np
+
+from hysim.data import data_handling as dh
+from hysim.scene import frame_transforms as frames
+
+DATETIME = "12/22/2022 14:15:53 utc"
+
+# ISS orbit at DATETIME with a chaser trailing by a small mean anomaly
+ORBITS = {
+    "tle": (
+        [
+            "1 25544U 98067A   22356.59436905 -.00008932  00000-0 -15123-3 0  9998",
+            "2 25544  51.6422 123.2511 0005530 175.6943 277.6446 15.49508690374406",
+        ],
+        [
+            "1 25544U 98067A   22356.59436905 -.00008932  00000-0 -15123-3 0  9998",
+            "2 25544  51.6422 123.2511 0005530 175.6943 277.6346 15.49508690374406",
+        ],
+    ),
+    "kep": (
+        [6796, 0.0005530, 0.9013, 2.1511, 3.0664, 4.8458],
+        [6796, 0.0005530, 0.9013, 2.1511, 3.0664, 4.8456],
+    ),
+    "state": (
+        [-3310.30328, -2630.25234, 5320.39652, 4.41965326, -6.2455675, -0.343124216],
+        [-3310.8, -2629.6, 5320.4, 4.41965326, -6.2455675, -0.343124216],
+    ),
+}
+
+
+def create_mission_config(position_frame: str) -> dict:
+    target_orbit, chaser_orbit = ORBITS[position_frame]
+    return {
+        "datetime": DATETIME,
+        "target": {
+            "position_frame": position_frame,
+            "position": list(target_orbit),
+            "attitude": [0, 0, 0],
+        },
+        "chaser": {
+            "position_frame": position_frame,
+            "position": list(chaser_orbit),
+            "attitude": "lookat",
+        },
+    }
+
+
+def scalar_geometry(processor, epochs):
+    chaser_positions = np.zeros((len(epochs), 3))
+    sun_directions = np.zeros((len(epochs), 3))
+    for index, epoch in enumerate(epochs):
+        processor.set_epoch(epoch)
+        chaser_positions[index] = processor.chaser_position
+        sun_directions[index] = processor.sun_direction_vector
+    return chaser_positions, sun_directions
+
+
+def time_call(function, *args, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--epochs", type=int, default=10000)
+    parser.add_argument("--step", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--frame", choices=sorted(ORBITS), default="kep"
+    )
+    args = parser.parse_args()
+
+    processor = frames.MissionInputProcessor(
+        create_mission_config(args.frame), dh.get_kernel_paths()
+    )
+    epochs = processor.reference_epoch + args.step * np.arange(args.epochs)
+
+    scalar_time, (chaser_positions, sun_directions) = time_call(
+        scalar_geometry, processor, epochs, repeat=args.repeat
+    )
+    batched_time, geometry = time_call(
+        processor.compute_geometry, epochs, repeat=args.repeat
+    )
+
+    np.testing.assert_allclose(
+        geometry.chaser_positions, chaser_positions, rtol=1e-9, atol=1e-6
+    )
+    np.testing.assert_allclose(
+        geometry.sun_directions, sun_directions, rtol=1e-9, atol=1e-12
+    )
+
+    print(f"{args.epochs} epochs ({args.frame})")
+    print(f"  scalar:  {scalar_time:8.4f} s")
+    print(f"  batched: {batched_time:8.4f} s")
+    print(f"  speedup: {scalar_time / batched_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""Pipeline benchmark
+
+Times every stage of a simulator run on synthetic cases: a cube target
+with a user material, synthetic spectrum files and films of a given size
+and number of bands. Stages are timed separately (reading configs, orbit
+geometry, each SceneBuilder.build_* step, loading the scene into Mitsuba,
+rendering and each output format) and written to a json file. The compare
+mode flags stages that became slower between two result files.
+
+Usage:
+
+    python benchmarks/pipeline.py run --output results.json
+    python benchmarks/pipeline.py run --films small --bands 10 100 500
+    python benchmarks/pipeline.py compare baseline.json results.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import tempfile
+import contextlib
+
+import numpy as np
+import mitsuba as mi
+import yaml
+
+from hysim import input_data
+from hysim import output_data
+from hysim import render_cache
+from hysim.data import data_handling as dh
+from hysim.scene import frame_transforms as frames
+from hysim.scene import simulator_scene as sc
+
+FILMS = {
+    "small": (64, 48),
+    "large": (512, 384),
+}
+
+FORMATS = ("exr", "envi", "npy", "npz", "png", "csv")
+
+# SceneBuilder steps in the order of sim.build_scene
+BUILD_STEPS = (
+    "build_integrator",
+    "build_sampler",
+    "build_sun",
+    "build_chaser",
+    "build_target",
+    "build_debris",
+    "build_earth",
+    "clip_spectra",
+    "build_scene_dict",
+)
+
+# ISS state vectors [km, km/s] with the chaser about 20 m from the target
+TARGET_STATE = [
+    -3310.30328, -2630.25234, 5320.39652, 4.41965326, -6.2455675, -0.343124216
+]
+CHASER_STATE = [
+    -3310.30328, -2630.25234, 5320.376, 4.41965326, -6.2455675, -0.343124216
+]
+
+CUBE_VERTICES = np.array(
+    [
+        [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+        [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1],
+    ]
+)
+CUBE_FACES = np.array(
+    [
+        [0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7], [0, 1, 5], [0, 5, 4],
+        [2, 3, 7], [2, 7, 6], [1, 2, 6], [1, 6, 5], [0, 4, 7], [0, 7, 3],
+    ]
+)
+
+
+def write_yaml(path: str, config: dict):
+    with open(path, "w") as file:
+        file.write("---\n")
+        yaml.safe_dump(config, file)
+
+
+def write_cube_ply(path: str, half_width: float):
+    """Writes a cube as an ASCII PLY file, as exported by most modellers"""
+    header = [
+        "ply",
+        "format ascii 1.0",
+        f"element vertex {len(CUBE_VERTICES)}",
+        "property float x",
+        "property float y",
+        "property float z",
+        f"element face {len(CUBE_FACES)}",
+        "property list uchar int vertex_indices",
+        "end_header",
+    ]
+    vertices = [
+        " ".join(f"{value:g}" for value in vertex)
+        for vertex in CUBE_VERTICES * half_width
+    ]
+    faces = ["3 " + " ".join(map(str, face)) for face in CUBE_FACES]
+    with open(path, "w") as file:
+        file.write("\n".join(header + vertices + faces) + "\n")
+
+
+def write_spd(path: str, wavelengths: np.ndarray, values: np.ndarray):
+    np.savetxt(path, np.column_stack([wavelengths, values]), delimiter="\t")
+
+
+def create_case(
+    case_directory: str,
+    width: int,
+    height: int,
+    bands: int,
+    spp: int,
+    target_size: float,
+):
+    """Writes a synthetic hyperspectral case to a directory"""
+    for directory in ("sensor", "target"):
+        os.makedirs(os.path.join(case_directory, directory), exist_ok=True)
+
+    write_yaml(
+        os.path.join(case_directory, "case_settings.yml"),
+        {
+            "file_type": "case_config",
+            "mitsuba_variant": "scalar_spectral",
+            "sampler": {"type": "independent", "sample_count": spp},
+            "integrator": {"type": "path", "max_depth": 4},
+            "earth": {"model": "sphere"},
+            "render_cache": False,
+            "output": [],
+        },
+    )
+    write_yaml(
+        os.path.join(case_directory, "mission.yml"),
+        {
+            "file_type": "mission_config",
+            "datetime": "12/22/2022 14:15:53 utc",
+            "target": {
+                "position_frame": "state",
+                "position": TARGET_STATE,
+                "attitude": [0.3, 0.2, 0.1],
+            },
+            "chaser": {
+                "position_frame": "state",
+                "position": CHASER_STATE,
+                "attitude": "lookat",
+            },
+        },
+    )
+
+    # Smooth sensitivity over the film bands
+    wavelengths = np.linspace(400, 900, bands + 1)
+    write_spd(
+        os.path.join(case_directory, "sensor", "film.spd"),
+        wavelengths,
+        0.5 + 0.4 * np.sin((wavelengths - 400) / 500 * np.pi),
+    )
+    write_yaml(
+        os.path.join(case_directory, "sensor", "sensor.yml"),
+        {
+            "file_type": "sensor_config",
+            "camera": {"field_of_view": 20},
+            "film": {"width": width, "height": height},
+            "imaging_mode": "hyperspectral",
+            "spectrum_file": "film.spd",
+        },
+    )
+
+    # Reflectance with an absorption feature, sampled every 1 nm
+    wavelengths = np.arange(350, 1001, 1.0)
+    write_spd(
+        os.path.join(case_directory, "target", "paint.spd"),
+        wavelengths,
+        0.6 - 0.3 * np.exp(-(((wavelengths - 650) / 40) ** 2)),
+    )
+    write_cube_ply(
+        os.path.join(case_directory, "target", "cube.ply"), target_size
+    )
+
+    write_yaml(
+        os.path.join(case_directory, "target", "parts.yml"),
+        {
+            "file_type": "parts_config",
+            "components": {
+                "body": {"file": "cube.ply", "user_material": "paint"}
+            },
+        },
+    )
+    write_yaml(
+        os.path.join(case_directory, "target", "materials.yml"),
+        {
+            "file_type": "material_config",
+            "materials": {
+                "paint": {
+                    "type": "diffuse",
+                    "reflectance": {
+                        "type": "spectrum",
+                        "filename": "paint.spd",
+                    },
+                }
+            },
+        },
+    )
+
+
+@contextlib.contextmanager
+def working_directory(directory: str):
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def time_stage(timings: dict, stage: str, function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    timings[stage] = time.perf_counter() - start
+    return result
+
+
+def run_pipeline(formats: list) -> dict:
+    """Runs every stage of the case in the working directory
+
+    Returns the time of each stage in seconds.
+    """
+    timings = {}
+
+    user_inputs = input_data.Configs()
+    time_stage(timings, "load_configs", user_inputs.load_configs, ".")
+
+    def orbit_geometry():
+        orbit_data = frames.MissionInputProcessor(
+            user_inputs.mission_config, dh.get_kernel_paths()
+        )
+        # Positions are computed when first used
+        orbit_data.target_position
+        orbit_data.chaser_position
+        orbit_data.earth_position
+        orbit_data.sun_direction_vector
+        return orbit_data
+
+    orbit_data = time_stage(timings, "mission_input_processor", orbit_geometry)
+
+    with orbit_data:
+        mi.set_variant(user_inputs.case_config["mitsuba_variant"])
+        scene = sc.SceneBuilder(user_inputs, orbit_data)
+        for step in BUILD_STEPS:
+            time_stage(timings, step, getattr(scene, step))
+
+    mitsuba_scene = time_stage(
+        timings, "load_dict", mi.load_dict, scene.scene_dict
+    )
+    render = time_stage(timings, "render", mi.render, mitsuba_scene)
+    render = time_stage(timings, "render_to_numpy", np.array, render)
+    # A black render means the target is not in view of the chaser
+    if not np.any(render):
+        raise RuntimeError("Rendered image is black, target is not in view")
+
+    formatter = output_data.OutputFormatter(
+        render, scene.chaser.sensor.film, {"benchmark": True}
+    )
+    for output_format in formats:
+        output_params = {
+            "format": output_format,
+            "file_name": os.path.join("output", f"results.{output_format}"),
+        }
+        os.makedirs("output", exist_ok=True)
+        time_stage(
+            timings,
+            f"export_{output_format}",
+            formatter.formats[output_format],
+            output_params,
+            user_inputs,
+        )
+
+    return timings
+
+
+def summarise(runs: list) -> dict:
+    stages = {}
+    for stage in runs[0]:
+        times = [timings[stage] for timings in runs]
+        stages[stage] = {
+            "best": min(times),
+            "mean": float(np.mean(times)),
+            "runs": times,
+        }
+    return stages
+
+
+def run_benchmarks(args) -> dict:
+    results = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "hysim": render_cache.get_package_version("hysim"),
+        "mitsuba": render_cache.get_package_version("mitsuba"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "spp": args.spp,
+            "repeat": args.repeat,
+            "formats": args.formats,
+        },
+        "cases": {},
+    }
+
+    for film in args.films:
+        width, height = FILMS[film]
+        for bands in args.bands:
+            case_name = f"{film}_{bands}"
+            with tempfile.TemporaryDirectory() as case_directory:
+                create_case(
+                    case_directory,
+                    width,
+                    height,
+                    bands,
+                    args.spp,
+                    args.target_size,
+                )
+                with working_directory(case_directory):
+                    runs = [
+                        run_pipeline(args.formats)
+                        for _ in range(args.repeat)
+                    ]
+
+            stages = summarise(runs)
+            results["cases"][case_name] = {
+                "width": width,
+                "height": height,
+                "bands": bands,
+                "stages": stages,
+            }
+            total = sum(stage["best"] for stage in stages.values())
+            print(f"{case_name:>12}: {total:8.3f} s")
+            for stage, summary in stages.items():
+                print(f"{stage:>28}: {summary['best']:8.4f} s")
+
+    return results
+
+
+def compare_results(
+    baseline: dict, results: dict, threshold: float, min_time: float
+) -> list:
+    """Returns stages slower than the baseline by more than the threshold
+
+    Stages faster than min_time seconds in both files are not compared,
+    since their times are dominated by noise.
+    """
+    regressions = []
+    for case_name, case in results["cases"].items():
+        if case_name not in baseline["cases"]:
+            continue
+        baseline_stages = baseline["cases"][case_name]["stages"]
+        for stage, summary in case["stages"].items():
+            if stage not in baseline_stages:
+                continue
+            before = baseline_stages[stage]["best"]
+            after = summary["best"]
+            ratio = after / before if before > 0 else np.inf
+            regressed = (
+                max(before, after) >= min_time and ratio > 1 + threshold
+            )
+            print(
+                f"{case_name:>12} {stage:>24}: {before:8.4f} s -> "
+                f"{after:8.4f} s ({ratio:5.2f}x)"
+                + ("  REGRESSION" if regressed else "")
+            )
+            if regressed:
+                regressions.append((case_name, stage, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument(
+        "--films", nargs="+", choices=sorted(FILMS), default=sorted(FILMS)
+    )
+    run_parser.add_argument(
+        "--bands", nargs="+", type=int, default=[10, 100, 500]
+    )
+    run_parser.add_argument("--spp", type=int, default=4)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--formats", nargs="+", choices=FORMATS, default=list(FORMATS[:-1])
+    )
+    run_parser.add_argument(
+        "--target-size",
+        type=float,
+        default=2.0,
+        help="half width of the cube target [m]",
+    )
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = commands.add_parser(
+        "compare", help="flag regressions between two result files"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown flagged as a regression",
+    )
+    compare_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.01,
+        help="stages faster than this [s] are not flagged",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.results) as file:
+        results = json.load(file)
+
+    regressions = compare_results(
+        baseline, results, args.threshold, args.min_time
+    )
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""Batch Module
+
+Runs many simulator cases in parallel. Cases are distributed over a pool of
+worker processes which import the simulator and load the SPICE kernels once
+when they start, rather than once per case.
+"""
+import os
+import glob
+import json
+import time
+import logging
+import traceback
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from concurrent.futures.process import BrokenProcessPool
+
+# Summary written by the batch command
+SUMMARY_FILE = "batch_summary.json"
+
+
+def expand_case_directories(case_patterns: list) -> list:
+    """Expands case directories and glob patterns into case directories
+
+    Parameters
+    ----------
+    case_patterns : list
+        Case directory paths or glob patterns matching case directories
+
+    Returns
+    -------
+    list
+        Sorted absolute paths of unique case directories
+
+    Raises
+    ------
+    FileNotFoundError
+        If a pattern does not match any directory
+    """
+    case_directories = set()
+
+    for pattern in case_patterns:
+        matches = [
+            path for path in glob.glob(pattern) if os.path.isdir(path)
+        ]
+        if not matches:
+            raise FileNotFoundError(f"No case directory matches {pattern}")
+        case_directories.update(os.path.abspath(path) for path in matches)
+
+    return sorted(case_directories)
+
+
+def initialise_worker(logging_level: int):
+    """Prepares a worker process to run cases
+
+    Imports the simulator (and with it Mitsuba) and loads the SPICE kernels
+    so every case run by the worker can reuse them.
+
+    Parameters
+    ----------
+    logging_level : int
+        Logging level of the worker
+    """
+    logging.basicConfig(
+        format=" %(levelname)-8s [%(processName)s] %(message)s",
+        level=logging_level,
+    )
+
+    from hysim.data import data_handling as dh
+    from hysim.data.kernel_manager import spice_kernels
+    from hysim import sim  # Imports Mitsuba once per worker
+
+    # Held for the life of the worker so cases never reload them
+    spice_kernels.furnish(dh.get_kernel_paths())
+
+
+def run_in_process(
+    function, args: tuple, initializer=None, initargs: tuple = ()
+):
+    """Runs a function in a worker process of its own
+
+    Parameters
+    ----------
+    function : callable
+        Module level function run by the worker
+    args : tuple
+        Arguments of the function
+    initializer : callable, optional
+        Function run when the worker starts, by default None
+    initargs : tuple, optional
+        Arguments of the initializer, by default ()
+
+    Returns
+    -------
+    object
+        Return value of the function
+
+    Raises
+    ------
+    BrokenProcessPool
+        If the worker process dies
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, initializer=initializer, initargs=initargs
+    ) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_in_workers(
+    function,
+    tasks: dict,
+    workers: int = None,
+    initializer=None,
+    initargs: tuple = (),
+):
+    """Runs a function for each task in a pool of worker processes
+
+    A worker process that dies (e.g. a crash inside Mitsuba) breaks the
+    pool and every task that had not finished fails with
+    BrokenProcessPool, whichever task caused the crash. These tasks are run
+    again, each in a worker process of its own, so only the tasks that
+    crash their worker fail.
+
+    Parameters
+    ----------
+    function : callable
+        Module level function run by the workers
+    tasks : dict
+        Arguments (tuple) of the function keyed by task
+    workers : int, optional
+        Number of worker processes, by default None (one per CPU)
+    initializer : callable, optional
+        Function run when a worker starts, by default None
+    initargs : tuple, optional
+        Arguments of the initializer, by default ()
+
+    Yields
+    ------
+    tuple
+        Task key and return value of the function, or the exception raised
+        if the task failed, in order of completion
+    """
+    unfinished = []
+    futures = {}
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        for key, args in tasks.items():
+            try:
+                futures[executor.submit(function, *args)] = key
+            except BrokenProcessPool:
+                # The pool broke before all tasks were submitted
+                unfinished.append(key)
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                unfinished.append(futures[future])
+                continue
+            except Exception as error:
+                result = error
+            yield futures[future], result
+
+    if not unfinished:
+        return
+
+    logging.warning(
+        "A worker process died, running %d unfinished tasks in separate "
+        "processes",
+        len(unfinished),
+    )
+    with ThreadPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1
+    ) as threads:
+        futures = {
+            threads.submit(
+                run_in_process, function, tasks[key], initializer, initargs
+            ): key
+            for key in unfinished
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                # The task crashed its own worker process
+                result = error
+            yield futures[future], result
+
+
+def run_case(case_directory: str) -> dict:
+    """Runs a single case and records its status
+
+    Exceptions raised by the case are recorded in the result so a failing
+    case does not stop the rest of the batch. The time and memory use of
+    each stage of the case are added to the result (see hysim.telemetry).
+
+    Parameters
+    ----------
+    case_directory : str
+        Path to the case directory
+
+    Returns
+    -------
+    dict
+        Case status, timing, stage metrics and error message if the case
+        failed
+    """
+    from hysim import sim
+    from hysim import telemetry
+
+    result = {
+        "case": case_directory,
+        "status": "success",
+        "start_time": time.time(),
+        "duration": None,
+        "error": None,
+    }
+    start = time.perf_counter()
+    working_directory = os.getcwd()
+
+    try:
+        os.chdir(case_directory)
+        sim.run_sim(case_directory.replace("\\", "/"))
+    except Exception as error:
+        # Failing cases are recorded rather than raised
+        result["status"] = "failed"
+        result["error"] = f"{type(error).__name__}: {error}"
+        logging.error(
+            "Case %s failed\n%s", case_directory, traceback.format_exc()
+        )
+    finally:
+        os.chdir(working_directory)
+
+    result["duration"] = time.perf_counter() - start
+    result["metrics"] = telemetry.recorder.metrics({"case": case_directory})
+    return result
+
+
+def run_batch(
+    case_directories: list,
+    workers: int = None,
+    logging_level: int = logging.INFO,
+) -> list:
+    """Runs cases in a pool of worker processes
+
+    Parameters
+    ----------
+    case_directories : list
+        Paths to case directories
+    workers : int, optional
+        Number of worker processes, by default None (one per CPU)
+    logging_level : int, optional
+        Logging level of the workers, by default logging.INFO
+
+    Returns
+    -------
+    list
+        Result of each case in the order of case_directories
+    """
+    results = {}
+
+    for case_directory, result in run_in_workers(
+        run_case,
+        {path: (path,) for path in case_directories},
+        workers,
+        initialise_worker,
+        (logging_level,),
+    ):
+        if isinstance(result, Exception):
+            # Raised outside run_case, e.g. the case crashed its worker
+            result = {
+                "case": case_directory,
+                "status": "failed",
+                "start_time": None,
+                "duration": None,
+                "error": f"{type(result).__name__}: {result}",
+            }
+
+        logging.info(
+            "%s: %s (%d/%d complete)",
+            case_directory,
+            result["status"],
+            len(results) + 1,
+            len(case_directories),
+        )
+        results[case_directory] = result
+
+    return [results[case_directory] for case_directory in case_directories]
+
+
+def summarise_batch(results: list) -> dict:
+    """Summarises the results of a batch
+
+    Stage metrics of the cases are aggregated, times are summed and memory
+    peaks are the largest of all cases.
+
+    Parameters
+    ----------
+    results : list
+        Result of each case from run_batch
+
+    Returns
+    -------
+    dict
+        Case counts, total case time, aggregated stage metrics and results
+        of each case
+    """
+    from hysim import telemetry
+
+    failed = [result for result in results if result["status"] != "success"]
+    return {
+        "total": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "total_case_time": sum(
+            result["duration"] or 0.0 for result in results
+        ),
+        "metrics": telemetry.aggregate_metrics(
+            [result["metrics"] for result in results if result.get("metrics")]
+        ),
+        "cases": results,
+    }
+
+
+def write_summary(summary: dict, summary_file: str = SUMMARY_FILE):
+    """Writes batch summary to a json file
+
+    Parameters
+    ----------
+    summary : dict
+        Batch summary from summarise_batch
+    summary_file : str, optional
+        Path to summary file, by default SUMMARY_FILE
+    """
+    with open(summary_file, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=4)
@@ -1,18 +1,39 @@
 """CLI Entry point module
 
 Provides an entry point for package and runs main function
+
+The simulator (and with it Mitsuba, SPICE and the output libraries) is
+imported by the commands that run cases, so ``hysim --version`` and
+``hysim --help`` start without loading them.
 """
 
-import pkg_resources
+import os
+import json
 import logging
 import sys
 import argparse
+from importlib import metadata
 from pathlib import Path
-from hysim import sim
+from hysim import batch
 
 
 def get_package_version(package: str) -> str:
-    version = pkg_resources.get_distribution(package).version
+    """Returns the name and installed version of a package
+
+    Parameters
+    ----------
+    package : str
+        Distribution name of the package
+
+    Returns
+    -------
+    str
+        Package name and version (version "unknown" if not installed)
+    """
+    try:
+        version = metadata.version(package)
+    except metadata.PackageNotFoundError:
+        version = "unknown"
     return f"{package} {version}"
 
 
@@ -20,21 +41,177 @@ def return_unix_path_string(path):
     return str(path).replace("\\", "/")
 
 
-def run_case():
-    # TODO: Add support for relative case directory commands
-
-    # if run_directory is None:
-    #    run_directory = Path.cwd()
-    # else:
-    #    run_directory = Path.cwd() / Path(run_directory)
-
-    run_directory = Path.cwd()
+def run_case(args):
+    """Runs the case in the case directory (default is current directory)"""
+    run_directory = (Path.cwd() / Path(args.case_directory)).resolve()
+    os.chdir(run_directory)
 
     run_directory = return_unix_path_string(run_directory)
 
+    from hysim import sim
+
     sim.run_sim(run_directory)
 
 
+def run_batch(args):
+    """Runs many case directories in a pool of worker processes"""
+    case_directories = batch.expand_case_directories(args.cases)
+    logging.info(
+        "Running %d cases with %s workers",
+        len(case_directories),
+        args.workers or "all available",
+    )
+
+    results = batch.run_batch(
+        case_directories,
+        workers=args.workers,
+        logging_level=logging.getLogger().level,
+    )
+
+    summary = batch.summarise_batch(results)
+    batch.write_summary(summary, args.summary)
+    if args.prometheus:
+        from hysim import telemetry
+
+        telemetry.write_prometheus(
+            [result["metrics"] for result in results if result.get("metrics")],
+            os.path.abspath(args.prometheus),
+        )
+
+    for result in results:
+        logging.info(
+            "%-8s %8.1fs  %s",
+            result["status"],
+            result["duration"] or 0.0,
+            result["case"],
+        )
+    logging.info(
+        "%d of %d cases succeeded, summary written to %s",
+        summary["succeeded"],
+        summary["total"],
+        args.summary,
+    )
+
+    if summary["failed"]:
+        sys.exit(1)
+
+
+def run_sweep(args):
+    """Runs the parameter sweep defined in a case directory"""
+    from hysim import sweep
+
+    case_directory = return_unix_path_string(
+        (Path.cwd() / Path(args.case_directory)).resolve()
+    )
+
+    results = sweep.run_sweep(
+        case_directory,
+        workers=args.workers,
+        logging_level=logging.getLogger().level,
+    )
+
+    failed = [result for result in results if result["status"] != "success"]
+    logging.info(
+        "%d of %d sweep runs succeeded", len(results) - len(failed), len(results)
+    )
+
+    if failed:
+        sys.exit(1)
+
+
+def run_plan(args):
+    """Estimates the cost of a case without rendering it"""
+    from hysim import plan
+
+    profile_path = args.profile or plan.default_profile_path()
+
+    if args.calibrate:
+        logging.info("Calibrating render time with %s", args.variant)
+        profile = plan.calibrate(args.variant)
+        if profile_path is None:
+            logging.error("Data cache disabled, pass --profile to save")
+            sys.exit(1)
+        plan.save_profile(profile, profile_path)
+        logging.info("Calibration profile written to %s", profile_path)
+        return
+
+    run_directory = (Path.cwd() / Path(args.case_directory)).resolve()
+    os.chdir(run_directory)
+
+    memory_limit = None
+    if args.memory_limit is not None:
+        memory_limit = int(args.memory_limit * 1024**2)
+
+    case_plan = plan.plan_case(
+        return_unix_path_string(run_directory),
+        plan.load_profile(profile_path),
+        memory_limit,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(case_plan, file, indent=4)
+
+    film = case_plan["film"]
+    memory = case_plan["memory"]
+    logging.info(
+        "Film: %dx%d pixels, %d bands in %d pass(es)",
+        film["width"],
+        film["height"],
+        case_plan["bands"],
+        case_plan["band_passes"],
+    )
+    logging.info(
+        "Sampling: %d spp%s, max depth %s, %d frame(s)",
+        case_plan["sample_count"],
+        " (progressive maximum)" if case_plan["progressive"] else "",
+        case_plan["max_depth"],
+        case_plan["frames"],
+    )
+    for name, triangles in case_plan["parts"].items():
+        logging.info("Part %s: %d triangles", name, triangles)
+    for name, group in case_plan["debris"].items():
+        logging.info(
+            "Debris %s: %d instances, %d triangles",
+            name,
+            group["instances"],
+            group["triangles"],
+        )
+    if case_plan["earth"] is not None:
+        logging.info(
+            "Earth (%s): %d triangles",
+            case_plan["earth"]["model"],
+            case_plan["earth"]["triangles"],
+        )
+    logging.info(
+        "Target covers %d pixels (%0.1f%% of the film)",
+        case_plan["target_pixels"],
+        100 * case_plan["target_coverage"],
+    )
+    logging.info(
+        "Memory: film %0.1f MB, tensor %0.1f MB, meshes %0.1f MB, "
+        "total %0.1f MB",
+        *(
+            memory[key] / 1024**2
+            for key in ("film_bytes", "tensor_bytes", "mesh_bytes")
+        ),
+        memory["total_bytes"] / 1024**2,
+    )
+
+    if case_plan["render_time"] is None:
+        logging.info("No calibration profile, run hysim plan --calibrate")
+    else:
+        logging.info("Predicted render time: %0.1fs", case_plan["render_time"])
+
+    if case_plan["exceeds_memory"]:
+        logging.error(
+            "Case needs %0.1f MB, more than the limit of %0.1f MB",
+            memory["total_bytes"] / 1024**2,
+            memory["limit_bytes"] / 1024**2,
+        )
+        sys.exit(1)
+
+
 # == CLI ARGUMENTS == #
 parser = argparse.ArgumentParser()
 subparsers = parser.add_subparsers(
@@ -49,8 +226,98 @@ parser.add_argument(
 # Run Command
 run_command = subparsers.add_parser("run", help="Run simulator case")
 run_command.set_defaults(func=run_case)
+run_command.add_argument(
+    "case_directory",
+    nargs="?",
+    default=".",
+    help="Case directory relative to the current directory",
+)
 run_command.add_argument("--debug", action="store_true")
 
+# Batch Command
+batch_command = subparsers.add_parser(
+    "batch", help="Run many simulator cases in parallel"
+)
+batch_command.set_defaults(func=run_batch)
+batch_command.add_argument(
+    "cases", nargs="+", help="Case directories or glob patterns"
+)
+batch_command.add_argument(
+    "-j",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes (default is one per CPU)",
+)
+batch_command.add_argument(
+    "--summary",
+    default=batch.SUMMARY_FILE,
+    help="Path of the json summary of the batch",
+)
+batch_command.add_argument(
+    "--prometheus",
+    default=None,
+    help="Path of a Prometheus text file of the stage metrics of each case",
+)
+batch_command.add_argument("--debug", action="store_true")
+
+# Sweep Command
+sweep_command = subparsers.add_parser(
+    "sweep", help="Run parameter sweep defined in case directory"
+)
+sweep_command.set_defaults(func=run_sweep)
+sweep_command.add_argument(
+    "case_directory",
+    nargs="?",
+    default=".",
+    help="Case directory relative to the current directory",
+)
+sweep_command.add_argument(
+    "-j",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes (default is one per CPU)",
+)
+sweep_command.add_argument("--debug", action="store_true")
+
+# Plan Command
+plan_command = subparsers.add_parser(
+    "plan", help="Estimate render cost and memory of a case"
+)
+plan_command.set_defaults(func=run_plan)
+plan_command.add_argument(
+    "case_directory",
+    nargs="?",
+    default=".",
+    help="Case directory relative to the current directory",
+)
+plan_command.add_argument(
+    "--calibrate",
+    action="store_true",
+    help="Measure the render time profile of this machine",
+)
+plan_command.add_argument(
+    "--variant",
+    default="scalar_spectral",
+    help="Mitsuba variant calibrated by --calibrate",
+)
+plan_command.add_argument(
+    "--profile",
+    default=None,
+    help="Path of the calibration profile (default is in the data cache)",
+)
+plan_command.add_argument(
+    "--memory-limit",
+    type=float,
+    default=None,
+    help="Memory limit in MB (default is the physical memory)",
+)
+plan_command.add_argument(
+    "--output", default=None, help="Path of a json file of the plan"
+)
+plan_command.add_argument("--debug", action="store_true")
+
 create_json_command = subparsers.add_parser("create_json")
 
 
@@ -79,7 +346,7 @@ def main():
         level=logging_level
     )
 
-    args.func()
+    args.func(args)
 
 
 if __name__ == "__main__":
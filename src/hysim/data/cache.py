@@ -0,0 +1,140 @@
+"""Data Cache Module
+
+Manages the on-disk cache of data derived from input files, such as parsed
+spectrum files. Cached entries are keyed on the source file path,
+modification time and size, so an edited file is parsed again. The cache
+directory is set by the HYSIM_CACHE_DIR environment variable (an empty value
+disables the cache) and defaults to ~/.cache/hysim.
+"""
+import os
+import logging
+import hashlib
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Environment variable overriding the cache directory
+CACHE_DIRECTORY_VARIABLE = "HYSIM_CACHE_DIR"
+DEFAULT_CACHE_DIRECTORY = os.path.join("~", ".cache", "hysim")
+
+
+def get_cache_directory(namespace: str = None) -> str:
+    """Returns the cache directory
+
+    Parameters
+    ----------
+    namespace : str, optional
+        Subdirectory of the cache, by default None
+
+    Returns
+    -------
+    str
+        Path to cache directory or None if the cache is disabled
+    """
+    cache_directory = os.environ.get(
+        CACHE_DIRECTORY_VARIABLE, DEFAULT_CACHE_DIRECTORY
+    )
+    if not cache_directory:
+        return None
+
+    cache_directory = os.path.expanduser(cache_directory)
+    if namespace is not None:
+        cache_directory = os.path.join(cache_directory, namespace)
+
+    return cache_directory
+
+
+def file_key(file_path: str, *extra) -> str:
+    """Returns a key identifying the current version of a file
+
+    Parameters
+    ----------
+    file_path : str
+        Path to file
+    *extra
+        Additional values distinguishing entries derived from the file
+
+    Returns
+    -------
+    str
+        Hex digest of the file path, modification time, size and extra
+        values
+    """
+    stat = os.stat(file_path)
+    key = [str(Path(file_path).resolve()), stat.st_mtime_ns, stat.st_size]
+    key.extend(extra)
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+
+def write_atomic(path: str, write):
+    """Writes a file through a temporary file in the same directory
+
+    Concurrent readers (e.g. batch workers) never see a partial file.
+
+    Parameters
+    ----------
+    path : str
+        Path to file
+    write : callable
+        Function writing to an open binary file object
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(handle, "wb") as file:
+            write(file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def cached_array(
+    file_path: str, loader, *extra, namespace: str = "arrays"
+) -> np.ndarray:
+    """Loads an array derived from a file through the cache
+
+    Cached arrays are memory mapped. Failing to write the cache (e.g. on a
+    read only file system) only disables caching for this file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to source file
+    loader : callable
+        Function returning the array from the source file path
+    *extra
+        Additional values distinguishing arrays derived from the file
+    namespace : str, optional
+        Subdirectory of the cache, by default "arrays"
+
+    Returns
+    -------
+    np.ndarray
+        Array loaded from the cache or by the loader
+    """
+    cache_directory = get_cache_directory(namespace)
+    if cache_directory is None:
+        return loader(file_path)
+
+    cache_path = os.path.join(
+        cache_directory, file_key(file_path, *extra) + ".npy"
+    )
+
+    if os.path.exists(cache_path):
+        try:
+            return np.load(cache_path, mmap_mode="r")
+        except (OSError, ValueError):
+            logging.debug("Ignoring unreadable cache file %s", cache_path)
+
+    array = loader(file_path)
+
+    try:
+        write_atomic(cache_path, lambda file: np.save(file, array))
+    except OSError as error:
+        logging.debug("Could not cache %s: %s", file_path, error)
+
+    return array
@@ -22,6 +22,11 @@ class ConfigFileMissing(Exception):
     pass
 
 
+class DuplicateDataFileError(Exception):
+    """Exception for a file name found more than once in the case directory"""
+    pass
+
+
 # ===== DATABASE ===== #
 class Kernels(Enum):
     """Enum containing path and files for SpiceyPy kernels"""
@@ -56,11 +61,143 @@ class EarthData(Enum):
     SURFACE_BITMAP = "earth.jpg"
 
 
+class CaseFileIndex:
+    """Index of file names to paths inside a case directory
+
+    The case directory is walked once when the index is built, so looking
+    up many files (spectrum files, part meshes) does not walk the directory
+    again for each one. Hidden directories and output directories are not
+    indexed.
+
+    Attributes
+    ----------
+    excluded_directories : set
+        Class attribute of directory names that are never indexed
+
+    case_directory : str
+        Path to root of case directory
+    _paths : dict
+        Paths of each file name found in the case directory
+
+    Methods
+    -------
+    exclude(directory)
+        Removes files inside a directory from the index
+    find(filename)
+        Returns path to file in case directory
+    files
+        Getter for indexed file paths
+    """
+
+    excluded_directories = {"__pycache__", "sweep_output"}
+
+    def __init__(self, case_directory=".", excluded_directories=()):
+        """Initializer
+
+        Parameters
+        ----------
+        case_directory : str, optional
+            Path to root of case directory, by default "."
+        excluded_directories : iterable, optional
+            Additional directory names that are not indexed, by default ()
+        """
+        self.case_directory = os.path.abspath(case_directory)
+        self._paths = {}
+
+        excluded = self.excluded_directories.union(excluded_directories)
+        for root, directories, files in os.walk(self.case_directory):
+            directories[:] = sorted(
+                directory
+                for directory in directories
+                if directory not in excluded and not directory.startswith(".")
+            )
+            for file in files:
+                path = os.path.join(root, file).replace("\\", "/")
+                self._paths.setdefault(file, []).append(path)
+
+    def exclude(self, directory):
+        """Removes files inside a directory from the index
+
+        Parameters
+        ----------
+        directory : str
+            Path to directory relative to case directory (or absolute)
+        """
+        directory = os.path.join(self.case_directory, directory)
+        prefix = os.path.abspath(directory).replace("\\", "/") + "/"
+
+        for file in list(self._paths):
+            paths = [
+                path for path in self._paths[file]
+                if not path.startswith(prefix)
+            ]
+            if paths:
+                self._paths[file] = paths
+            else:
+                del self._paths[file]
+
+    def find(self, filename):
+        """Returns path to file in case directory
+
+        Filenames containing a directory are first looked up relative to
+        the case directory, then by their file name.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file (or path relative to case directory)
+
+        Returns
+        -------
+        str
+            Unix style path to file
+
+        Raises
+        ------
+        DataFileNotFoundError
+            If the file is not in the case directory
+        DuplicateDataFileError
+            If more than one file in the case directory has the name
+        """
+        if os.path.dirname(filename):
+            path = os.path.join(self.case_directory, filename)
+            if os.path.isfile(path):
+                return os.path.normpath(path).replace("\\", "/")
+
+        paths = self._paths.get(os.path.basename(filename), [])
+
+        if not paths:
+            raise DataFileNotFoundError(
+                f"{filename} cannot be found in the case directory"
+            )
+        if len(paths) > 1:
+            raise DuplicateDataFileError(
+                f"{filename} is ambiguous, found: {', '.join(paths)}"
+            )
+
+        return paths[0]
+
+    def __contains__(self, filename):
+        """Returns True if a file name is in the index"""
+        return os.path.basename(filename) in self._paths
+
+    @property
+    def files(self):
+        """Getter for indexed file paths
+
+        Returns
+        -------
+        list
+            Paths of all files in the index
+        """
+        return [path for paths in self._paths.values() for path in paths]
+
+
 def get_user_data_path(filename):
     """Gets data paths of file in run directory
 
-    Walks through working directory to retrieve file
-    path
+    Indexes the working directory to retrieve the file path. Use
+    CaseFileIndex to look up more than one file.
 
     Parameters
     ----------
@@ -72,14 +209,7 @@ def get_user_data_path(filename):
     str
         Path to file
     """
-    for root, _, files in os.walk(Path.cwd()):
-        for file in files:
-            if file == filename:
-                return os.path.join(root, file).replace("\\", "/")
-
-    # raise DataFileNotFoundError(
-    #     f"{filename} cannot be found in the case directory"
-    # )
+    return CaseFileIndex(Path.cwd()).find(filename)
 
 
 def get_kernel_paths():
@@ -111,14 +241,17 @@ def read_json_package_data(path, file):
     dict
         Contents of json file
     """
-    with resources.path(path, file) as path_data:
-        with open(path_data, "r", encoding="utf-8") as j:
-            return json.loads(j.read())
+    with open(get_data_path(path, file), "r", encoding="utf-8") as j:
+        return json.loads(j.read())
 
 
 def get_material_from_database(material_name):
     """Retrieves material dictionary from database
 
+    Materials come from the material library of the process, so the
+    database is only read once. Reflectance spectra are given in the
+    dictionary rather than as spectrum file paths.
+
     Parameters
     ----------
     material_name : str
@@ -128,18 +261,21 @@ def get_material_from_database(material_name):
     -------
     dict
         Material dictionary
+
+    Raises
+    ------
+    DataFileNotFoundError
+        If the material is not in the database
     """
-    materials_data = read_json_package_data(
-        MaterialsData.PATH.value, MaterialsData.MATERIALS_FILE.value
-    )
-    material_dict = materials_data[material_name]
+    from hysim.data.material_library import get_material_library
 
-    if material_dict["material"]["type"] == "diffuse":
-        filename = material_dict["material"]["reflectance"]["filename"]
-        file_path = get_data_path(MaterialsData.PATH.value, filename)
-        material_dict["material"]["reflectance"]["filename"] = str(file_path)
+    library = get_material_library()
+    if material_name not in library.materials:
+        raise DataFileNotFoundError(
+            f"{material_name} is not in the materials database"
+        )
 
-    return material_dict
+    return library.material(material_name)
 
 
 def get_data_path(directory, file):
@@ -157,8 +293,8 @@ def get_data_path(directory, file):
     str
         Unix style path to data
     """
-    with resources.path(directory, file) as path:
-        return str(path).replace("\\", "/")
+    # Package data is installed as files, so the path stays valid
+    return str(resources.files(directory) / file).replace("\\", "/")
 
 
 def get_sunlight_spectrum():
@@ -177,20 +313,27 @@ def get_sunlight_spectrum():
 def list_defined_materials():
     """Returns list of materials inside material database
 
-    NOT IMPLEMENTED
+    Returns
+    -------
+    list
+        Sorted names of materials in the database
     """
-    raise NotImplementedError()
+    from hysim.data.material_library import get_material_library
+
+    return sorted(get_material_library().names)
 
 
 def list_defined_sensors():
     """Returns list of sensors in database
 
-    Raises
-    ------
-    NotImplementedError
-        When called
+    Returns
+    -------
+    list
+        Sorted names of sensors in the database
     """
-    raise NotImplementedError()
+    from hysim.data.sensor_library import get_sensor_library
+
+    return sorted(get_sensor_library().names)
 
 
 def list_defined_light_sources():
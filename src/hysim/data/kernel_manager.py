@@ -0,0 +1,154 @@
+"""SPICE Kernel Manager Module
+
+Keeps track of the SPICE kernels furnished in the process. Each kernel is
+furnished once and reference counted, so repeated cases in the same process
+(batch, sweep and trajectory runs) do not load the same kernel into the
+kernel pool again. Geophysical constants and time string conversions only
+depend on the loaded kernels, so they are cached until a kernel is unloaded.
+"""
+import threading
+from contextlib import contextmanager
+
+import spiceypy as spice
+
+# Geophysical constants used by SGP4 (in the order expected by evsgp4)
+GEOPHYSICAL_CONSTANTS = ["J2", "J3", "J4", "KE", "QO", "SO", "ER", "AE"]
+
+
+class KernelManager:
+    """Reference counted pool of SPICE kernels
+
+    Attributes
+    ----------
+    _references : dict
+        Number of users of each furnished kernel path
+    _epochs : dict
+        Cache of time strings converted to seconds past J2000
+    _geophysical_constants : list
+        Cache of Earth geophysical constants
+    _lock : threading.Lock
+        Lock around the kernel pool (SPICE is not thread safe)
+
+    Methods
+    -------
+    furnish(kernel_paths)
+        Furnishes kernels that are not loaded and adds a reference
+    release(kernel_paths)
+        Removes a reference and unloads kernels with no references
+    loaded(kernel_paths)
+        Context manager holding kernels while in use
+    loaded_kernels
+        Property listing furnished kernel paths
+    str2et(time_string)
+        Converts time string to seconds past J2000
+    geophysical_constants()
+        Returns the Earth geophysical constants used by SGP4
+    """
+
+    def __init__(self):
+        """Initializer"""
+        self._references = {}
+        self._epochs = {}
+        self._geophysical_constants = None
+        self._lock = threading.Lock()
+
+    def furnish(self, kernel_paths: list):
+        """Furnishes kernels that are not loaded and adds a reference
+
+        Parameters
+        ----------
+        kernel_paths : list
+            Paths to kernel files
+        """
+        with self._lock:
+            for kernel_path in kernel_paths:
+                if kernel_path not in self._references:
+                    spice.furnsh(kernel_path)
+                    self._references[kernel_path] = 0
+                self._references[kernel_path] += 1
+
+    def release(self, kernel_paths: list):
+        """Removes a reference and unloads kernels with no references
+
+        Parameters
+        ----------
+        kernel_paths : list
+            Paths to kernel files
+        """
+        with self._lock:
+            for kernel_path in kernel_paths:
+                if kernel_path not in self._references:
+                    continue
+
+                self._references[kernel_path] -= 1
+                if self._references[kernel_path] == 0:
+                    spice.unload(kernel_path)
+                    del self._references[kernel_path]
+                    self._clear_cache()
+
+    @contextmanager
+    def loaded(self, kernel_paths: list):
+        """Context manager holding kernels while in use
+
+        Parameters
+        ----------
+        kernel_paths : list
+            Paths to kernel files
+        """
+        self.furnish(kernel_paths)
+        try:
+            yield self
+        finally:
+            self.release(kernel_paths)
+
+    @property
+    def loaded_kernels(self) -> list:
+        """Returns furnished kernel paths
+
+        Returns
+        -------
+        list
+            Paths of furnished kernels
+        """
+        return list(self._references)
+
+    def _clear_cache(self):
+        """Clears values derived from the kernel pool"""
+        self._epochs = {}
+        self._geophysical_constants = None
+
+    def str2et(self, time_string: str) -> float:
+        """Converts time string to seconds past J2000
+
+        Parameters
+        ----------
+        time_string : str
+            Time string e.g. "12/22/2022 14:15:53 utc"
+
+        Returns
+        -------
+        float
+            Epoch in TDB seconds past J2000
+        """
+        if time_string not in self._epochs:
+            self._epochs[time_string] = spice.str2et(time_string)
+        return self._epochs[time_string]
+
+    def geophysical_constants(self) -> list:
+        """Returns the Earth geophysical constants used by SGP4
+
+        Returns
+        -------
+        list
+            Constants [J2, J3, J4, KE, QO, SO, ER, AE]
+        """
+        if self._geophysical_constants is None:
+            self._geophysical_constants = [
+                float(spice.bodvrd("EARTH", constant, 1)[1][0])
+                for constant in GEOPHYSICAL_CONSTANTS
+            ]
+        return list(self._geophysical_constants)
+
+
+# Kernel manager shared by the process
+spice_kernels = KernelManager()
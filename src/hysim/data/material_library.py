@@ -0,0 +1,244 @@
+"""Material Library Module
+
+Library of the materials in the materials database. The database is read
+once per process and the reflectance spectra of all materials are compiled
+into a single array holding the points of every spectrum one after the
+other. The compiled array is stored in the data cache (see
+hysim.data.cache), so later processes load it memory mapped instead of
+parsing every spectrum file. Materials are returned with in-memory spectra
+rather than paths to spectrum files.
+"""
+import copy
+import threading
+
+import numpy as np
+
+from hysim.data import cache
+from hysim.data import spd_reader
+from hysim.data import data_handling as dh
+from hysim.scene import spectra
+
+# Layout of the compiled spectra, part of the cache key
+STORE_VERSION = 2
+
+
+def compile_spectra(spectrum_paths: list) -> np.ndarray:
+    """Compiles spectrum files into a single array
+
+    The points of each spectrum are kept as in its file (sorted by
+    wavelength) and the spectra are stored one after the other.
+
+    Parameters
+    ----------
+    spectrum_paths : list
+        Paths to spectrum files
+
+    Returns
+    -------
+    np.ndarray
+        Array (3, N) with the wavelengths, values and index in
+        spectrum_paths of every point
+    """
+    spectrum_data = [
+        spd_reader.read_spd_file(spectrum_path)
+        for spectrum_path in spectrum_paths
+    ]
+    spectrum_data = [data[np.argsort(data[:, 0])] for data in spectrum_data]
+
+    return np.vstack(
+        [
+            np.concatenate([data[:, 0] for data in spectrum_data]),
+            np.concatenate([data[:, 1] for data in spectrum_data]),
+            np.repeat(
+                np.arange(len(spectrum_data)),
+                [len(data) for data in spectrum_data],
+            ),
+        ]
+    )
+
+
+class MaterialLibrary:
+    """Compiled materials database
+
+    Attributes
+    ----------
+    materials_file : str
+        Path to materials database file
+    materials : dict
+        Material dictionaries read from the database
+    spectrum_files : list
+        Spectrum file names referenced by the materials
+    _store : np.array
+        Compiled spectra (see compile_spectra)
+    _offsets : np.array
+        Start of the points of each spectrum file in the compiled spectra,
+        followed by the number of points
+    _compiled_materials : dict
+        Materials with in-memory spectra that have been built
+
+    Methods
+    -------
+    names
+        Getter for names of materials in library
+    spectrum(material_name)
+        Returns reflectance spectrum of a material
+    material(material_name)
+        Returns material dictionary with in-memory spectrum
+    """
+
+    def __init__(self, use_cache: bool = True):
+        """Initializer
+
+        Parameters
+        ----------
+        use_cache : bool, optional
+            Load the compiled spectra through the data cache, by default
+            True
+        """
+        self.materials_file = dh.get_data_path(
+            dh.MaterialsData.PATH.value, dh.MaterialsData.MATERIALS_FILE.value
+        )
+        self.materials = dh.read_json_package_data(
+            dh.MaterialsData.PATH.value, dh.MaterialsData.MATERIALS_FILE.value
+        )
+        self.spectrum_files = sorted(
+            {
+                self._spectrum_file(material_dict)
+                for material_dict in self.materials.values()
+            }
+            - {None}
+        )
+        self._compiled_materials = {}
+
+        spectrum_paths = [
+            dh.get_data_path(dh.MaterialsData.PATH.value, file)
+            for file in self.spectrum_files
+        ]
+
+        if use_cache:
+            self._store = cache.cached_array(
+                self.materials_file,
+                lambda _: compile_spectra(spectrum_paths),
+                STORE_VERSION,
+                *[cache.file_key(path) for path in spectrum_paths],
+                namespace="materials",
+            )
+        else:
+            self._store = compile_spectra(spectrum_paths)
+
+        self._offsets = np.searchsorted(
+            self._store[2], np.arange(len(self.spectrum_files) + 1)
+        )
+
+    @staticmethod
+    def _spectrum_file(material_dict: dict) -> str:
+        """Returns spectrum file name of a database material
+
+        Parameters
+        ----------
+        material_dict : dict
+            Material dictionary from database
+
+        Returns
+        -------
+        str
+            Spectrum file name or None if the material has no spectrum file
+        """
+        reflectance = material_dict["material"].get("reflectance", {})
+        if isinstance(reflectance, dict):
+            return reflectance.get("filename")
+        return None
+
+    @property
+    def names(self) -> list:
+        """Getter for names of materials in library
+
+        Returns
+        -------
+        list
+            Material names
+        """
+        return list(self.materials)
+
+    def spectrum(self, material_name: str) -> spectra.ReflectanceSpectrum:
+        """Returns reflectance spectrum of a material
+
+        Parameters
+        ----------
+        material_name : str
+            Name of material in database
+
+        Returns
+        -------
+        spectra.ReflectanceSpectrum
+            Reflectance spectrum at the points of its spectrum file
+
+        Raises
+        ------
+        KeyError
+            If the material is not in the database
+        ValueError
+            If the material has no spectrum file
+        """
+        file = self._spectrum_file(self.materials[material_name])
+        if file is None:
+            raise ValueError(f"{material_name} has no reflectance spectrum")
+
+        index = self.spectrum_files.index(file)
+        points = slice(self._offsets[index], self._offsets[index + 1])
+
+        return spectra.ReflectanceSpectrum(
+            np.array(self._store[0, points]), np.array(self._store[1, points])
+        )
+
+    def material(self, material_name: str) -> dict:
+        """Returns material dictionary with in-memory spectrum
+
+        Parameters
+        ----------
+        material_name : str
+            Name of material in database
+
+        Returns
+        -------
+        dict
+            Copy of material dictionary
+
+        Raises
+        ------
+        KeyError
+            If the material is not in the database
+        """
+        if material_name not in self._compiled_materials:
+            material_dict = copy.deepcopy(self.materials[material_name])
+
+            if self._spectrum_file(material_dict) is not None:
+                material_dict["material"]["reflectance"] = self.spectrum(
+                    material_name
+                ).build_dict()
+
+            self._compiled_materials[material_name] = material_dict
+
+        return copy.deepcopy(self._compiled_materials[material_name])
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_material_library() -> MaterialLibrary:
+    """Returns the material library of the process
+
+    The library is built on first use.
+
+    Returns
+    -------
+    MaterialLibrary
+        Material library shared by the process
+    """
+    global _library
+
+    with _library_lock:
+        if _library is None:
+            _library = MaterialLibrary()
+    return _library
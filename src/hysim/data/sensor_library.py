@@ -0,0 +1,118 @@
+"""Sensor Library Module
+
+Library of the sensors in the sensors database. Each sensor has an imaging
+mode and a spectral response function file (as in the sensor config). The
+database is read once per process and sensor responses are read through
+the data cache (see hysim.data.spd_reader).
+"""
+import threading
+
+from hysim.data import spd_reader
+from hysim.data import data_handling as dh
+from hysim.scene import spectra
+
+
+class SensorLibrary:
+    """Sensors database
+
+    Attributes
+    ----------
+    sensors : dict
+        Sensor dictionaries read from the database
+
+    Methods
+    -------
+    names
+        Getter for names of sensors in library
+    spectrum_path(sensor_name)
+        Returns path to spectral response file of a sensor
+    response(sensor_name)
+        Returns film response of a sensor
+    """
+
+    def __init__(self):
+        """Initializer"""
+        self.sensors = dh.read_json_package_data(
+            dh.SensorsData.PATH.value, dh.SensorsData.SENSORS_FILE.value
+        )
+
+    @property
+    def names(self) -> list:
+        """Getter for names of sensors in library
+
+        Returns
+        -------
+        list
+            Sensor names
+        """
+        return list(self.sensors)
+
+    def spectrum_path(self, sensor_name: str) -> str:
+        """Returns path to spectral response file of a sensor
+
+        Parameters
+        ----------
+        sensor_name : str
+            Name of sensor in database
+
+        Returns
+        -------
+        str
+            Path to spd file
+
+        Raises
+        ------
+        KeyError
+            If the sensor is not in the database
+        """
+        return dh.get_data_path(
+            dh.SensorsData.PATH.value,
+            self.sensors[sensor_name]["spectrum_file"],
+        )
+
+    def response(self, sensor_name: str) -> spectra.Spectrum:
+        """Returns film response of a sensor
+
+        Parameters
+        ----------
+        sensor_name : str
+            Name of sensor in database
+
+        Returns
+        -------
+        spectra.Spectrum
+            HyperspectralFilmResponse or MultispectralFilmResponse
+
+        Raises
+        ------
+        KeyError
+            If the sensor is not in the database
+        """
+        spectrum_data = spd_reader.SPDReader(self.spectrum_path(sensor_name))
+        return spectra.film_response(
+            self.sensors[sensor_name]["imaging_mode"],
+            spectrum_data.wavelengths,
+            spectrum_data.values,
+        )
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_sensor_library() -> SensorLibrary:
+    """Returns the sensor library of the process
+
+    The library is built on first use.
+
+    Returns
+    -------
+    SensorLibrary
+        Sensor library shared by the process
+    """
+    global _library
+
+    with _library_lock:
+        if _library is None:
+            _library = SensorLibrary()
+    return _library
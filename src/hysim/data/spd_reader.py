@@ -6,28 +6,46 @@ Class to open and read .spd files and pass properties to user.
 # # SPD File reader
 import numpy as np
 
+from hysim.data import cache
+
+
+def read_spd_file(file_location: str) -> np.ndarray:
+    """Parses a whitespace delimited spd file in a single pass
+
+    Parameters
+    ----------
+    file_location : str
+        Path to spd file
+
+    Returns
+    -------
+    np.ndarray
+        Array of file data with a row per line and a column per value
+    """
+    return np.loadtxt(file_location, dtype=float, ndmin=2, encoding="utf_8")
+
 
 class SPDReader:
     """Manages data from .spd files
 
+    The file is parsed once into an array. Parsed files are stored in the
+    data cache (see hysim.data.cache) so loading the same file again is a
+    memory mapped load.
+
     Attributes
     ----------
     _wavelength_column_index : int
         Class attribute defining column containing wavelength in spd file
     _value_column_index : int
-        Class attribute defining column containing value in spd file
+        Class attribute defining first column containing values in spd file
 
     file_location : str
         Path to spd file
-    _wavelengths : list[float]
-        Wavelength values read from spectrum file
-    _values : list[float]
-        Values corresponding to each wavelength read from spectrum file
+    _file_data : np.array
+        Array of file data with a row per wavelength
 
     Methods
     -------
-    read_file_contents(column)
-        Reads the contents of a utf-8 ascii file
     wavelengths
         Getter for wavelengths
     values
@@ -37,75 +55,35 @@ class SPDReader:
     _wavelength_column_index = 0
     _value_column_index = 1
 
-    def __init__(self, file_location: str):
+    def __init__(self, file_location: str, use_cache: bool = True):
         """Initializer
 
         Parameters
         ----------
         file_location : str
             Path to file
+        use_cache : bool, optional
+            Load the parsed file through the data cache, by default True
         """
         self.file_location = file_location
-        self._wavelengths = self.read_file_column(
-            self._wavelength_column_index
-        )
-        self._values = self.gather_data_array()
 
-    def gather_data_array(self):
-        """Returns data in value columns (all except column 0)
-
-        Walks through columns and gathers data for each in a numpy
-        array.
-
-        Returns
-        -------
-        np.array
-            Array of value data for each band.
-
-        """
-        column_quantity = len(
-            open(self.file_location, "r", encoding="utf_8")
-            .readlines()[0]
-            .split()
-        )
-        line_quantity = len(
-            open(self.file_location, "r", encoding="utf_8").readlines()
-        )
-        file_data = np.zeros((line_quantity, column_quantity - 1))
-
-        for column in range(1, column_quantity):
-            file_data[:, column - 1] = self.read_file_column(column)
-
-        return file_data
-
-    def read_file_column(self, column):
-        """Reads column in utf-8 file as a list
-
-        Returns
-        -------
-        list
-            List of rows returned from file for a given column
-        """
-        _string_list = [
-            spectrum_file_line.split()[column]
-            for spectrum_file_line in open(
-                self.file_location, "r", encoding="utf_8"
-            ).readlines()
-        ]
-
-        return [float(x) for x in _string_list]
+        if use_cache:
+            self._file_data = cache.cached_array(
+                file_location, read_spd_file, namespace="spd"
+            )
+        else:
+            self._file_data = read_spd_file(file_location)
 
     @property
     def wavelengths(self):
-        """returns wavelengths"""
         """Getter for wavelengths
 
         Returns
         -------
-        list
+        np.array
             Wavelengths
         """
-        return self._wavelengths
+        return self._file_data[:, self._wavelength_column_index]
 
     @property
     def values(self):
@@ -114,6 +92,6 @@ class SPDReader:
         Returns
         -------
         np.array
-            Values in spectrum
+            Values in spectrum (a column per band for multiple columns)
         """
-        return np.squeeze(self._values)
+        return np.squeeze(self._file_data[:, self._value_column_index:])
@@ -6,6 +6,8 @@ an interface for the rest of the package to access the data.
 import os
 import yaml
 
+from hysim.data import data_handling as dh
+
 # TODO: Add exception handling to configuration file inputs
 
 
@@ -27,9 +29,14 @@ class Configs:
         Configuration data for the HSI/MSI sensor
     parts_config : dict
         Configuration data for the target components
+    sweep_config : dict
+        Configuration data for a parameter sweep (optional)
     additional_materials : dict
         Dictionary of user defined materials
-
+    case_directory : str
+        Path to root of case directory
+    case_files : dh.CaseFileIndex
+        Index of files in the case directory (built by load_configs)
 
     Methods
     -------
@@ -41,6 +48,14 @@ class Configs:
         Reads contents of yaml
     load_configs(case_directory = ".")
         Walks through case directory and reads configuration files.
+    output_directories()
+        Returns directories written to by the case
+    find_file(filename)
+        Returns path to user data file in case directory
+    get_entry(key)
+        Returns config entry from dotted key
+    set_entry(key, value)
+        Sets config entry from dotted key
     """
 
     valid_config_types = [
@@ -49,6 +64,7 @@ class Configs:
         "sensor_config",
         "parts_config",
         "material_config",
+        "sweep_config",
     ]
 
     def __init__(self):
@@ -57,7 +73,10 @@ class Configs:
         self.mission_config = {}
         self.sensor_config = {}
         self.parts_config = {}
+        self.sweep_config = {}
         self.additional_materials = {}
+        self.case_directory = "."
+        self.case_files = None
 
     def _append_material_config(self, config_data: dict):
         """Adds material to collection of user defined materials
@@ -124,9 +143,117 @@ class Configs:
             Path from run directory to root of case directory, by default "."
             (default assumes case directory is run directory)
         """
-        for root, _, files in os.walk(case_directory):
-            for file in files:
-                if file.endswith(".yml"):
-                    path = os.path.join(root, file)
-                    file_type, config_data = self._get_config_data(path)
-                    self._sort_config_data(file_type, config_data)
+        self.case_directory = case_directory
+        self.case_files = dh.CaseFileIndex(case_directory)
+
+        for path in self.case_files.files:
+            if path.endswith(".yml"):
+                file_type, config_data = self._get_config_data(path)
+                self._sort_config_data(file_type, config_data)
+
+        # Results of earlier runs are not user data
+        for directory in self.output_directories():
+            self.case_files.exclude(directory)
+
+    def output_directories(self):
+        """Returns directories written to by the case
+
+        Returns
+        -------
+        list
+            Paths relative to case directory of output directories
+            (the case directory itself is not included)
+        """
+        directories = {
+            os.path.dirname(output_selection["file_name"])
+            for output_selection in self.case_config.get("output", [])
+        }
+        if self.sweep_config:
+            directories.add(
+                self.sweep_config.get("output_directory", "sweep_output")
+            )
+        directories.discard("")
+        return sorted(directories)
+
+    def find_file(self, filename):
+        """Returns path to user data file in case directory
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file (or path relative to case directory)
+
+        Returns
+        -------
+        str
+            Unix style path to file
+        """
+        if self.case_files is None:
+            self.case_files = dh.CaseFileIndex(self.case_directory)
+        return self.case_files.find(filename)
+
+    def _split_key(self, key: str):
+        """Splits dotted key into the config dict and entry keys
+
+        Parameters
+        ----------
+        key : str
+            Dotted key e.g. case_config.sampler.sample_count
+
+        Returns
+        -------
+        config : dict
+            Config dictionary named by the first part of the key
+        entry_keys : list
+            Remaining parts of the key
+
+        Raises
+        ------
+        KeyError
+            If the key does not start with a config name or has no entry
+        """
+        config_name, *entry_keys = key.split(".")
+        config = getattr(self, config_name, None)
+
+        if not isinstance(config, dict) or not entry_keys:
+            raise KeyError(f"{key} is not a valid config entry")
+
+        return config, entry_keys
+
+    def get_entry(self, key: str):
+        """Returns config entry from dotted key
+
+        Parameters
+        ----------
+        key : str
+            Dotted key e.g. case_config.sampler.sample_count
+
+        Returns
+        -------
+        object
+            Config entry
+        """
+        config, entry_keys = self._split_key(key)
+        for entry_key in entry_keys:
+            config = config[entry_key]
+        return config
+
+    def set_entry(self, key: str, value):
+        """Sets config entry from dotted key
+
+        Parameters
+        ----------
+        key : str
+            Dotted key e.g. case_config.sampler.sample_count
+        value : object
+            New value of the entry
+
+        Raises
+        ------
+        KeyError
+            If a parent entry of the key does not exist
+        """
+        config, entry_keys = self._split_key(key)
+        for entry_key in entry_keys[:-1]:
+            config = config[entry_key]
+        config[entry_keys[-1]] = value
@@ -4,8 +4,10 @@ This module contains classes to handle and format output render data from
 the simulator.
 """
 import os
+import json
 import logging
 from itertools import tee
+from concurrent.futures import ThreadPoolExecutor
 
 import mitsuba as mi
 import numpy as np
@@ -35,6 +37,101 @@ def two_value_moving_average(values: list) -> list:
     return [(lower + higher) / 2 for lower, higher in pairwise(values)]
 
 
+def frame_file_name(file_name: str, frame: int) -> str:
+    """Adds a frame number to a file name before its extension
+
+    Parameters
+    ----------
+    file_name : str
+        Output file or directory name
+    frame : int
+        Frame number
+
+    Returns
+    -------
+    str
+        File name with frame number e.g. results_0003.exr
+    """
+    root, extension = os.path.splitext(file_name)
+    return f"{root}_{frame:04d}{extension}"
+
+
+# PNG pixel types for each bit depth
+PNG_BIT_DEPTHS = {8: np.uint8, 16: np.uint16}
+
+# ENVI interleaves as axis orders of a (lines, samples, bands) render
+ENVI_INTERLEAVES = {
+    "bsq": (2, 0, 1),
+    "bil": (0, 2, 1),
+    "bip": (0, 1, 2),
+}
+
+
+def scale_to_integers(
+    cube: np.ndarray, dtype: type, scaling: str = "global"
+) -> np.ndarray:
+    """Scales a (lines, samples, bands) cube to the range of an integer type
+
+    Parameters
+    ----------
+    cube : np.ndarray
+        Float cube
+    dtype : type
+        Unsigned integer type of the result
+    scaling : str, optional
+        Range mapped to the integer range: "global" for the whole cube,
+        "band" for each band or "none" to clip values, by default "global"
+
+    Returns
+    -------
+    np.ndarray
+        Integer cube (non finite values are 0)
+
+    Raises
+    ------
+    ValueError
+        If the scaling is unknown
+    """
+    maximum = np.iinfo(dtype).max
+    cube = np.nan_to_num(cube, nan=0.0, posinf=0.0, neginf=0.0)
+
+    if scaling == "none":
+        return np.clip(np.rint(cube), 0, maximum).astype(dtype)
+    if scaling == "global":
+        axes = None
+    elif scaling == "band":
+        axes = (0, 1)
+    else:
+        raise ValueError(f"{scaling} is an invalid PNG scaling")
+
+    lower = cube.min(axis=axes, keepdims=True)
+    span = cube.max(axis=axes, keepdims=True) - lower
+    gain = np.divide(
+        maximum, span, out=np.zeros_like(span), where=span > 0
+    )
+
+    cube -= lower
+    cube *= gain
+    np.rint(cube, out=cube)
+    return cube.astype(dtype)
+
+
+def envi_list(values) -> str:
+    """Formats values as an ENVI header list e.g. {400.5, 401.5}
+
+    Parameters
+    ----------
+    values : list
+        Values in list
+
+    Returns
+    -------
+    str
+        ENVI header list
+    """
+    return "{" + ", ".join(f"{value:g}" for value in values) + "}"
+
+
 # Core Classes
 class OutputHandler:
     """Handles output formatter
@@ -45,6 +142,8 @@ class OutputHandler:
         Output data object, OutputFormatter
     case_directory : str
         Path to case directory
+    frame : int
+        Frame number of a trajectory case, None for single epoch cases
 
     Methods
     -------
@@ -52,7 +151,14 @@ class OutputHandler:
         For each format defined by user, export output data
     """
 
-    def __init__(self, render_data, film_data, case_directory: str):
+    def __init__(
+        self,
+        render_data,
+        film_data,
+        case_directory: str,
+        frame: int = None,
+        metadata: dict = None,
+    ):
         """Initializer
 
         Parameters
@@ -63,9 +169,15 @@ class OutputHandler:
             Hyperspectral film object
         case_directory : str
             Path to case directory
+        frame : int, optional
+            Frame number added to output file names, by default None
+        metadata : dict, optional
+            Render metadata (e.g. sample count and error) written to
+            output files that support it, by default None
         """
-        self.output = OutputFormatter(render_data, film_data)
+        self.output = OutputFormatter(render_data, film_data, metadata)
         self.case_directory = case_directory
+        self.frame = frame
 
     def produce_output_data(self, user_inputs):
         """Produces output files using data in OutputFormatter
@@ -78,6 +190,13 @@ class OutputHandler:
             Holds export function defined by user input
         """
         for output_selection in user_inputs.case_config["output"]:
+            if self.frame is not None:
+                output_selection = dict(
+                    output_selection,
+                    file_name=frame_file_name(
+                        output_selection["file_name"], self.frame
+                    ),
+                )
             output_format = self.output.formats[output_selection["format"]]
             output_format(output_selection, user_inputs)
 
@@ -88,6 +207,10 @@ class OutputFormatter:
     Output data is converted to user defined format. Currently
     supported formats:
     - EXR
+    - PNG
+    - CSV
+    - ENVI
+    - NPY/NPZ
 
     Attributes
     ----------
@@ -95,23 +218,39 @@ class OutputFormatter:
         Holds hyperspectral/multispectral film data
     render_data : TensorXf
         Tensor array output from renderer
+    metadata : dict
+        Render metadata written to output files that support it
     formats : dict
         Dictionary of export functions for each format
 
     Methods
     -------
+    band_wavelengths(output_params, user_inputs)
+        Returns band centers and widths of the render channels
     export_as_exr(output_params["file_name"])
         Exports rendered scene data in OpenEXR format
+    export_as_envi(output_params, user_inputs)
+        Exports rendered scene data as an ENVI raw cube and header
+    write_metadata(file_name, output_params, user_inputs)
+        Writes render metadata and band wavelengths to a json file
+    export_as_npy(output_params, user_inputs)
+        Exports rendered scene data as a .npy array and metadata json
+    export_as_npz(output_params, user_inputs)
+        Exports rendered scene data as a .npz archive and metadata json
     """
 
-    def __init__(self, render_data, film_data):
+    def __init__(self, render_data, film_data, metadata: dict = None):
         """Initializer"""
         self.film_data = film_data
         self.render_data = render_data
+        self.metadata = metadata or {}
         self.formats = {
             "exr": self.export_as_exr,
             "png": self.export_as_png,
             "csv": self.export_as_csv,
+            "envi": self.export_as_envi,
+            "npy": self.export_as_npy,
+            "npz": self.export_as_npz,
         }
 
     def create_channel_names(self, wavelengths: list) -> list:
@@ -136,6 +275,49 @@ class OutputFormatter:
 
         return channel_names
 
+    def band_wavelengths(self, output_params, user_inputs) -> tuple:
+        """Returns band centers and widths of the render channels
+
+        Hyperspectral bands are centered between the film spectrum
+        wavelengths. Multispectral bands use the reference_wavelengths (and
+        optional fwhm) of the output parameters.
+
+        Parameters
+        ----------
+        output_params : dict
+            User provided output parameters
+        user_inputs
+            Object containing dictionaries of user inputs
+
+        Returns
+        -------
+        centers : list
+            Band center wavelengths [nm]
+        fwhm : list
+            Band widths [nm] or None if unknown
+
+        Raises
+        ------
+        ValueError
+            If multispectral output has no reference_wavelengths
+        """
+        if user_inputs.sensor_config["imaging_mode"] == "multispectral":
+            try:
+                return (
+                    list(output_params["reference_wavelengths"]),
+                    output_params.get("fwhm"),
+                )
+            except KeyError:
+                raise ValueError(
+                    "reference_wavelengths required for multispectral output"
+                )
+
+        wavelengths = self.film_data.spectrum.wavelengths
+        return (
+            two_value_moving_average(wavelengths),
+            list(np.diff(wavelengths)),
+        )
+
     def export_as_exr(self, output_params, user_inputs):
         """Exports render data as .exr file
 
@@ -149,24 +331,8 @@ class OutputFormatter:
 
         logging.info("Exporting results as EXR File")
 
-        # Multispectral case
-        if user_inputs.sensor_config["imaging_mode"] == "multispectral":
-            # Find user input for band reference values
-            try:
-                channel_names = self.create_channel_names(
-                    output_params["reference_wavelengths"]
-                )
-            except KeyError:
-                logging.error(
-                    "reference_wavelengths required for multispectral .exr"
-                )
-
-        # Hyperspectral case
-        elif user_inputs.sensor_config["imaging_mode"] == "hyperspectral":
-            # User rolling average of narrow band values
-            channel_names = self.create_channel_names(
-                two_value_moving_average(self.film_data.spectrum.wavelengths)
-            )
+        centers, _ = self.band_wavelengths(output_params, user_inputs)
+        channel_names = self.create_channel_names(centers)
 
         if len(channel_names) != len(self.render_data[0, 0, :]):
             raise ValueError(
@@ -188,41 +354,243 @@ class OutputFormatter:
 
         result_bmp.metadata()["pixelAspectRatio"] = 1
         result_bmp.metadata()["screenWindowWidth"] = 1
+        for key, value in self.metadata.items():
+            if isinstance(value, (bool, int, float, str)):
+                result_bmp.metadata()[f"hysim_{key}"] = value
+            elif value is not None:
+                result_bmp.metadata()[f"hysim_{key}"] = str(value)
+
+        # Asynchronous writes can hang at exit when nothing was rendered
+        mi.util.write_bitmap(
+            output_params["file_name"], result_bmp, write_async=False
+        )
+
+    def export_as_envi(self, output_params, user_inputs):
+        """Exports render data as an ENVI raw cube with a .hdr header
+
+        The render is written straight into a memory mapped file in the
+        interleave given by output_params["interleave"] (bsq, bil or bip,
+        by default bsq). The header is written next to the cube with the
+        .hdr extension.
+
+        Parameters
+        ----------
+        output_params : dict
+            User provided output parameters
+        user_inputs
+            Object containing dictionaries of user inputs
+
+        Raises
+        ------
+        ValueError
+            If the interleave is unknown or the number of band wavelengths
+            does not match the render
+        """
+        logging.info("Exporting results as ENVI File")
+
+        interleave = output_params.get("interleave", "bsq").lower()
+        if interleave not in ENVI_INTERLEAVES:
+            raise ValueError(f"{interleave} is an invalid ENVI interleave")
+
+        render = np.asarray(self.render_data, dtype=np.float32)
+        lines, samples, bands = render.shape
+
+        centers, fwhm = self.band_wavelengths(output_params, user_inputs)
+        if len(centers) != bands:
+            raise ValueError(
+                "Total reference wavelengths and channels should be the same"
+            )
+
+        # Transposed view of the render, copied once into the file
+        cube = render.transpose(ENVI_INTERLEAVES[interleave])
+        data = np.memmap(
+            output_params["file_name"],
+            dtype="<f4",
+            mode="w+",
+            shape=cube.shape,
+        )
+        data[:] = cube
+        data.flush()
+        del data
+
+        header = [
+            "ENVI",
+            "description = {HySim render}",
+            f"samples = {samples}",
+            f"lines = {lines}",
+            f"bands = {bands}",
+            "header offset = 0",
+            "file type = ENVI Standard",
+            "data type = 4",
+            f"interleave = {interleave}",
+            "byte order = 0",
+            "wavelength units = Nanometers",
+            f"wavelength = {envi_list(centers)}",
+        ]
+        if fwhm is not None:
+            header.append(f"fwhm = {envi_list(fwhm)}")
+
+        header_file = os.path.splitext(output_params["file_name"])[0] + ".hdr"
+        with open(header_file, "w", encoding="utf_8") as file:
+            file.write("\n".join(header) + "\n")
+
+    def write_metadata(
+        self, file_name: str, output_params, user_inputs
+    ) -> tuple:
+        """Writes render metadata and band wavelengths to a json file
+
+        The json file is written next to the output file with the .json
+        extension.
+
+        Parameters
+        ----------
+        file_name : str
+            Output file name
+        output_params : dict
+            User provided output parameters
+        user_inputs
+            Object containing dictionaries of user inputs
+
+        Returns
+        -------
+        centers : list
+            Band center wavelengths [nm]
+        fwhm : list
+            Band widths [nm] or None if unknown
+        """
+        centers, fwhm = self.band_wavelengths(output_params, user_inputs)
+        lines, samples, bands = np.shape(self.render_data)
+
+        metadata = {
+            "shape": [lines, samples, bands],
+            "axes": ["line", "sample", "band"],
+            "dtype": "float32",
+            "wavelength_units": "nm",
+            "wavelengths": centers,
+            "fwhm": fwhm,
+            "render": self.metadata,
+        }
+
+        metadata_file = os.path.splitext(file_name)[0] + ".json"
+        with open(metadata_file, "w", encoding="utf_8") as file:
+            json.dump(
+                metadata,
+                file,
+                indent=2,
+                default=lambda value: np.asarray(value).tolist(),
+            )
+
+        return centers, fwhm
+
+    def export_as_npy(self, output_params, user_inputs):
+        """Exports render data as a .npy array with a metadata json
+
+        The array (lines, samples, bands) is written through a memory
+        mapped file, so it can be loaded with np.load(mmap_mode="r").
+
+        Parameters
+        ----------
+        output_params : dict
+            User provided output parameters
+        user_inputs
+            Object containing dictionaries of user inputs
+        """
+        logging.info("Exporting results as NPY File")
+        render = np.asarray(self.render_data, dtype=np.float32)
+        self.write_metadata(
+            output_params["file_name"], output_params, user_inputs
+        )
+
+        data = np.lib.format.open_memmap(
+            output_params["file_name"],
+            mode="w+",
+            dtype=np.float32,
+            shape=render.shape,
+        )
+        data[:] = render
+        data.flush()
+        del data
+
+    def export_as_npz(self, output_params, user_inputs):
+        """Exports render data as a .npz archive with a metadata json
 
-        mi.util.write_bitmap(output_params["file_name"], result_bmp)
+        The archive holds the render (lines, samples, bands) and the band
+        wavelengths and fwhm. It is compressed if output_params["compress"]
+        is set.
+
+        Parameters
+        ----------
+        output_params : dict
+            User provided output parameters
+        user_inputs
+            Object containing dictionaries of user inputs
+        """
+        logging.info("Exporting results as NPZ File")
+        centers, fwhm = self.write_metadata(
+            output_params["file_name"], output_params, user_inputs
+        )
+
+        arrays = {
+            "render": np.asarray(self.render_data, dtype=np.float32),
+            "wavelengths": np.asarray(centers, dtype=float),
+        }
+        if fwhm is not None:
+            arrays["fwhm"] = np.asarray(fwhm, dtype=float)
+
+        if output_params.get("compress", False):
+            np.savez_compressed(output_params["file_name"], **arrays)
+        else:
+            np.savez(output_params["file_name"], **arrays)
 
     def export_as_png(self, output_params: str, _):
         """Exports render data as .png files
 
+        The cube is scaled to the full range of the bit depth in a single
+        pass, either with the minimum and maximum of the whole cube
+        (scaling: global, the default), of each band (scaling: band) or
+        without scaling (scaling: none, values are clipped). Band images are
+        encoded concurrently on a thread pool.
+
         Parameters
         ----------
         output_params
             User provided output parameters
+
+        Raises
+        ------
+        ValueError
+            If the scaling or bit depth is invalid
         """
         logging.info("Exporting results as PNG files")
-        if not os.path.isdir(output_params["file_name"]):
-            os.mkdir(output_params["file_name"])
-        else:
-            # TODO: Logger here to say it already exists
-            pass
+        scaling = output_params.get("scaling", "global")
+        bit_depth = output_params.get("bit_depth", 8)
+        if bit_depth not in PNG_BIT_DEPTHS:
+            raise ValueError(f"{bit_depth} is an invalid PNG bit depth")
+
+        images = scale_to_integers(
+            np.asarray(self.render_data, dtype=np.float32),
+            PNG_BIT_DEPTHS[bit_depth],
+            scaling,
+        )
 
-        for i in range(len(self.render_data[0, 0, :])):
-            dir_name = output_params["file_name"]
-            band_name = f"Band_{i}.png"
-            results_array = np.array(self.render_data[:, :, i])
-            iio.imwrite(
-                f"{dir_name}/{band_name}",
-                # np.interp(
-                #      results_array,
-                #      (results_array.min(), results_array.max()),
-                #      (0, 255)),
-                (results_array).astype(np.uint8),
-                # prefer_uint8=False
+        dir_name = output_params["file_name"]
+        os.makedirs(dir_name, exist_ok=True)
+
+        with ThreadPoolExecutor(output_params.get("workers")) as executor:
+            list(
+                executor.map(
+                    lambda i: iio.imwrite(
+                        f"{dir_name}/Band_{i}.png", images[:, :, i]
+                    ),
+                    range(images.shape[2]),
+                )
             )
 
     def export_as_csv(self, output_params: str, _):
         """Exports render data as .csv files
 
+        Text output is slow and large, use npy or npz for big renders.
+
         Parameters
         ----------
         output_params
@@ -235,12 +603,12 @@ class OutputFormatter:
             # TODO: Logger here to say it already exists
             pass
 
-        for i in range(len(self.render_data[0, 0, :])):
+        render = np.asarray(self.render_data)
+        for i in range(render.shape[2]):
             dir_name = output_params["file_name"]
             band_name = f"Band_{i}.csv"
-            results_array = np.array(self.render_data[:, :, i])
             np.savetxt(
-                f"{dir_name}/{band_name}", results_array, delimiter=","
+                f"{dir_name}/{band_name}", render[:, :, i], delimiter=","
             )
 
     def export_as_tiff(self, output_params):
@@ -0,0 +1,490 @@
+"""Plan Module
+
+Estimates the cost of a case before it is run. The configs are loaded, the
+orbit geometry computed and the scene built as for a run, and the meshes
+are loaded one at a time to count their triangles, but nothing is rendered.
+The plan reports the film size, bands, sample count and path depth, the
+triangles of every part, the film pixels covered by the target and the
+memory needed by the film, the render tensor and the meshes.
+
+The render time is predicted from a calibration profile measured on the
+local machine by rendering a small scene with different sample and band
+counts. The profile fits the time of a render pass as
+
+    overhead + samples * (per_sample + per_sample_band * bands)
+
+where samples is the number of rendered pixels times the sample count.
+"""
+import os
+import json
+import time
+import logging
+import platform
+
+import mitsuba as mi
+import numpy as np
+
+from hysim import input_data
+from hysim import sim
+from hysim.data import cache
+from hysim.data import data_handling as dh
+from hysim.render_cache import get_package_version
+from hysim.scene import frame_transforms as frames
+from hysim.scene import projection
+from hysim.scene import spectra
+from hysim.scene import chaser_satellite as chas
+
+# Calibration profile in the data cache (see hysim.data.cache)
+PROFILE_NAMESPACE = "plan"
+PROFILE_FILE = "calibration.json"
+
+# Bytes stored per mesh face (3 vertex indices) and per vertex (position,
+# normal and texture coordinates)
+MESH_FACE_BYTES = 3 * 4
+MESH_VERTEX_BYTES = (3 + 3 + 2) * 4
+
+# Renders timed by the calibration (film bands, samples per pixel)
+CALIBRATION_RENDERS = [(8, 4), (8, 16), (64, 4), (64, 16), (256, 4)]
+CALIBRATION_FILM = 128
+
+
+def default_profile_path() -> str:
+    """Returns the path of the calibration profile in the data cache
+
+    Returns
+    -------
+    str
+        Path to profile or None if the data cache is disabled
+    """
+    directory = cache.get_cache_directory(PROFILE_NAMESPACE)
+    if directory is None:
+        return None
+    return os.path.join(directory, PROFILE_FILE)
+
+
+def available_memory() -> int:
+    """Returns the physical memory of the machine
+
+    Returns
+    -------
+    int
+        Physical memory in bytes, None if unavailable
+    """
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def calibration_scene(bands: int, max_depth: int) -> dict:
+    """Returns the scene rendered by the calibration
+
+    A diffuse cube lit by a directional emitter fills the film, so every
+    sample hits geometry.
+
+    Parameters
+    ----------
+    bands : int
+        Number of film bands
+    max_depth : int
+        Maximum path depth of the integrator
+
+    Returns
+    -------
+    dict
+        Mitsuba scene dictionary
+    """
+    wavelengths = np.linspace(400, 900, bands + 1)
+    film = chas.SpectralFilm(
+        spectra.film_response(
+            "hyperspectral", wavelengths, np.ones_like(wavelengths)
+        ),
+        CALIBRATION_FILM,
+        CALIBRATION_FILM,
+    )
+    film.build_dict()
+
+    return {
+        "type": "scene",
+        "integrator": {"type": "path", "max_depth": max_depth},
+        "sensor": {
+            "type": "perspective",
+            "fov": 30,
+            "film": film.film_dict,
+            "to_world": mi.ScalarTransform4f.look_at(
+                origin=[3, 2, 2], target=[0, 0, 0], up=[0, 0, 1]
+            ),
+        },
+        "sun_emitter": {"type": "directional", "direction": [-1, -0.5, -2]},
+        "cube": {"type": "cube", "bsdf": {"type": "diffuse"}},
+    }
+
+
+def calibrate(
+    variant: str = "scalar_spectral", max_depth: int = 8, repeat: int = 2
+) -> dict:
+    """Measures the render time model of the local machine
+
+    Parameters
+    ----------
+    variant : str, optional
+        Mitsuba variant to calibrate, by default "scalar_spectral"
+    max_depth : int, optional
+        Maximum path depth of the calibration renders, by default 8
+    repeat : int, optional
+        Times each render is repeated (the fastest is kept), by default 2
+
+    Returns
+    -------
+    dict
+        Calibration profile with the fitted coefficients [s] and the
+        machine, variant and versions it was measured with
+    """
+    mi.set_variant(variant)
+    pixels = CALIBRATION_FILM**2
+    features = []
+    durations = []
+
+    for bands, spp in CALIBRATION_RENDERS:
+        scene = mi.load_dict(calibration_scene(bands, max_depth))
+        best = np.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            np.array(mi.render(scene, spp=spp))
+            best = min(best, time.perf_counter() - start)
+
+        logging.info(
+            "Calibration: %d bands, %d spp: %0.3fs", bands, spp, best
+        )
+        features.append([1, pixels * spp, pixels * spp * bands])
+        durations.append(best)
+
+    coefficients = np.linalg.lstsq(
+        np.array(features, dtype=np.float64),
+        np.array(durations),
+        rcond=None,
+    )[0]
+    coefficients = np.maximum(coefficients, 0.0)
+
+    return {
+        "variant": variant,
+        "max_depth": max_depth,
+        "overhead": float(coefficients[0]),
+        "per_sample": float(coefficients[1]),
+        "per_sample_band": float(coefficients[2]),
+        "machine": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "mitsuba_version": get_package_version("mitsuba"),
+        "created": time.time(),
+    }
+
+
+def save_profile(profile: dict, path: str):
+    """Writes a calibration profile to a json file
+
+    Parameters
+    ----------
+    profile : dict
+        Calibration profile from calibrate
+    path : str
+        Path to profile
+    """
+    text = json.dumps(profile, indent=4)
+    cache.write_atomic(path, lambda file: file.write(text.encode("utf-8")))
+
+
+def load_profile(path: str) -> dict:
+    """Reads a calibration profile
+
+    Parameters
+    ----------
+    path : str
+        Path to profile
+
+    Returns
+    -------
+    dict
+        Calibration profile or None if the file does not exist
+    """
+    if path is None or not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def predict_render_time(
+    profile: dict, pixels: int, spp: int, bands: int, passes: int = 1
+) -> float:
+    """Predicts the render time of a frame from a calibration profile
+
+    Parameters
+    ----------
+    profile : dict
+        Calibration profile from calibrate
+    pixels : int
+        Rendered film pixels
+    spp : int
+        Samples per pixel
+    bands : int
+        Number of film bands (over all passes)
+    passes : int, optional
+        Number of band group passes, by default 1
+
+    Returns
+    -------
+    float
+        Predicted render time [s]
+    """
+    samples = pixels * spp
+    return (
+        passes * (profile["overhead"] + samples * profile["per_sample"])
+        + samples * bands * profile["per_sample_band"]
+    )
+
+
+def shape_statistics(shape_dict: dict) -> dict:
+    """Loads a shape to count its triangles and find its bounding box
+
+    Nested objects such as materials are not loaded.
+
+    Parameters
+    ----------
+    shape_dict : dict
+        Shape dictionary from the scene dictionary
+
+    Returns
+    -------
+    dict
+        Triangle and vertex counts (0 for analytic shapes), memory of the
+        mesh [bytes] and bounding box corners
+    """
+    shape = mi.load_dict(
+        {
+            key: value
+            for key, value in shape_dict.items()
+            if value is not None and not isinstance(value, dict)
+        }
+    )
+    triangles = vertices = 0
+    if isinstance(shape, mi.Mesh):
+        triangles = shape.face_count()
+        vertices = shape.vertex_count()
+
+    return {
+        "triangles": triangles,
+        "vertices": vertices,
+        "memory_bytes": triangles * MESH_FACE_BYTES
+        + vertices * MESH_VERTEX_BYTES,
+        "bbox": (np.array(shape.bbox().min), np.array(shape.bbox().max)),
+    }
+
+
+def geometry_statistics(scene) -> dict:
+    """Counts the triangles of the target, debris and Earth
+
+    Parameters
+    ----------
+    scene : sc.SceneBuilder
+        Builder holding the scene objects and final scene dictionary
+
+    Returns
+    -------
+    dict
+        Triangles of each target part, debris group and the Earth, total
+        triangles, mesh memory [bytes] and the bounding box corners of
+        the target
+    """
+    parts = {}
+    corners = []
+    memory = 0
+    for name in scene.target.shape_names():
+        statistics = shape_statistics(scene.scene_dict[name])
+        parts[name] = statistics["triangles"]
+        memory += statistics["memory_bytes"]
+        corners.append(projection.bounding_box_corners(*statistics["bbox"]))
+
+    debris = {}
+    for group in scene.debris.groups:
+        statistics = [shape_statistics(part.part_dict) for part in group.parts]
+        # Instances share the meshes of their group
+        triangles = sum(shape["triangles"] for shape in statistics)
+        memory += sum(shape["memory_bytes"] for shape in statistics)
+        debris[group.name] = {
+            "instances": len(group.placements),
+            "triangles": triangles * len(group.placements),
+        }
+
+    earth = None
+    if "earth" in scene.earth.earth_dict:
+        statistics = shape_statistics(scene.earth.earth_dict["earth"])
+        earth = {"model": scene.earth.model, **statistics}
+        del earth["bbox"]
+        memory += statistics["memory_bytes"]
+
+    return {
+        "parts": parts,
+        "debris": debris,
+        "earth": earth,
+        "triangles": sum(parts.values())
+        + sum(group["triangles"] for group in debris.values())
+        + (earth["triangles"] if earth else 0),
+        "mesh_memory_bytes": memory,
+        "target_corners": np.concatenate(corners) if corners else None,
+    }
+
+
+def plan_case(
+    run_directory: str, profile: dict = None, memory_limit: int = None
+) -> dict:
+    """Estimates the cost of a case without rendering it
+
+    The scene is built at the mission epoch. Trajectory cases render a
+    frame at every epoch, so their render time is multiplied by the
+    number of frames.
+
+    Parameters
+    ----------
+    run_directory : str
+        Path to the case directory
+    profile : dict, optional
+        Calibration profile from calibrate, by default None (no time
+        prediction)
+    memory_limit : int, optional
+        Memory available to the case [bytes], by default None (physical
+        memory of the machine)
+
+    Returns
+    -------
+    dict
+        Film, sampling, geometry, memory and time estimates of the case
+    """
+    user_inputs = input_data.Configs()
+    user_inputs.load_configs(run_directory)
+    case_config = user_inputs.case_config
+    mission_config = user_inputs.mission_config
+
+    with frames.MissionInputProcessor(
+        mission_config, dh.get_kernel_paths()
+    ) as orbit_data:
+        mi.set_variant(case_config["mitsuba_variant"])
+        scene = sim.build_scene(user_inputs, orbit_data)
+        geometry = geometry_statistics(scene)
+
+    sensor_dict = scene.scene_dict["sensor"]
+    film_dict = sensor_dict["film"]
+    width, height = film_dict["width"], film_dict["height"]
+    bands = len(
+        [
+            key
+            for key, value in film_dict.items()
+            if isinstance(value, dict) and key != "rfilter"
+        ]
+    )
+    camera = (
+        sensor_dict["fov"],
+        sensor_dict.get("fov_axis", "x"),
+        width,
+        height,
+    )
+
+    coverage = None
+    if geometry["target_corners"] is not None:
+        coverage = projection.footprint_window(
+            geometry["target_corners"],
+            np.array(scene.chaser.to_world().matrix),
+            *camera,
+        )
+    coverage_pixels = coverage[2] * coverage[3] if coverage else 0
+
+    # Film window rendered in each pass
+    rendered_pixels = width * height
+    if "region_of_interest" in case_config and coverage is not None:
+        margin = dict(
+            sim.REGION_OF_INTEREST_DEFAULTS,
+            **(case_config["region_of_interest"] or {}),
+        )["margin"]
+        window = projection.footprint_window(
+            geometry["target_corners"],
+            np.array(scene.chaser.to_world().matrix),
+            *camera,
+            margin=margin,
+        )
+        rendered_pixels = window[2] * window[3]
+
+    group_size = bands
+    if "band_groups" in case_config:
+        group_size = min(
+            bands,
+            sim.band_group_size(
+                bands,
+                width,
+                height,
+                **dict(
+                    sim.BAND_GROUP_DEFAULTS,
+                    **(case_config["band_groups"] or {}),
+                ),
+            ),
+        )
+    passes = -(-bands // group_size)
+
+    spp = case_config["sampler"]["sample_count"]
+    if "progressive" in case_config:
+        # Passes stop when converged, the maximum is an upper bound
+        spp = dict(
+            sim.PROGRESSIVE_DEFAULTS, **(case_config["progressive"] or {})
+        )["max_sample_count"]
+
+    frame_count = 1
+    if "trajectory" in mission_config:
+        frame_count = len(
+            frames.get_trajectory_epochs(mission_config["trajectory"])
+        )
+
+    float_size = np.dtype(np.float32).itemsize
+    film_memory = rendered_pixels * group_size * float_size * sim.FILM_BUFFERS
+    tensor_memory = width * height * bands * float_size
+    total_memory = film_memory + tensor_memory + geometry["mesh_memory_bytes"]
+    if memory_limit is None:
+        memory_limit = available_memory()
+
+    render_time = None
+    if profile is not None:
+        if profile["variant"] != case_config["mitsuba_variant"]:
+            logging.warning(
+                "Calibration profile measured with %s, case uses %s",
+                profile["variant"],
+                case_config["mitsuba_variant"],
+            )
+        render_time = frame_count * predict_render_time(
+            profile, rendered_pixels, spp, bands, passes
+        )
+
+    return {
+        "case": run_directory,
+        "variant": case_config["mitsuba_variant"],
+        "film": {"width": width, "height": height, "pixels": width * height},
+        "bands": bands,
+        "band_passes": passes,
+        "sample_count": spp,
+        "progressive": "progressive" in case_config,
+        "max_depth": case_config["integrator"].get("max_depth"),
+        "frames": frame_count,
+        "parts": geometry["parts"],
+        "debris": geometry["debris"],
+        "earth": geometry["earth"],
+        "triangles": geometry["triangles"],
+        "target_window": list(coverage) if coverage else None,
+        "target_pixels": coverage_pixels,
+        "target_coverage": coverage_pixels / (width * height),
+        "rendered_pixels": rendered_pixels,
+        "memory": {
+            "film_bytes": film_memory,
+            "tensor_bytes": tensor_memory,
+            "mesh_bytes": geometry["mesh_memory_bytes"],
+            "total_bytes": total_memory,
+            "limit_bytes": memory_limit,
+        },
+        "exceeds_memory": memory_limit is not None
+        and total_memory > memory_limit,
+        "render_time": render_time,
+    }
@@ -0,0 +1,333 @@
+"""Render Cache Module
+
+Stores rendered tensors and their render metadata on disk keyed on everything
+that determines the render: the scene dictionary (with object transforms),
+the contents of the mesh and spectrum files it references, the sample count
+and render settings, the Mitsuba variant and the Mitsuba and hysim
+versions. Rerunning an unchanged case (e.g. to export another output format)
+loads the render instead of running Mitsuba.
+
+The cache is kept in the ``renders`` directory of the data cache (see
+hysim.data.cache). The least recently used renders are removed when the
+cache grows beyond its maximum size.
+"""
+import os
+import json
+import logging
+import hashlib
+from importlib import metadata
+
+import numpy as np
+
+from hysim.data import cache
+
+# Default maximum size of the render cache
+DEFAULT_MAX_SIZE_MB = 2048
+
+# Content hashes of referenced files keyed on the file version
+_file_hashes = {}
+
+
+class UncacheableScene(Exception):
+    """Exception for scene dictionaries that cannot be keyed reliably"""
+    pass
+
+
+def hash_file(file_path: str) -> str:
+    """Returns hash of file contents
+
+    Hashes are kept for the life of the process and recomputed if the file
+    modification time or size changes.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to file
+
+    Returns
+    -------
+    str
+        Hex digest of file contents
+    """
+    key = cache.file_key(file_path)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def encode_scene_value(value, key: str = None):
+    """Converts a scene dictionary value into json serialisable data
+
+    Transforms are replaced by their matrix and referenced files by the
+    hash of their contents.
+
+    Parameters
+    ----------
+    value : object
+        Value from scene dictionary
+    key : str, optional
+        Dictionary key of the value, by default None
+
+    Returns
+    -------
+    object
+        Json serialisable representation of the value
+
+    Raises
+    ------
+    UncacheableScene
+        If the value has no reproducible representation
+    """
+    if isinstance(value, dict):
+        return {
+            str(item_key): encode_scene_value(item, item_key)
+            for item_key, item in value.items()
+        }
+    if key == "filename" and isinstance(value, str):
+        return {"file_hash": hash_file(value)}
+    if isinstance(value, (str, bool, int, float)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [encode_scene_value(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if hasattr(value, "matrix"):
+        return np.array(value.matrix).tolist()
+
+    representation = repr(value)
+    if " at 0x" in representation:
+        raise UncacheableScene(f"Cannot key {type(value).__name__} objects")
+    return representation
+
+
+def get_package_version(package: str) -> str:
+    """Returns installed version of a package
+
+    Parameters
+    ----------
+    package : str
+        Distribution name of the package
+
+    Returns
+    -------
+    str
+        Version string (or "unknown" if the package is not installed)
+    """
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class RenderCache:
+    """Cache of rendered tensors on disk
+
+    Attributes
+    ----------
+    cache_directory : str
+        Path to directory holding cached renders
+    max_size : int
+        Maximum total size of cached renders in bytes
+
+    Methods
+    -------
+    from_config(case_config)
+        Creates the render cache configured for a case
+    key(scene_dict, variant, transforms, spp)
+        Returns the cache key of a render
+    load(key)
+        Returns cached render or None
+    store(key, render)
+        Stores render and removes least recently used renders
+    evict()
+        Removes least recently used renders above the maximum size
+    """
+
+    def __init__(
+        self, cache_directory: str, max_size_mb: float = DEFAULT_MAX_SIZE_MB
+    ):
+        """Initializer
+
+        Parameters
+        ----------
+        cache_directory : str
+            Path to directory holding cached renders
+        max_size_mb : float, optional
+            Maximum total size of cached renders in megabytes, by default
+            DEFAULT_MAX_SIZE_MB
+        """
+        self.cache_directory = cache_directory
+        self.max_size = int(max_size_mb * 1024**2)
+
+    @classmethod
+    def from_config(cls, case_config: dict):
+        """Creates the render cache configured for a case
+
+        The ``render_cache`` entry of the case config is either a boolean
+        or a dictionary with ``enabled`` and ``max_size_mb`` entries. The
+        cache is enabled by default.
+
+        Parameters
+        ----------
+        case_config : dict
+            Case config
+
+        Returns
+        -------
+        RenderCache
+            Render cache or None if caching is disabled
+        """
+        settings = case_config.get("render_cache", True)
+        if not isinstance(settings, dict):
+            settings = {"enabled": bool(settings)}
+
+        cache_directory = cache.get_cache_directory("renders")
+        if not settings.get("enabled", True) or cache_directory is None:
+            return None
+
+        return cls(
+            cache_directory,
+            settings.get("max_size_mb", DEFAULT_MAX_SIZE_MB),
+        )
+
+    def key(
+        self,
+        scene_dict: dict,
+        variant: str,
+        transforms: dict = None,
+        spp: int = 0,
+        settings: dict = None,
+    ) -> str:
+        """Returns the cache key of a render
+
+        Parameters
+        ----------
+        scene_dict : dict
+            Scene dictionary loaded into Mitsuba
+        variant : str
+            Mitsuba variant
+        transforms : dict, optional
+            Object transforms replacing those in the scene dictionary (see
+            SceneBuilder.object_transforms), by default None
+        spp : int, optional
+            Samples per pixel overriding the sampler sample count, by
+            default 0
+        settings : dict, optional
+            Render settings (e.g. progressive rendering), by default None
+
+        Returns
+        -------
+        str
+            Cache key or None if the scene cannot be keyed reliably
+        """
+        scene_dict = dict(scene_dict)
+        for object_id, to_world in (transforms or {}).items():
+            if isinstance(scene_dict.get(object_id), dict):
+                scene_dict[object_id] = dict(
+                    scene_dict[object_id], to_world=to_world
+                )
+
+        try:
+            encoded_scene = encode_scene_value(scene_dict)
+        except (UncacheableScene, OSError) as error:
+            logging.debug("Render not cached: %s", error)
+            return None
+
+        contents = json.dumps(
+            [
+                encoded_scene,
+                variant,
+                spp,
+                settings,
+                get_package_version("mitsuba"),
+                get_package_version("hysim"),
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(contents.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Returns path to cached render"""
+        return os.path.join(self.cache_directory, key + ".npz")
+
+    def load(self, key: str) -> tuple:
+        """Returns cached render
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+
+        Returns
+        -------
+        render : np.ndarray
+            Render tensor or None if the render is not cached
+        metadata : dict
+            Render metadata stored with the render
+        """
+        if key is None:
+            return None, None
+
+        path = self._path(key)
+        try:
+            with np.load(path) as cached:
+                render = cached["render"]
+                metadata = json.loads(str(cached["metadata"]))
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+        # Modification time marks when a render was last used
+        os.utime(path)
+        return render, metadata
+
+    def store(self, key: str, render, metadata: dict = None):
+        """Stores render and removes least recently used renders
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        render : TensorXf
+            Render tensor
+        metadata : dict, optional
+            Render metadata (json serialisable), by default None
+        """
+        if key is None:
+            return
+
+        array = np.array(render)
+        if array.nbytes > self.max_size:
+            return
+
+        try:
+            cache.write_atomic(
+                self._path(key),
+                lambda file: np.savez(
+                    file, render=array, metadata=json.dumps(metadata or {})
+                ),
+            )
+            self.evict()
+        except OSError as error:
+            logging.debug("Could not cache render: %s", error)
+
+    def evict(self):
+        """Removes least recently used renders above the maximum size"""
+        entries = []
+        for entry in os.scandir(self.cache_directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
@@ -228,6 +228,8 @@ class Chaser:
     -------
     __return_mitsuba_transform
         Returns mitsuba scalar transform
+    to_world
+        Returns transform placing the sensor in the scene
     build_dict
         Builds dict describing chaser
     """
@@ -260,31 +262,35 @@ class Chaser:
             .rotate(axis=[0, 0, 1], angle=np.rad2deg(self.attitude[2]))
         )
 
+    def to_world(self):
+        """Returns the transform placing the sensor in the scene
+
+        If the attitude is defined is "lookat" then a lookat transform
+        is used. This calculates the required attitude to look at the
+        target. Else the attitude and position provided is applied by
+        calculating a transform (see _return_mitsuba_tranform).
+
+        Returns
+        -------
+        mi.ScalarTransform4f
+            Sensor transform
+        """
+        if self.attitude == "lookat":
+            return mi.ScalarTransform4f.look_at(
+                origin=self.position,
+                target=[0, 0, 0],
+                up=[0, 0, -1],  # Assumed +z is nadir
+            )
+
+        return self.__return_mitsuba_transform()
+
     def build_dict(self):
         """Builds the dictionary describing chaser sensor and
         location/attitude
 
         Builds sensor dictionary and adds location of chaser to define
-        the chaser dict for loading into mitsuba. If the attitude is
-        defined is "lookat" then a lookat transform is used. This
-        calculates the required attitude to look at the target. Else
-        the attitude and position provided is applied by calculating a
-        transform (see _return_mitsuba_tranform).
+        the chaser dict for loading into mitsuba.
         """
         self.sensor.build_dict()
         self.chaser_dict.update(self.sensor.sensor_dict)
-
-        if self.attitude == "lookat":
-            self.chaser_dict["sensor"].update(
-                {
-                    "to_world": mi.ScalarTransform4f.look_at(
-                        origin=self.position,
-                        target=[0, 0, 0],
-                        up=[0, 0, -1],  # Assumed +z is nadir
-                    )
-                }
-            )
-        else:
-            self.chaser_dict["sensor"].update(
-                {"to_world": self.__return_mitsuba_transform()}
-            )
+        self.chaser_dict["sensor"].update({"to_world": self.to_world()})
@@ -0,0 +1,236 @@
+"""Debris Module
+
+Classes to place many copies of the same objects in the scene, such as a
+cloud of fragments or a cluster of CubeSats. The meshes of an object are
+declared once as a Mitsuba shapegroup and each copy is an instance of the
+group with its own transform, so meshes are loaded once however many
+copies are placed. Positions and attitudes of the copies are read from an
+array file.
+"""
+import os
+
+import mitsuba as mi
+import numpy as np
+
+from hysim.scene import target_satellite as targ
+
+
+def load_placements(file_path: str) -> np.ndarray:
+    """Loads the positions and attitudes of instances from an array file
+
+    Files are NumPy .npy arrays or text files (comma separated for .csv,
+    otherwise whitespace separated) with one row per instance. Rows are
+    [x, y, z] or [x, y, z, rx, ry, rz] with the position relative to the
+    target in LVLH and the attitude as angles around the x, y and z axes
+    [rad].
+
+    Parameters
+    ----------
+    file_path : str
+        Path to array file
+
+    Returns
+    -------
+    np.ndarray
+        Positions and attitudes, shape (N, 6)
+
+    Raises
+    ------
+    ValueError
+        If the array does not have 3 or 6 columns
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".npy":
+        placements = np.load(file_path)
+    else:
+        placements = np.loadtxt(
+            file_path,
+            delimiter="," if extension == ".csv" else None,
+            ndmin=2,
+        )
+
+    placements = np.asarray(placements, dtype=np.float64)
+    if placements.ndim != 2 or placements.shape[1] not in (3, 6):
+        raise ValueError(
+            f"{file_path} must have 3 (position) or 6 (position and "
+            f"attitude) columns, found shape {placements.shape}"
+        )
+
+    if placements.shape[1] == 3:
+        placements = np.hstack([placements, np.zeros_like(placements)])
+    return placements
+
+
+class InstanceGroup:
+    """Identical objects placed as instances of a Mitsuba shapegroup
+
+    Attributes
+    ----------
+    name : str
+        Group name, used as the shapegroup id
+    parts : list[targ.PartBuilder]
+        Parts (mesh and material) making up one object
+    placements : np.ndarray
+        Position relative to the reference position and attitude of each
+        instance, shape (N, 6)
+
+    Methods
+    -------
+    add_part(part)
+        Appends a part to the object
+    instance_names
+        Returns the names of the instances in the scene dictionary
+    to_world(position)
+        Returns the transform of each instance
+    build_dict(position)
+        Builds the shapegroup and instance dictionaries
+    """
+
+    def __init__(self, name: str, placements: np.ndarray):
+        """Initializer
+
+        Parameters
+        ----------
+        name : str
+            Group name
+        placements : np.ndarray
+            Position and attitude of each instance, shape (N, 6)
+        """
+        self.name = name
+        self.parts = []
+        self.placements = placements
+
+    def add_part(self, part: targ.PartBuilder):
+        """Appends a part to the object
+
+        Parameters
+        ----------
+        part : targ.PartBuilder
+            Part with mesh and material
+        """
+        self.parts.append(part)
+
+    def instance_names(self) -> list:
+        """Returns the names of the instances in the scene dictionary
+
+        Returns
+        -------
+        list
+            Instance names e.g. bolts_0, bolts_1, ...
+        """
+        return [
+            f"{self.name}_{index}" for index in range(len(self.placements))
+        ]
+
+    def to_world(self, position: list) -> dict:
+        """Returns the transform of each instance
+
+        Parameters
+        ----------
+        position : list
+            Reference position (the target position) [x, y, z]
+
+        Returns
+        -------
+        dict
+            Transforms keyed by instance name
+        """
+        transforms = {}
+        for name, placement in zip(self.instance_names(), self.placements):
+            attitude = np.rad2deg(placement[3:])
+            transforms[name] = (
+                mi.ScalarTransform4f.translate(
+                    (np.asarray(position) + placement[:3]).tolist()
+                )
+                .rotate(axis=[1, 0, 0], angle=attitude[0])
+                .rotate(axis=[0, 1, 0], angle=attitude[1])
+                .rotate(axis=[0, 0, 1], angle=attitude[2])
+            )
+        return transforms
+
+    def build_dict(self, position: list) -> dict:
+        """Builds the shapegroup and instance dictionaries
+
+        Parameters
+        ----------
+        position : list
+            Reference position (the target position) [x, y, z]
+
+        Returns
+        -------
+        dict
+            Shapegroup and instance dictionaries keyed by name
+        """
+        shapegroup = {"type": "shapegroup"}
+        for part in self.parts:
+            shape_dict = dict(part.part_dict)
+            shape_dict.pop("to_world", None)
+            shapegroup[part.name] = shape_dict
+
+        group_dict = {self.name: shapegroup}
+        for name, to_world in self.to_world(position).items():
+            group_dict[name] = {
+                "type": "instance",
+                "shapegroup": {"type": "ref", "id": self.name},
+                "to_world": to_world,
+            }
+        return group_dict
+
+
+class DebrisField:
+    """Groups of instanced objects around the target
+
+    Attributes
+    ----------
+    groups : list[InstanceGroup]
+        Instance groups in the field
+    position : list
+        Reference position of the placements (the target position in
+        LVLH) [x, y, z]
+    debris_dict : dict
+        Dictionary defining the shapegroups and instances
+
+    Methods
+    -------
+    add_group(group)
+        Appends an instance group to the field
+    to_world
+        Returns the transform of every instance
+    build_dict
+        Builds dictionary describing the field in the scene
+    """
+
+    def __init__(self):
+        """Initializer"""
+        self.groups = []
+        self.position = [0, 0, 0]
+        self.debris_dict = {}
+
+    def add_group(self, group: InstanceGroup):
+        """Appends an instance group to the field
+
+        Parameters
+        ----------
+        group : InstanceGroup
+            New instance group
+        """
+        self.groups.append(group)
+
+    def to_world(self) -> dict:
+        """Returns the transform of every instance
+
+        Returns
+        -------
+        dict
+            Transforms keyed by instance name
+        """
+        transforms = {}
+        for group in self.groups:
+            transforms.update(group.to_world(self.position))
+        return transforms
+
+    def build_dict(self):
+        """Builds dictionary describing the field in the scene"""
+        self.debris_dict = {}
+        for group in self.groups:
+            self.debris_dict.update(group.build_dict(self.position))
@@ -5,9 +5,11 @@ frames to the local vertical local horizontal frame of the target.
 """
 import numpy as np
 
-# from dataclasses import dataclass
+from dataclasses import dataclass
 import spiceypy as spice
 
+from hysim.data.kernel_manager import spice_kernels
+
 # Constants
 MU_EARTH = 3.986004418e5
 
@@ -76,7 +78,9 @@ def calculate_perifocal_distance(
     return semi_major_axis * np.abs(1 - eccentricity)
 
 
-def convert_kepler_to_state_vectors(elements: list, epoch: float) -> list:
+def convert_kepler_to_state_vectors(
+    elements: list, epoch: float, reference_epoch: float = None
+) -> list:
     """Performs calculations to convert keplerian elements to state
     in ECI.
 
@@ -91,12 +95,18 @@ def convert_kepler_to_state_vectors(elements: list, epoch: float) -> list:
         [a, e, i, raan, arg, nu]
     epoch : float
         Epoch at the imaging time TDB seconds past J2000
+    reference_epoch : float, optional
+        Epoch at which the elements are defined TDB seconds past J2000,
+        by default None (elements are defined at the imaging time)
 
     Returns
     -------
     list
         State vectors as list [x, y, z, vx, vy, vz] [m/s]
     """
+    if reference_epoch is None:
+        reference_epoch = epoch
+
     perifocal_distance = calculate_perifocal_distance(elements[0], elements[1])
 
     # TODO: Confirm prefered input, uncomment this code to take in true anomaly
@@ -112,13 +122,83 @@ def convert_kepler_to_state_vectors(elements: list, epoch: float) -> list:
             perifocal_distance,
             *elements[1:5],
             mean_anomaly,
-            epoch,
+            reference_epoch,
             MU_EARTH,
         ],
         epoch,
     )*1000
 
 
+def propagate_state_vectors(state_vectors: list, time_step: float) -> list:
+    """Propagates state vectors in ECI with two body motion
+
+    Parameters
+    ----------
+    state_vectors : list
+        State vectors as list [x, y, z, vx, vy, vz] [km, km/s]
+    time_step : float
+        Time to propagate the state vectors by [s]
+
+    Returns
+    -------
+    list
+        Propagated state vectors as list [x, y, z, vx, vy, vz] [km, km/s]
+    """
+    return spice.prop2b(MU_EARTH, state_vectors, time_step)
+
+
+def get_trajectory_epochs(trajectory_config: dict) -> np.array:
+    """Returns the epochs of each frame of a trajectory case
+
+    Epochs are either listed explicitly with the ``epochs`` entry or
+    generated from the ``start``, ``stop`` and ``step`` entries. The stop
+    epoch is included when it falls on a step.
+
+    Parameters
+    ----------
+    trajectory_config : dict
+        Trajectory entry of the mission config
+
+    Returns
+    -------
+    np.array
+        Epochs in TDB seconds past J2000
+
+    Raises
+    ------
+    ValueError
+        If the trajectory entry defines neither an epoch list nor a
+        start/stop/step range, if the epoch list is empty, if the step is
+        not positive or if the stop epoch is before the start epoch
+    """
+    if "epochs" in trajectory_config:
+        if not trajectory_config["epochs"]:
+            raise ValueError("Trajectory epoch list is empty")
+        return np.array(
+            [
+                spice_kernels.str2et(epoch)
+                for epoch in trajectory_config["epochs"]
+            ]
+        )
+
+    try:
+        start = spice_kernels.str2et(trajectory_config["start"])
+        stop = spice_kernels.str2et(trajectory_config["stop"])
+        step = float(trajectory_config["step"])
+    except KeyError as error:
+        raise ValueError(
+            "Trajectory requires 'epochs' or 'start', 'stop' and 'step'"
+        ) from error
+
+    if step <= 0:
+        raise ValueError("Trajectory step must be greater than zero")
+    if stop < start:
+        raise ValueError("Trajectory stop epoch is before the start epoch")
+
+    frame_count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return start + step * np.arange(frame_count)
+
+
 def check_for_null(tle_data: list) -> float:
     """Adds a null to first line of tle if there is not a null
 
@@ -137,6 +217,26 @@ def check_for_null(tle_data: list) -> float:
     return tle_data
 
 
+def read_tle(tle_data: list) -> tuple:
+    """Reads two line element set and geophysical constants for SGP4
+
+    Parameters
+    ----------
+    tle_data : list
+        List of tle strings
+
+    Returns
+    -------
+    geophs : list
+        Geophysical constants [J2, J3, J4, KE, QO, SO, ER, AE]
+    tle_elements : np.array
+        Elements read from the two line element set
+    """
+    tle_data = check_for_null(tle_data)
+    [_, tle_elements] = spice.getelm(1957, len(tle_data[0]), tle_data)
+    return spice_kernels.geophysical_constants(), tle_elements
+
+
 def convert_tle_to_state_vectors(tle_data: list, epoch: float) -> list:
     """Converts two line element set to state vectors in ECI
 
@@ -152,13 +252,7 @@ def convert_tle_to_state_vectors(tle_data: list, epoch: float) -> list:
     list
         State vectors as list [x, y, z, vx, vy, vz] [m/s]
     """
-    tle_data = check_for_null(tle_data)
-    [_, tle_elements] = spice.getelm(1957, len(tle_data[0]), tle_data)
-    geoph_data_list = ["J2", "J3", "J4", "KE", "QO", "SO", "ER", "AE"]
-    geophs = [
-        float(spice.bodvrd("EARTH", geoph_data, 1)[1])
-        for geoph_data in geoph_data_list
-    ]
+    geophs, tle_elements = read_tle(tle_data)
     return spice.evsgp4(epoch, geophs, tle_elements) * 1000
 
 
@@ -219,24 +313,156 @@ def convert_tle_to_state_vectors(tle_data: list, epoch: float) -> list:
 #     ) * 1000
 
 
-def compute_eci_to_lvlh_rotation_matrix(state):
+def compute_eci_to_lvlh_rotation_matrix(state: np.array) -> np.array:
+    """Determines rotation matrix used to convert ECI to LVLH
+
+    Accepts a single state vector or an array of state vectors (one per
+    row) to compute the matrices of many epochs at once.
+
+    Parameters
+    ----------
+    state : np.array
+        State vectors [x, y, z, vx, vy, vz] with shape (6,) or (N, 6)
+
+    Returns
+    -------
+    np.array
+        ECI -> LVLH transformation matrix with shape (3, 3) or (N, 3, 3)
+    """
+    state = np.asarray(state)
+    position = state[..., :3]
+
     # Angular momentum of target
-    angular_momentum = np.cross(state[:3], state[3:])
+    angular_momentum = np.cross(position, state[..., 3:6])
 
     # Unit vectors of the co-moving frame
-    k = (state[:3]/np.linalg.norm(state[:3]))
-    j = -angular_momentum/np.linalg.norm(-angular_momentum)
+    k = position / np.linalg.norm(position, axis=-1, keepdims=True)
+    j = -angular_momentum / np.linalg.norm(
+        angular_momentum, axis=-1, keepdims=True
+    )
     i = np.cross(j, k)
 
-    return np.array([i, j, k])
+    return np.stack([i, j, k], axis=-2)
+
 
+def convert_eci_to_lvlh(
+    state: np.array, transformation_matrix: np.array, origin: np.array
+) -> np.array:
+    """Converts position in ECI to the LVLH frame at origin
 
-def convert_eci_to_lvlh(state, transformation_matrix, origin):
+    Accepts single or batched inputs (state (N, 6), matrices (N, 3, 3) and
+    origins (N, 3)) which are transformed with a single einsum.
+
+    Parameters
+    ----------
+    state : np.array
+        State vectors [x, y, z, vx, vy, vz] with shape (6,) or (N, 6)
+    transformation_matrix : np.array
+        ECI -> LVLH transformation matrix with shape (3, 3) or (N, 3, 3)
+    origin : np.array
+        Origin of LVLH frame in ECI with shape (3,) or (N, 3)
 
+    Returns
+    -------
+    np.array
+        Coordinates in LVLH frame with shape (3,) or (N, 3)
+    """
     # Relative position
-    Rr = origin - state[:3]
+    relative_position = np.asarray(origin) - np.asarray(state)[..., :3]
+
+    return np.einsum(
+        "...ij,...j->...i", transformation_matrix, relative_position
+    )
+
+
+@dataclass
+class EpochGeometry:
+    """Scene geometry at a single epoch in target centered LVLH
+
+    Provides the same positions as MissionInputProcessor so it can be
+    used as the orbit data of a scene.
+
+    Attributes
+    ----------
+    epoch : float
+        Time in seconds past J2000
+    target_position : np.array
+        Target position [x, y, z]
+    chaser_position : np.array
+        Chaser position [x, y, z]
+    earth_position : np.array
+        Earth position [x, y, z]
+    sun_direction_vector : np.array
+        Sun direction vector
+    """
+
+    epoch: float
+    target_position: np.array
+    chaser_position: np.array
+    earth_position: np.array
+    sun_direction_vector: np.array
+
+
+@dataclass
+class OrbitGeometry:
+    """Scene geometry at many epochs in target centered LVLH
 
-    return np.matmul(transformation_matrix, np.transpose(Rr))
+    Each array has one row per epoch. Indexing returns the EpochGeometry
+    of a single epoch.
+
+    Attributes
+    ----------
+    epochs : np.array
+        Times in seconds past J2000 (N,)
+    local_frame_transforms : np.array
+        ECI -> LVLH rotation matrix at each epoch (N, 3, 3)
+    target_positions : np.array
+        Target positions (N, 3)
+    chaser_positions : np.array
+        Chaser positions (N, 3)
+    earth_positions : np.array
+        Earth positions (N, 3)
+    sun_directions : np.array
+        Sun direction vectors (N, 3)
+    """
+
+    epochs: np.array
+    local_frame_transforms: np.array
+    target_positions: np.array
+    chaser_positions: np.array
+    earth_positions: np.array
+    sun_directions: np.array
+
+    def __len__(self) -> int:
+        """Returns number of epochs
+
+        Returns
+        -------
+        int
+            Number of epochs
+        """
+        return len(self.epochs)
+
+    def __getitem__(self, index: int) -> EpochGeometry:
+        """Returns geometry at a single epoch
+
+        Parameters
+        ----------
+        index : int
+            Index of the epoch
+
+        Returns
+        -------
+        EpochGeometry
+            Scene geometry at the epoch
+        """
+        return EpochGeometry(
+            self.epochs[index],
+            self.target_positions[index],
+            self.chaser_positions[index],
+            self.earth_positions[index],
+            self.sun_directions[index],
+        )
 
 
 class MissionInputProcessor:
@@ -246,8 +472,12 @@ class MissionInputProcessor:
 
     Attributes
     ----------
+    kernel_paths : list
+        Paths to kernels held by the processor
     mission_config : dict
         User data defined in the mission config file
+    reference_epoch : float
+        Time of the mission datetime in seconds past J2000
     epoch : float
         Time in seconds past J2000
     location_formats : dict
@@ -265,11 +495,20 @@ class MissionInputProcessor:
 
     Methods
     -------
+    release_kernels()
+        Releases the kernels used by the processor
+    set_epoch(epoch)
+        Recalculates state vectors and local frame at a new epoch
+    compute_geometry(epochs)
+        Calculates scene geometry at many epochs at once
     get_sun_location()
         Calculates sun position from ephem data
-    load_state_vectors(location_vector)
-        Assign state vectors without conversion. This is only
-        used in case where user defines orbit in ECI state vectors
+    get_sun_locations(epochs)
+        Calculates sun position at many epochs
+    load_state_vectors(location_vector, epoch)
+        Converts state vectors in ECI defined at the reference epoch
+    load_kepler_elements(elements, epoch)
+        Converts keplerian elements defined at the reference epoch
     convert_input(scene_object)
         Use user inputs to choose conversion
     convert_inputs_to_state_vectors()
@@ -292,18 +531,22 @@ class MissionInputProcessor:
         ----------
         mission_config : dict
             Dictionary retrieved from mission config file
-        kernel_paths : str
-            Path to kernel
+        kernel_paths : list
+            Paths to kernels
         """
 
         # Initialise Kernels
-        spice.furnsh(kernel_paths)
+        self.kernel_paths = list(kernel_paths)
+        spice_kernels.furnish(self.kernel_paths)
         # Load configs
         self.mission_config = mission_config
-        self.epoch = spice.str2et(mission_config["datetime"])
+        self.reference_epoch = spice_kernels.str2et(
+            mission_config["datetime"]
+        )
+        self.epoch = self.reference_epoch
         self.location_formats = {
             "state": self.load_state_vectors,
-            "kep": convert_kepler_to_state_vectors,
+            "kep": self.load_kepler_elements,
             "tle": convert_tle_to_state_vectors,
         }
 
@@ -314,6 +557,39 @@ class MissionInputProcessor:
         self.earth_state_vectors = [0, 0, 0, 0, 0, 0]
 
         # Load inputs and calculate state vectors
+        self.local_frame_transform = None
+        self.set_epoch(self.reference_epoch)
+
+    def __enter__(self):
+        """Returns processor for use as a context manager"""
+        return self
+
+    def __exit__(self, *_):
+        """Releases kernels when leaving the context"""
+        self.release_kernels()
+
+    def release_kernels(self):
+        """Releases the kernels used by the processor
+
+        Kernels are unloaded once no other processor in the process
+        uses them.
+        """
+        spice_kernels.release(self.kernel_paths)
+        self.kernel_paths = []
+
+    def set_epoch(self, epoch: float):
+        """Moves the scene to a new epoch
+
+        Orbits defined by state vectors or keplerian elements are
+        propagated from the reference epoch (mission datetime) and TLEs
+        are propagated by SGP4.
+
+        Parameters
+        ----------
+        epoch : float
+            Epoch in TDB seconds past J2000
+        """
+        self.epoch = epoch
         self.convert_inputs_to_state_vectors()
         self.local_frame_transform = compute_eci_to_lvlh_rotation_matrix(
             self.target_state_vectors
@@ -335,22 +611,81 @@ class MissionInputProcessor:
         )
         return sun_location*1000
 
-    def load_state_vectors(self, location_vector: list, _) -> np.array:
-        """Returns location state vector
+    def get_sun_locations(self, epochs: np.array) -> np.array:
+        """Get location of sun with respect to Earth at many epochs
+
+        Parameters
+        ----------
+        epochs : np.array
+            Times in seconds past J2000 (N,)
+
+        Returns
+        -------
+        np.array
+            Sun state vectors (N, 6)
+        """
+        return (
+            np.array(
+                [
+                    spice.spkez(10, epoch, "J2000", "NONE", 399)[0]
+                    for epoch in epochs
+                ]
+            )
+            * 1000
+        )
+
+    def load_state_vectors(
+        self, location_vector: list, epoch: float
+    ) -> np.array:
+        """Returns state vectors from state vectors defined at the
+        reference epoch
+
+        State vectors are propagated to the epoch if it differs from the
+        reference epoch.
 
         Parameters
         ----------
         location_vector : list
-            Location in ECI (x,y,z)
-        _ : None
-            Dummy input
+            State vectors in ECI [x, y, z, vx, vy, vz] [km, km/s]
+        epoch : float
+            Epoch in TDB seconds past J2000
 
         Returns
         -------
         numpy.array
-            location vector
+            State vectors as array [x, y, z, vx, vy, vz] [m, m/s]
+        """
+        if epoch == self.reference_epoch:
+            return np.array(location_vector) * 1000
+
+        return (
+            np.array(
+                propagate_state_vectors(
+                    location_vector, epoch - self.reference_epoch
+                )
+            )
+            * 1000
+        )
+
+    def load_kepler_elements(self, elements: list, epoch: float) -> list:
+        """Returns state vectors from keplerian elements defined at the
+        reference epoch
+
+        Parameters
+        ----------
+        elements : list
+            Keplerian elements [a, e, i, raan, arg, M]
+        epoch : float
+            Epoch in TDB seconds past J2000
+
+        Returns
+        -------
+        list
+            State vectors as list [x, y, z, vx, vy, vz] [m/s]
         """
-        return np.array(location_vector)
+        return convert_kepler_to_state_vectors(
+            elements, epoch, self.reference_epoch
+        )
 
     def convert_input(self, scene_object: str) -> list:
         """Converts orbit defined in mission configs file to
@@ -370,6 +705,88 @@ class MissionInputProcessor:
         orbit_data = self.mission_config[scene_object]["position"]
         return self.location_formats[input_format](orbit_data, self.epoch)
 
+    def convert_input_at_epochs(
+        self, scene_object: str, epochs: np.array
+    ) -> np.array:
+        """Converts orbit defined in mission configs file to orbit state
+        vectors at many epochs
+
+        Parameters
+        ----------
+        scene_object : str
+            String stating object to be converted
+        epochs : np.array
+            Times in seconds past J2000 (N,)
+
+        Returns
+        -------
+        np.array
+            Orbit state vectors (N, 6)
+        """
+        input_format = self.mission_config[scene_object]["position_frame"]
+        orbit_data = self.mission_config[scene_object]["position"]
+
+        if input_format == "tle":
+            # Elements and constants are read once for all epochs
+            geophs, tle_elements = read_tle(orbit_data)
+            return (
+                np.array(
+                    [
+                        spice.evsgp4(epoch, geophs, tle_elements)
+                        for epoch in epochs
+                    ]
+                )
+                * 1000
+            )
+
+        convert = self.location_formats[input_format]
+        return np.array([convert(orbit_data, epoch) for epoch in epochs])
+
+    def compute_geometry(self, epochs: np.array) -> OrbitGeometry:
+        """Calculates scene geometry at many epochs at once
+
+        State vectors are computed for every epoch and the rotations to
+        the target LVLH frame are applied to all epochs in a batch. The
+        epoch of the processor is not changed.
+
+        Parameters
+        ----------
+        epochs : np.array
+            Times in seconds past J2000 (N,)
+
+        Returns
+        -------
+        OrbitGeometry
+            Positions and sun directions at each epoch
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=float))
+
+        target_states = self.convert_input_at_epochs("target", epochs)
+        chaser_states = self.convert_input_at_epochs("chaser", epochs)
+        sun_states = self.get_sun_locations(epochs)
+        earth_states = np.zeros((len(epochs), 6))
+
+        transforms = compute_eci_to_lvlh_rotation_matrix(target_states)
+        origins = target_states[:, :3]
+
+        sun_positions = convert_eci_to_lvlh(sun_states, transforms, origins)
+
+        return OrbitGeometry(
+            epochs=epochs,
+            local_frame_transforms=transforms,
+            target_positions=convert_eci_to_lvlh(
+                target_states, transforms, origins
+            ),
+            chaser_positions=convert_eci_to_lvlh(
+                chaser_states, transforms, origins
+            ),
+            earth_positions=convert_eci_to_lvlh(
+                earth_states, transforms, origins
+            ),
+            sun_directions=-sun_positions
+            / np.linalg.norm(sun_positions, axis=-1, keepdims=True),
+        )
+
     def convert_inputs_to_state_vectors(self):
         """Calls functions to convert user inputs to LVLH"""
         self.chaser_state_vectors = self.convert_input("chaser")
@@ -0,0 +1,233 @@
+"""Meshes Module
+
+Functions to generate, read, merge and write triangle meshes as binary PLY
+files that Mitsuba loads with its ``ply`` shape.
+"""
+import os
+import tempfile
+
+import numpy as np
+import mitsuba as mi
+
+from hysim.data import cache
+
+
+def write_ply(
+    file,
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    normals: np.ndarray = None,
+    texcoords: np.ndarray = None,
+):
+    """Writes a triangle mesh as a binary little endian PLY file
+
+    Parameters
+    ----------
+    file : file object
+        Binary file open for writing
+    vertices : np.ndarray
+        Vertex positions, shape (N, 3)
+    faces : np.ndarray
+        Vertex indices of each triangle, shape (M, 3)
+    normals : np.ndarray, optional
+        Vertex normals, shape (N, 3), by default None
+    texcoords : np.ndarray, optional
+        Vertex texture coordinates, shape (N, 2), by default None
+    """
+    properties = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    columns = [vertices]
+    if normals is not None:
+        properties += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+        columns.append(normals)
+    if texcoords is not None:
+        properties += [("u", "<f4"), ("v", "<f4")]
+        columns.append(texcoords)
+
+    vertex_data = np.empty(len(vertices), dtype=properties)
+    for name, values in zip(
+        vertex_data.dtype.names, np.concatenate(columns, axis=1).T
+    ):
+        vertex_data[name] = values
+
+    face_data = np.empty(
+        len(faces), dtype=[("count", "u1"), ("indices", "<i4", (3,))]
+    )
+    face_data["count"] = 3
+    face_data["indices"] = faces
+
+    header = ["ply", "format binary_little_endian 1.0"]
+    header.append(f"element vertex {len(vertices)}")
+    header += [f"property float {name}" for name, _ in properties]
+    header.append(f"element face {len(faces)}")
+    header.append("property list uchar int vertex_indices")
+    header.append("end_header")
+
+    file.write(("\n".join(header) + "\n").encode("ascii"))
+    file.write(vertex_data.tobytes())
+    file.write(face_data.tobytes())
+
+
+def uv_sphere(segments: int) -> tuple:
+    """Returns a unit sphere mesh with latitude/longitude texture mapping
+
+    Parameters
+    ----------
+    segments : int
+        Number of segments around the equator (half as many rings from
+        pole to pole)
+
+    Returns
+    -------
+    vertices : np.ndarray
+        Vertex positions, shape (N, 3)
+    faces : np.ndarray
+        Vertex indices of each triangle, shape (M, 3)
+    normals : np.ndarray
+        Vertex normals, shape (N, 3)
+    texcoords : np.ndarray
+        Vertex texture coordinates, shape (N, 2)
+    """
+    rings = max(2, segments // 2)
+    u, v = np.meshgrid(
+        np.linspace(0, 1, segments + 1), np.linspace(0, 1, rings + 1)
+    )
+    longitude = 2 * np.pi * u
+    colatitude = np.pi * v
+
+    vertices = np.stack(
+        [
+            np.sin(colatitude) * np.cos(longitude),
+            np.sin(colatitude) * np.sin(longitude),
+            np.cos(colatitude),
+        ],
+        axis=-1,
+    )
+    vertices[0] = [0, 0, 1]
+    vertices[-1] = [0, 0, -1]
+    vertices = vertices.reshape(-1, 3)
+    texcoords = np.stack([u, 1 - v], axis=-1).reshape(-1, 2)
+
+    # Two triangles per grid cell (the seam column is duplicated for the
+    # texture coordinates), leaving out those collapsed at the poles
+    index = np.arange((rings + 1) * (segments + 1)).reshape(
+        rings + 1, segments + 1
+    )
+    top_left = index[:-1, :-1]
+    top_right = index[:-1, 1:]
+    bottom_left = index[1:, :-1]
+    bottom_right = index[1:, 1:]
+    faces = np.concatenate(
+        [
+            np.stack([top_left, bottom_left, bottom_right], axis=-1)[
+                :-1
+            ].reshape(-1, 3),
+            np.stack([top_left, bottom_right, top_right], axis=-1)[
+                1:
+            ].reshape(-1, 3),
+        ]
+    )
+
+    return vertices, faces, vertices.copy(), texcoords
+
+
+def sphere_mesh_path(segments: int) -> str:
+    """Returns path to a unit sphere PLY file, writing it if needed
+
+    Sphere meshes are kept in the ``meshes`` directory of the data cache
+    (or the temporary directory if the cache is disabled).
+
+    Parameters
+    ----------
+    segments : int
+        Number of segments around the equator
+
+    Returns
+    -------
+    str
+        Path to PLY file
+    """
+    mesh_directory = cache.get_cache_directory("meshes") or os.path.join(
+        tempfile.gettempdir(), "hysim_meshes"
+    )
+    path = os.path.join(mesh_directory, f"uv_sphere_{segments}.ply")
+
+    if not os.path.exists(path):
+        vertices, faces, normals, texcoords = uv_sphere(segments)
+        cache.write_atomic(
+            path,
+            lambda file: write_ply(file, vertices, faces, normals, texcoords),
+        )
+
+    return path
+
+
+def read_mesh(file_path: str) -> tuple:
+    """Reads a mesh file with Mitsuba
+
+    Mitsuba computes vertex normals of meshes that have none, so the
+    normals returned are those Mitsuba renders the mesh with.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to PLY or OBJ file
+
+    Returns
+    -------
+    vertices : np.ndarray
+        Vertex positions, shape (N, 3)
+    faces : np.ndarray
+        Vertex indices of each triangle, shape (M, 3)
+    normals : np.ndarray
+        Vertex normals, shape (N, 3) or None
+    texcoords : np.ndarray
+        Vertex texture coordinates, shape (N, 2) or None
+    """
+    mesh_type = os.path.splitext(file_path)[1].lstrip(".").lower()
+    mesh = mi.load_dict({"type": mesh_type, "filename": file_path})
+    params = mi.traverse(mesh)
+
+    vertices = np.array(params["vertex_positions"]).reshape(-1, 3)
+    faces = np.array(params["faces"]).reshape(-1, 3)
+    normals = None
+    texcoords = None
+    if mesh.has_vertex_normals():
+        normals = np.array(params["vertex_normals"]).reshape(-1, 3)
+    if mesh.has_vertex_texcoords():
+        texcoords = np.array(params["vertex_texcoords"]).reshape(-1, 2)
+
+    return vertices, faces, normals, texcoords
+
+
+def merge_meshes(file_paths: list) -> tuple:
+    """Merges mesh files into a single mesh
+
+    Normals and texture coordinates are kept only if every mesh has them.
+
+    Parameters
+    ----------
+    file_paths : list
+        Paths to PLY or OBJ files
+
+    Returns
+    -------
+    tuple
+        Vertices, faces, normals and texcoords of the merged mesh (see
+        read_mesh)
+    """
+    parts = [read_mesh(file_path) for file_path in file_paths]
+
+    offsets = np.cumsum([0] + [len(part[0]) for part in parts[:-1]])
+    vertices = np.concatenate([part[0] for part in parts])
+    faces = np.concatenate(
+        [part[1] + offset for part, offset in zip(parts, offsets)]
+    )
+
+    normals = None
+    texcoords = None
+    if all(part[2] is not None for part in parts):
+        normals = np.concatenate([part[2] for part in parts])
+    if all(part[3] is not None for part in parts):
+        texcoords = np.concatenate([part[3] for part in parts])
+
+    return vertices, faces, normals, texcoords
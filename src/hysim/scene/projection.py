@@ -0,0 +1,187 @@
+"""Projection Module
+
+Projects points in the scene onto the film of a perspective sensor. Used to
+find the window of the film covered by an object, e.g. the footprint of the
+target.
+"""
+import numpy as np
+
+
+def camera_tangents(
+    field_of_view: float, fov_axis: str, width: int, height: int
+) -> tuple:
+    """Returns tangents of the half angles of the camera frustum
+
+    Follows the field of view axis conventions of the Mitsuba perspective
+    camera.
+
+    Parameters
+    ----------
+    field_of_view : float
+        Camera field of view [deg]
+    fov_axis : str
+        Axis along which the field of view is measured (x, y, diagonal,
+        smaller or larger)
+    width : int
+        Film width in pixels
+    height : int
+        Film height in pixels
+
+    Returns
+    -------
+    tuple
+        Tangents of the horizontal and vertical half angles
+
+    Raises
+    ------
+    ValueError
+        If the field of view axis is unknown
+    """
+    tangent = np.tan(np.deg2rad(field_of_view) / 2)
+    aspect = width / height
+
+    if fov_axis == "smaller":
+        fov_axis = "x" if width < height else "y"
+    elif fov_axis == "larger":
+        fov_axis = "x" if width > height else "y"
+
+    if fov_axis == "x":
+        return tangent, tangent / aspect
+    if fov_axis == "y":
+        return tangent * aspect, tangent
+    if fov_axis == "diagonal":
+        diagonal = np.hypot(width, height)
+        return tangent * width / diagonal, tangent * height / diagonal
+
+    raise ValueError(f"{fov_axis} is an invalid field of view axis")
+
+
+def project_points(
+    points: np.ndarray,
+    to_world: np.ndarray,
+    field_of_view: float,
+    fov_axis: str,
+    width: int,
+    height: int,
+) -> tuple:
+    """Projects points onto the film of a perspective camera
+
+    The camera looks along its local +z axis. Pixel coordinates start at
+    the top left corner of the film.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Points in the scene, shape (N, 3)
+    to_world : np.ndarray
+        4x4 camera to world transform matrix
+    field_of_view : float
+        Camera field of view [deg]
+    fov_axis : str
+        Axis along which the field of view is measured
+    width : int
+        Film width in pixels
+    height : int
+        Film height in pixels
+
+    Returns
+    -------
+    pixels : np.ndarray
+        Pixel coordinates (x, y) of each point, shape (N, 2)
+    depths : np.ndarray
+        Distance of each point along the camera axis, shape (N,)
+    """
+    to_camera = np.linalg.inv(to_world)
+    local = points @ to_camera[:3, :3].T + to_camera[:3, 3]
+    depths = local[:, 2]
+    tan_x, tan_y = camera_tangents(field_of_view, fov_axis, width, height)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pixels = np.stack(
+            [
+                (0.5 - 0.5 * local[:, 0] / (depths * tan_x)) * width,
+                (0.5 - 0.5 * local[:, 1] / (depths * tan_y)) * height,
+            ],
+            axis=-1,
+        )
+
+    return pixels, depths
+
+
+def bounding_box_corners(
+    bounding_box_min: np.ndarray, bounding_box_max: np.ndarray
+) -> np.ndarray:
+    """Returns the corners of an axis aligned bounding box
+
+    Parameters
+    ----------
+    bounding_box_min : np.ndarray
+        Minimum corner [x, y, z]
+    bounding_box_max : np.ndarray
+        Maximum corner [x, y, z]
+
+    Returns
+    -------
+    np.ndarray
+        Corners of the box, shape (8, 3)
+    """
+    bounds = np.stack([bounding_box_min, bounding_box_max])
+    index = np.array(
+        [[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)]
+    )
+    return bounds[index, [0, 1, 2]]
+
+
+def footprint_window(
+    points: np.ndarray,
+    to_world: np.ndarray,
+    field_of_view: float,
+    fov_axis: str,
+    width: int,
+    height: int,
+    margin: int = 0,
+) -> tuple:
+    """Returns the window of the film covering a set of points
+
+    Points behind the camera make the projection unbounded, in which case
+    the whole film is returned.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Points bounding the object (e.g. bounding box corners), shape (N, 3)
+    to_world : np.ndarray
+        4x4 camera to world transform matrix
+    field_of_view : float
+        Camera field of view [deg]
+    fov_axis : str
+        Axis along which the field of view is measured
+    width : int
+        Film width in pixels
+    height : int
+        Film height in pixels
+    margin : int, optional
+        Pixels added around the window, by default 0
+
+    Returns
+    -------
+    tuple
+        Window (offset_x, offset_y, size_x, size_y) in pixels or None if
+        the points are outside of the film
+    """
+    pixels, depths = project_points(
+        points, to_world, field_of_view, fov_axis, width, height
+    )
+
+    if np.any(depths <= 0):
+        return 0, 0, width, height
+
+    lower = np.floor(pixels.min(axis=0)).astype(int) - margin
+    upper = np.ceil(pixels.max(axis=0)).astype(int) + margin
+    lower = np.maximum(lower, 0)
+    upper = np.minimum(upper, [width, height])
+
+    if np.any(upper <= lower):
+        return None
+
+    return int(lower[0]), int(lower[1]), *map(int, upper - lower)
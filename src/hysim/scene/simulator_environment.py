@@ -4,9 +4,70 @@ Contains classes to desribe objects in the Space Environment such as the Earth
 and Sun. The Earth is represented at scale and the Sun is represented by a
 directional light source.
 """
+import logging
+
+import numpy as np
 import mitsuba as mi
 
 import hysim.scene.spectra as spectra
+from hysim.scene import meshes
+
+# Mean radius of the Earth [m], the scene is in metres
+EARTH_RADIUS = 6.3710088e6
+
+# Equator segments of the level of detail sphere meshes
+EARTH_LOD_SEGMENTS = (16, 32, 64, 128, 256, 512, 1024)
+
+# Largest deviation of a level of detail mesh from the sphere [pixels]
+EARTH_LOD_TOLERANCE = 0.5
+
+EARTH_DEFAULTS = {
+    "model": "mesh",
+    "radius": EARTH_RADIUS,
+    "tolerance": EARTH_LOD_TOLERANCE,
+}
+
+
+def earth_mesh_segments(
+    radius: float,
+    distance: float,
+    pixels_per_radian: float,
+    tolerance: float = EARTH_LOD_TOLERANCE,
+) -> int:
+    """Returns the coarsest sphere mesh that looks round on the film
+
+    A sphere mesh with n segments deviates from the sphere by up to the
+    sagitta R (1 - cos(pi / n)) of its edges. The deviation is largest on
+    the limb, which is seen from the distance sqrt(d^2 - R^2).
+
+    Parameters
+    ----------
+    radius : float
+        Sphere radius [m]
+    distance : float
+        Distance from the camera to the sphere center [m]
+    pixels_per_radian : float
+        Film pixels per radian of the camera field of view
+    tolerance : float, optional
+        Largest deviation on the film [pixels], by default
+        EARTH_LOD_TOLERANCE
+
+    Returns
+    -------
+    int
+        Number of segments (one of EARTH_LOD_SEGMENTS) or None if even the
+        finest mesh deviates by more than the tolerance
+    """
+    if distance <= radius:
+        return None
+
+    limb_distance = np.sqrt(distance**2 - radius**2)
+    for segments in EARTH_LOD_SEGMENTS:
+        sagitta = radius * (1 - np.cos(np.pi / segments))
+        if sagitta / limb_distance * pixels_per_radian <= tolerance:
+            return segments
+
+    return None
 
 
 class Sun:
@@ -25,6 +86,8 @@ class Sun:
     -------
     position_sun_in_simple_3d(direction)
         Sets direction of the sun with direction vector
+    to_world
+        Returns transform of the directional emitter
 
     """
 
@@ -50,12 +113,33 @@ class Sun:
         """
         self.sun_position = direction
 
+    def to_world(self):
+        """Returns the transform of the directional emitter
+
+        Mitsuba converts the direction of a directional emitter into a
+        transform when the scene is loaded. This builds the same transform
+        so the direction can be changed in a loaded scene.
+
+        Returns
+        -------
+        mi.ScalarTransform4f
+            Emitter transform
+        """
+        up, _ = mi.coordinate_system(mi.ScalarVector3f(self.sun_position))
+        return mi.ScalarTransform4f.look_at(
+            origin=[0, 0, 0], target=self.sun_position, up=up
+        )
+
     def build_dict(self):
-        """Constucts dictionary for Sun object in Mitsuba scene"""
+        """Constucts dictionary for Sun object in Mitsuba scene
+
+        The direction is given as a transform so the emitter can be moved
+        in a loaded scene (see RendererControl.update_transforms).
+        """
         self.sun_dict = {
             "sun_emitter": {
                 "type": "directional",
-                "direction": self.sun_position,  # Sun pointing to +Y
+                "to_world": self.to_world(),
                 "irradiance": self.irradiance_spectrum.build_dict(),
             }
         }
@@ -76,9 +160,20 @@ class Earth:
         Path to file containing ocean water spectrum
     position : list
         Position of earth in cartesian reference frame [x, y, z]
+    model : str
+        Earth representation: the Earth mesh ("mesh"), an analytic Mitsuba
+        sphere ("sphere") or a level of detail sphere mesh ("lod")
+    radius : float
+        Radius of the sphere and level of detail models [m]
+    lod_segments : int
+        Equator segments of the level of detail mesh
 
     Methods
     -------
+    set_level_of_detail(distance, pixels_per_radian, tolerance)
+        Chooses the level of detail mesh from the apparent Earth size
+    to_world
+        Returns transform placing the Earth in the scene
     build_dict
         Builds dictionary describing Earth in scene
 
@@ -91,14 +186,78 @@ class Earth:
         self.soil_spectrum_path = ""
         self.ocean_spectrum_path = ""
         self.position = []
+        self.model = "mesh"
+        self.radius = EARTH_RADIUS
+        self.lod_segments = EARTH_LOD_SEGMENTS[-1]
+
+    def set_level_of_detail(
+        self,
+        distance: float,
+        pixels_per_radian: float,
+        tolerance: float = EARTH_LOD_TOLERANCE,
+    ):
+        """Chooses the level of detail mesh from the apparent Earth size
+
+        Falls back to the analytic sphere if no mesh is fine enough.
+
+        Parameters
+        ----------
+        distance : float
+            Distance from the camera to the Earth center [m]
+        pixels_per_radian : float
+            Film pixels per radian of the camera field of view
+        tolerance : float, optional
+            Largest deviation of the mesh on the film [pixels], by default
+            EARTH_LOD_TOLERANCE
+        """
+        segments = earth_mesh_segments(
+            self.radius, distance, pixels_per_radian, tolerance
+        )
+        if segments is None:
+            logging.info("No Earth mesh is fine enough, using a sphere")
+            self.model = "sphere"
+            return
+
+        logging.info("Earth level of detail: %d segments", segments)
+        self.lod_segments = segments
+
+    def to_world(self):
+        """Returns the transform placing the Earth in the scene
+
+        Returns
+        -------
+        mi.ScalarTransform4f
+            Earth transform
+        """
+        transform = mi.ScalarTransform4f.translate(self.position)
+        if self.model == "mesh":
+            return transform
+        return transform.scale(self.radius)
 
     def build_dict(self):
-        """Consutucts dictionary for Earth object in mitsuba scene"""
+        """Consutucts dictionary for Earth object in mitsuba scene
+
+        Raises
+        ------
+        ValueError
+            If the Earth model is unknown
+        """
+        if self.model == "mesh":
+            shape = {"type": "ply", "filename": self.mesh_path}
+        elif self.model == "sphere":
+            shape = {"type": "sphere"}
+        elif self.model == "lod":
+            shape = {
+                "type": "ply",
+                "filename": meshes.sphere_mesh_path(self.lod_segments),
+            }
+        else:
+            raise ValueError(f"{self.model} is an invalid Earth model")
+
         self.earth_dict = {
             "earth": {
-                "type": "ply",
-                "filename": self.mesh_path,
-                "to_world": mi.ScalarTransform4f.translate(self.position),
+                **shape,
+                "to_world": self.to_world(),
                 "ocean_surface": {
                     "type": "diffuse",
                     "reflectance": {
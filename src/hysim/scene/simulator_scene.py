@@ -2,9 +2,16 @@
 
 Contains Builder class to construct scene dictionary from simulator case
 """
+import os
+import copy
+
+import numpy as np
+
 # Inputs
 from hysim import input_data as in_data
+from hysim import synthesis
 from hysim.scene import frame_transforms as frames
+from hysim.scene import projection
 
 # Data handling
 from hysim.data import spd_reader
@@ -15,6 +22,7 @@ from hysim.scene import spectra
 from hysim.scene import simulator_environment as env
 from hysim.scene import chaser_satellite as chas
 from hysim.scene import target_satellite as targ
+from hysim.scene import debris
 
 
 class SceneBuilder:
@@ -26,7 +34,8 @@ class SceneBuilder:
     user_inputs : in_data.Configs
         Object containing user input data
     orbit_data : frames.MissionInputProcessor
-        Orbit data converted from user inputs
+        Orbit data converted from user inputs (or frames.EpochGeometry
+        of a single epoch)
     integrator : dict
         Dictionary configuring mitsuba integrator
     sampler : dict
@@ -37,11 +46,17 @@ class SceneBuilder:
         Dictionary defining Earth in the scene
     target : dict
         Dictionary defining Target spacecraft
+    debris : debris.DebrisField
+        Instanced objects placed around the target
     chaser : dict
         Dictionary defining chaser spacecraft and sensor
     scene_dict : dict
         Dictionary defining entire scene after construction. This is
         passed to Mitsuba for rendering.
+    synthesized_sensors : list
+        Sensors derived from the render of a reference film (see
+        hysim.synthesis), empty unless the case config has a
+        sensor_synthesis entry
 
     Methods
     -------
@@ -55,10 +70,22 @@ class SceneBuilder:
         Builds the Sun dictionary
     build_target
         Builds the Target dictionary
+    build_part(part_name, part_input)
+        Builds a part from its parts config entry
+    build_debris
+        Builds the instanced objects listed in the parts config
     build_chaser
         Builds the Chaser dictionary
+    user_material(material_dict)
+        Returns user material with spectrum files found in case directory
+    clip_spectra
+        Clips sun and material spectra to the film wavelength range
     build_scene_dict
         Builds the Scene dictionary
+    update_geometry
+        Moves built scene objects to the current orbit data
+    object_transforms
+        Returns the transform of each object in the scene dictionary
     """
 
     def __init__(
@@ -83,8 +110,10 @@ class SceneBuilder:
         self.sun = None
         self.earth = None
         self.target = None
+        self.debris = None
         self.chaser = None
         self.scene_dict = {"type": "scene"}
+        self.synthesized_sensors = []
 
     def build_integrator(self):
         """Builds integrator dictionary"""
@@ -97,7 +126,16 @@ class SceneBuilder:
         self.sampler = {"sampler": self.user_inputs.case_config["sampler"]}
 
     def build_earth(self):
-        """Builds Earth object dictionary"""
+        """Builds Earth object dictionary
+
+        The earth entry of the case config chooses the Earth model. The
+        level of detail mesh is chosen from the apparent size of the Earth
+        seen by the chaser sensor, so the chaser is built first.
+        """
+        settings = dict(
+            env.EARTH_DEFAULTS,
+            **(self.user_inputs.case_config.get("earth") or {}),
+        )
         earth_data_path = dh.EarthData.PATH.value
         self.earth = env.Earth()
         self.earth.mesh_path = dh.get_data_path(
@@ -113,6 +151,25 @@ class SceneBuilder:
             earth_data_path, dh.EarthData.SURFACE_BITMAP.value
         )
         self.earth.position = self.orbit_data.earth_position
+        self.earth.model = settings["model"]
+        self.earth.radius = settings["radius"]
+
+        if self.earth.model == "lod":
+            film = self.chaser.sensor.film
+            camera = self.chaser.sensor.camera
+            tan_x, _ = projection.camera_tangents(
+                camera.field_of_view, camera.fov_axis, film.width, film.height
+            )
+            distance = np.linalg.norm(
+                np.asarray(self.orbit_data.earth_position)
+                - np.asarray(self.orbit_data.chaser_position)
+            )
+            self.earth.set_level_of_detail(
+                distance,
+                film.width / (2 * np.arctan(tan_x)),
+                settings["tolerance"],
+            )
+
         self.earth.build_dict()
 
     def build_sun(self):
@@ -137,29 +194,43 @@ class SceneBuilder:
         self.sun.build_dict()
 
     def build_chaser(self):
-        """Builds Chaser spacecraft dictionary containing sensor parameters"""
+        """Builds Chaser spacecraft dictionary containing sensor parameters
+
+        With a sensor_synthesis entry in the case config the film is a
+        fine reference film covering the case sensor and the sensors to
+        synthesize.
+        """
         # --- Sensor --- #
         # TODO: Add option to choose between internal sensor data, user
         # data in spd file and selected bands
 
-        # Get the spectrum file path
-        spectrum_file = self.user_inputs.sensor_config["spectrum_file"]
-        spectrum_path = dh.get_user_data_path(spectrum_file)
-        spectrum_data = spd_reader.SPDReader(spectrum_path)
-
-        # Build the spectral bands
-        imaging_mode = self.user_inputs.sensor_config["imaging_mode"]
+        case_config = self.user_inputs.case_config
 
-        if imaging_mode == "multispectral":
-            film_bands = spectra.MultispectralFilmResponse(
-                spectrum_data.wavelengths, spectrum_data.values
+        if "sensor_synthesis" in case_config:
+            settings = dict(
+                synthesis.SYNTHESIS_DEFAULTS,
+                **(case_config["sensor_synthesis"] or {}),
             )
-        elif imaging_mode == "hyperspectral":
-            film_bands = spectra.HyperspectralFilmResponse(
-                spectrum_data.wavelengths, spectrum_data.values
+            self.synthesized_sensors = synthesis.load_sensors(
+                self.user_inputs, settings["sensors"]
+            )
+            film_bands = synthesis.reference_response(
+                self.synthesized_sensors, settings["resolution"]
             )
+            for sensor in self.synthesized_sensors:
+                sensor.set_reference(film_bands)
         else:
-            raise ValueError("Imaging mode invalid")
+            # Get the spectrum file path
+            spectrum_file = self.user_inputs.sensor_config["spectrum_file"]
+            spectrum_path = self.user_inputs.find_file(spectrum_file)
+            spectrum_data = spd_reader.SPDReader(spectrum_path)
+
+            # Build the spectral bands
+            imaging_mode = self.user_inputs.sensor_config["imaging_mode"]
+
+            film_bands = spectra.film_response(
+                imaging_mode, spectrum_data.wavelengths, spectrum_data.values
+            )
 
         # Build film object
         film = chas.SpectralFilm(
@@ -189,38 +260,235 @@ class SceneBuilder:
         self.target = targ.Target()
         for part_name in self.user_inputs.parts_config["components"]:
             part_input = self.user_inputs.parts_config["components"][part_name]
+            self.target.add_part(self.build_part(part_name, part_input))
 
-            # Create Part:
-            part = targ.PartBuilder(part_name)
+        self.target.position = self.orbit_data.target_position
+        self.target.attitude = self.user_inputs.mission_config["target"][
+            "attitude"
+        ]
 
-            # Assign part mesh:
-            part.mesh_file = dh.get_user_data_path(part_input["file"])
+        if self.user_inputs.case_config.get("merge_parts", False):
+            self.target.merge_parts(
+                os.path.join(
+                    self.user_inputs.case_directory,
+                    targ.MESH_CACHE_DIRECTORY,
+                )
+            )
+
+        self.target.build_dict()
 
-            # Assign material:
-            if "user_material" in part_input:
-                material = part_input["user_material"]
-                part.set_user_material(
+    def build_part(self, part_name: str, part_input: dict):
+        """Builds a part from its parts config entry
+
+        Parameters
+        ----------
+        part_name : str
+            Part name
+        part_input : dict
+            Parts config entry with the mesh file and material
+
+        Returns
+        -------
+        targ.PartBuilder
+            Part with mesh and material
+        """
+        # Create Part:
+        part = targ.PartBuilder(part_name)
+
+        # Assign part mesh:
+        part.mesh_file = self.user_inputs.find_file(part_input["file"])
+
+        # Assign material:
+        if "user_material" in part_input:
+            material = part_input["user_material"]
+            part.set_user_material(
+                self.user_material(
                     self.user_inputs.additional_materials[material]
                 )
+            )
 
-            if "database_material" in part_input:
-                part.set_database_material(part_input["database_material"])
+        if "database_material" in part_input:
+            part.set_database_material(part_input["database_material"])
 
-            part.build_dict()
+        part.build_dict()
+        return part
 
-            self.target.add_part(part)
+    def build_debris(self):
+        """Builds the instanced objects listed in the parts config
 
-        self.target.position = self.orbit_data.target_position
-        self.target.attitude = self.user_inputs.mission_config["target"][
-            "attitude"
-        ]
+        Each entry of the instances section of the parts config is an
+        object made of components (as the target) and a placements file
+        with the position and attitude of each copy relative to the
+        target (see debris.load_placements).
+        """
+        self.debris = debris.DebrisField()
+        instances = self.user_inputs.parts_config.get("instances") or {}
+
+        for group_name, group_input in instances.items():
+            placements = debris.load_placements(
+                self.user_inputs.find_file(group_input["placements"])
+            )
+            group = debris.InstanceGroup(group_name, placements)
+            for part_name, part_input in group_input["components"].items():
+                group.add_part(
+                    self.build_part(f"{group_name}_{part_name}", part_input)
+                )
+            self.debris.add_group(group)
+
+        self.debris.position = self.orbit_data.target_position
+        self.debris.build_dict()
+
+    def user_material(self, material_dict: dict) -> dict:
+        """Returns user material with spectrum files found in case directory
+
+        Parameters
+        ----------
+        material_dict : dict
+            User defined material (Mitsuba BSDF dictionary)
+
+        Returns
+        -------
+        dict
+            Copy of material with paths to spectrum files
+        """
+        material_dict = copy.deepcopy(material_dict)
+        reflectance = material_dict.get("reflectance")
+
+        if isinstance(reflectance, dict) and "filename" in reflectance:
+            reflectance["filename"] = self.user_inputs.find_file(
+                reflectance["filename"]
+            )
 
+        return material_dict
+
+    def clip_spectra(self):
+        """Clips sun and material spectra to the film wavelength range
+
+        The film does not respond outside its wavelength range, so
+        cropping the sunlight irradiance and the reflectance spectra of
+        the target parts, instanced objects and Earth leaves the render
+        unchanged while making the spectra loaded into Mitsuba smaller.
+        Spectrum files are replaced by in-memory spectra. Must be called
+        after the sun, chaser, target, debris and Earth are built.
+        """
+        film_wavelengths = self.chaser.sensor.film.spectrum.wavelengths
+        wavelength_range = (np.min(film_wavelengths), np.max(film_wavelengths))
+
+        self.sun.irradiance_spectrum = (
+            self.sun.irradiance_spectrum.crop_spectrum(*wavelength_range)
+        )
+        self.sun.build_dict()
+
+        for part in self.target.target_model:
+            part.material = self._clip_spectrum_dicts(
+                part.material, wavelength_range
+            )
+            part.build_dict()
         self.target.build_dict()
 
+        for group in self.debris.groups:
+            for part in group.parts:
+                part.material = self._clip_spectrum_dicts(
+                    part.material, wavelength_range
+                )
+                part.build_dict()
+        self.debris.build_dict()
+
+        self.earth.earth_dict = self._clip_spectrum_dicts(
+            self.earth.earth_dict, wavelength_range
+        )
+
+    def _clip_spectrum_dicts(self, value, wavelength_range: tuple):
+        """Returns copy of a dictionary with spectra clipped to a range
+
+        Irregular spectra and spectrum (.spd) files nested in the
+        dictionary are replaced by cropped irregular spectra.
+
+        Parameters
+        ----------
+        value : object
+            Dictionary (or value in it) e.g. a material dictionary
+        wavelength_range : tuple
+            Minimum and maximum wavelength [nm]
+
+        Returns
+        -------
+        object
+            Dictionary with clipped spectra
+        """
+        if not isinstance(value, dict):
+            return value
+
+        spectrum = None
+        if value.get("type") == "irregular":
+            spectrum = spectra.ReflectanceSpectrum(
+                np.array(value["wavelengths"].split(","), dtype=float),
+                np.array(value["values"].split(","), dtype=float),
+            )
+        elif value.get("type") == "spectrum" and str(
+            value.get("filename", "")
+        ).endswith(".spd"):
+            spectrum_data = spd_reader.SPDReader(value["filename"])
+            spectrum = spectra.ReflectanceSpectrum(
+                spectrum_data.wavelengths, spectrum_data.values
+            )
+
+        if spectrum is not None:
+            try:
+                return spectrum.crop_spectrum(*wavelength_range).build_dict()
+            except ValueError:
+                # Spectrum is zero over the film range in Mitsuba
+                return value
+
+        return {
+            key: self._clip_spectrum_dicts(item, wavelength_range)
+            for key, item in value.items()
+        }
+
     def build_scene_dict(self):
         """Builds scene dictionary by adding scene components to scene dict"""
         self.scene_dict.update(self.integrator)
         self.scene_dict.update(self.target.target_dict)
+        self.scene_dict.update(self.debris.debris_dict)
         self.scene_dict.update(self.chaser.chaser_dict)
         self.scene_dict.update(self.sun.sun_dict)
         self.scene_dict.update(self.earth.earth_dict)
+
+    def update_geometry(self):
+        """Moves built scene objects to the current orbit data
+
+        Used when the epoch of the orbit data or the attitudes in the
+        mission config change after the scene is built. Only positions,
+        attitudes and directions are updated, the scene dictionary is not
+        rebuilt.
+        """
+        mission_config = self.user_inputs.mission_config
+        self.sun.position_sun_in_simple_3d(
+            self.orbit_data.sun_direction_vector
+        )
+        self.chaser.position = self.orbit_data.chaser_position
+        self.chaser.attitude = mission_config["chaser"]["attitude"]
+        self.target.position = self.orbit_data.target_position
+        self.target.attitude = mission_config["target"]["attitude"]
+        self.debris.position = self.orbit_data.target_position
+        self.earth.position = self.orbit_data.earth_position
+
+    def object_transforms(self) -> dict:
+        """Returns the transform of each object in the scene dictionary
+
+        Returns
+        -------
+        dict
+            Transforms keyed by the object name in the scene dictionary
+        """
+        transforms = {
+            "sensor": self.chaser.to_world(),
+            "sun_emitter": self.sun.to_world(),
+            "earth": self.earth.to_world(),
+        }
+        target_transform = self.target.to_world()
+        for shape_name in self.target.shape_names():
+            transforms[shape_name] = target_transform
+        transforms.update(self.debris.to_world())
+
+        return transforms
@@ -3,7 +3,7 @@ Collection of classes that store and convert spectrum data
 """
 
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, replace
 import numpy as np
 
 
@@ -21,9 +21,11 @@ class Spectrum(ABC):
     __len__
         Returns length of the spectrum
     crop_spectrum(min_wavelength, max_wavelength)
-        Crop spectrum to min/max values (NOT IMPLEMENTED)
+        Returns spectrum cropped to min/max wavelengths
     resize_spectrum(spectrum_size)
-        Interpolates data to specified number of bands (NOT IMPLEMENTED)
+        Returns spectrum resampled to evenly spaced wavelengths
+    bin_means(edges)
+        Returns mean values of the spectrum in bins between edges
     create_value_comma_string(values)
         Make a comma seperated string of values from list
     """
@@ -40,9 +42,62 @@ class Spectrum(ABC):
         """
         return len(self.wavelengths)
 
+    def _value_fields(self) -> list:
+        """Returns names of the value attributes of the spectrum
+
+        Returns
+        -------
+        list
+            Names of attributes with a value (row) per wavelength
+        """
+        return [
+            field.name for field in fields(self) if field.name != "wavelengths"
+        ]
+
+    def _interpolate(self, targets: np.array) -> dict:
+        """Linearly interpolates the spectrum values at given wavelengths
+
+        Values are interpolated as Mitsuba does between spectrum points.
+        Wavelengths are assumed to be in ascending order.
+
+        Parameters
+        ----------
+        targets : np.array
+            Wavelengths inside the spectrum range [nm]
+
+        Returns
+        -------
+        dict
+            Interpolated values (row per target) keyed by attribute name
+        """
+        wavelengths = np.asarray(self.wavelengths, dtype=float)
+        index = np.clip(
+            np.searchsorted(wavelengths, targets, side="right") - 1,
+            0,
+            len(wavelengths) - 2,
+        )
+        weight = (targets - wavelengths[index]) / (
+            wavelengths[index + 1] - wavelengths[index]
+        )
+
+        interpolated = {}
+        for name in self._value_fields():
+            values = np.asarray(getattr(self, name), dtype=float)
+            # Broadcast weights over the columns of multi band values
+            band_weight = weight.reshape((-1,) + (1,) * (values.ndim - 1))
+            interpolated[name] = (
+                values[index] * (1 - band_weight)
+                + values[index + 1] * band_weight
+            )
+        return interpolated
+
     def crop_spectrum(self, min_wavelength: float, max_wavelength: float):
         """Crop spectrum to min/max wavelengths
 
+        Points outside the range are removed and points are interpolated
+        at the range limits, so the spectrum is unchanged inside the
+        range.
+
         Parameters
         ----------
         min_wavelength : float
@@ -50,27 +105,105 @@ class Spectrum(ABC):
         max_wavelength : float
             Maximum wavelength [nm]
 
+        Returns
+        -------
+        Spectrum
+            Cropped spectrum of the same type
+
         Raises
         ------
-        NotImplementedError
-            When called
+        ValueError
+            If the spectrum does not overlap the wavelength range
         """
-        raise NotImplementedError("Feature not yet implemented")
+        wavelengths = np.asarray(self.wavelengths, dtype=float)
+        lower = max(min_wavelength, wavelengths[0])
+        upper = min(max_wavelength, wavelengths[-1])
+        if lower > upper:
+            raise ValueError(
+                f"Spectrum does not cover {min_wavelength}-{max_wavelength}nm"
+            )
+
+        inside = (wavelengths > lower) & (wavelengths < upper)
+        targets = np.concatenate([[lower], wavelengths[inside], [upper]])
+        return replace(self, wavelengths=targets, **self._interpolate(targets))
 
     def resize_spectrum(self, spectrum_size: int):
-        """Creates polynomial of spectrum and remakes it with a given size
+        """Resamples spectrum to evenly spaced wavelengths
+
+        Each new value is the mean of the spectrum over the bin around its
+        wavelength (bins end halfway to the neighbouring wavelengths), so
+        the integral of the spectrum over every bin is conserved.
 
         Parameters
         ----------
         spectrum_size : int
             Length of the new spectrum
 
+        Returns
+        -------
+        Spectrum
+            Resampled spectrum of the same type
+
         Raises
         ------
-        NotImplementedError
-            When called
+        ValueError
+            If the size is less than 2
+        """
+        if spectrum_size < 2:
+            raise ValueError("Spectrum size must be at least 2")
+
+        wavelengths = np.asarray(self.wavelengths, dtype=float)
+        targets = np.linspace(wavelengths[0], wavelengths[-1], spectrum_size)
+        edges = np.concatenate(
+            [targets[:1], (targets[1:] + targets[:-1]) / 2, targets[-1:]]
+        )
+        return replace(self, wavelengths=targets, **self.bin_means(edges))
+
+    def bin_means(self, edges: np.array) -> dict:
+        """Returns mean values of the spectrum in bins between edges
+
+        The spectrum is linear between its points and zero outside of its
+        range, as in Mitsuba.
+
+        Parameters
+        ----------
+        edges : np.array
+            Ascending bin edge wavelengths [nm]
+
+        Returns
+        -------
+        dict
+            Mean values (row per bin) keyed by attribute name
         """
-        raise NotImplementedError("Feature not yet implemented")
+        wavelengths = np.asarray(self.wavelengths, dtype=float)
+        edges = np.asarray(edges, dtype=float)
+        clipped = np.clip(edges, wavelengths[0], wavelengths[-1])
+        edge_values = self._interpolate(clipped)
+        index = np.searchsorted(wavelengths, clipped, side="right") - 1
+        index = np.clip(index, 0, len(wavelengths) - 1)
+
+        means = {}
+        for name in self._value_fields():
+            values = np.asarray(getattr(self, name), dtype=float)
+            shape = (-1,) + (1,) * (values.ndim - 1)
+            # Integral of the piecewise linear spectrum up to each point
+            steps = np.diff(wavelengths).reshape(shape)
+            cumulative = np.concatenate(
+                [
+                    np.zeros((1,) + values.shape[1:]),
+                    np.cumsum(steps * (values[1:] + values[:-1]) / 2, axis=0),
+                ]
+            )
+            integral = cumulative[index] + (
+                (clipped - wavelengths[index]).reshape(shape)
+                * (values[index] + edge_values[name])
+                / 2
+            )
+            means[name] = np.diff(integral, axis=0) / np.diff(
+                edges
+            ).reshape(shape)
+
+        return means
 
     def string_values_from_array(self, values: np.array) -> str:
         """Returns a string of comma seperated values from numpy array
@@ -145,6 +278,52 @@ class IrradianceSpectrum(Spectrum):
         }
 
 
+@dataclass
+class ReflectanceSpectrum(Spectrum):
+    """A spectrum of reflectance for given wavelengths
+
+    Represents a spectrum of material reflectance values with
+    corresponding wavelengths. Inherits from Spectrum class
+
+    Attributes
+    ----------
+    reflectance : np.array
+        Array of reflectance values
+
+    Methods
+    -------
+    build_dict
+        Build irregular spectrum dictionary for reflectance
+    """
+
+    reflectance: np.array
+
+    def __post_init__(self):
+        """Post Initialiser method to check shape of data after init
+
+        Raises
+        ------
+            TypeError if the number of columns in reflectance array
+            is greater than 1.
+        """
+        if np.ndim(self.reflectance) != 1:
+            raise TypeError("Too many columns for reflectance data")
+
+    def build_dict(self) -> dict:
+        """Build irregular spectrum dictionary for reflectance
+
+        Returns
+        -------
+        dict
+            Reflectance spectrum dict
+        """
+        return {
+            "type": "irregular",
+            "wavelengths": self.string_values_from_array(self.wavelengths),
+            "values": self.string_values_from_array(self.reflectance),
+        }
+
+
 @dataclass
 class HyperspectralFilmResponse(Spectrum):
     """A spectrum describing spectral response of hyperspectral film
@@ -167,6 +346,8 @@ class HyperspectralFilmResponse(Spectrum):
         underscore
     build_dict
         Constructs dict for spectrum
+    band_response(edges)
+        Returns mean response of each band in bins between edges
     """
 
     sensitivities: np.array
@@ -182,6 +363,33 @@ class HyperspectralFilmResponse(Spectrum):
         if self.sensitivities.ndim != 1:
             raise TypeError("Too many columns for hyperspectral data")
 
+    def band_response(self, edges: np.array) -> np.ndarray:
+        """Returns mean response of each band in bins between edges
+
+        Each band responds linearly between its two wavelengths and is
+        zero outside of them.
+
+        Parameters
+        ----------
+        edges : np.array
+            Ascending bin edge wavelengths [nm]
+
+        Returns
+        -------
+        np.ndarray
+            Mean band responses, shape (bins, bands)
+        """
+        return np.stack(
+            [
+                HyperspectralFilmResponse(
+                    self.wavelengths[index: index + 2],
+                    self.sensitivities[index: index + 2],
+                ).bin_means(edges)["sensitivities"]
+                for index in range(len(self.wavelengths) - 1)
+            ],
+            axis=-1,
+        )
+
     def build_dict(self) -> dict:
         """Generates a dictionary for given number of bands
 
@@ -239,10 +447,28 @@ class MultispectralFilmResponse(Spectrum):
         underscore
     build_dict
         Constructs dict for spectrum
+    band_response(edges)
+        Returns mean response of each band in bins between edges
     """
 
     sensitivities: np.array
 
+    def band_response(self, edges: np.array) -> np.ndarray:
+        """Returns mean response of each band in bins between edges
+
+        Parameters
+        ----------
+        edges : np.array
+            Ascending bin edge wavelengths [nm]
+
+        Returns
+        -------
+        np.ndarray
+            Mean band responses, shape (bins, bands)
+        """
+        response = self.bin_means(edges)["sensitivities"]
+        return response.reshape(len(response), -1)
+
     def build_dict(self) -> dict:
         """Generates a dictionary for given number of bands
 
@@ -274,3 +500,34 @@ class MultispectralFilmResponse(Spectrum):
             )
 
         return band_dict
+
+
+def film_response(
+    imaging_mode: str, wavelengths: np.array, sensitivities: np.array
+) -> Spectrum:
+    """Returns the film response of an imaging mode
+
+    Parameters
+    ----------
+    imaging_mode : str
+        Imaging mode (hyperspectral or multispectral)
+    wavelengths : np.array
+        Wavelengths of the spectral response function [nm]
+    sensitivities : np.array
+        Film sensitivities (a column per band for multispectral)
+
+    Returns
+    -------
+    Spectrum
+        HyperspectralFilmResponse or MultispectralFilmResponse
+
+    Raises
+    ------
+    ValueError
+        If the imaging mode is invalid
+    """
+    if imaging_mode == "multispectral":
+        return MultispectralFilmResponse(wavelengths, sensitivities)
+    if imaging_mode == "hyperspectral":
+        return HyperspectralFilmResponse(wavelengths, sensitivities)
+    raise ValueError("Imaging mode invalid")
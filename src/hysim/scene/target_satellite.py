@@ -2,9 +2,24 @@
 
 Module containing classes that manage the Target model in the scene
 """
+import os
+import json
+import hashlib
+import logging
+
 import mitsuba as mi
 import numpy as np
+from hysim import render_cache
+from hysim.data import cache
 from hysim.data import data_handling as dh
+from hysim.scene import meshes
+
+# Directory of merged part meshes inside the case directory (hidden, so the
+# case file index does not find the merged meshes)
+MESH_CACHE_DIRECTORY = ".hysim_meshes"
+
+# Version of the merged mesh files, changed when their contents change
+MESH_CACHE_VERSION = 1
 
 
 class PartBuilder:
@@ -86,6 +101,9 @@ class Target:
         Attitude in angles around x-axis, y-axis and z-axis
     target_dict : dict
         Dictionary defining target parameters
+    merged_meshes : list
+        Merged meshes as (shape name, mesh file, parts) tuples, empty
+        unless the parts are merged
 
 
     Methods
@@ -94,8 +112,14 @@ class Target:
         Appends list of parts (target_model) with new part
     remove_part(part)
         Removes existing part from target_model
+    merge_parts(cache_directory)
+        Merges the meshes of parts sharing a material
+    shape_names
+        Returns the names of the target shapes in the scene dictionary
     __transform
         Mitsuba transform to define location in scene
+    to_world
+        Returns transform placing the target in the scene
     build_dict
         Constructs Target dictionary
     """
@@ -106,6 +130,7 @@ class Target:
         self.position = []
         self.attitude = []
         self.target_dict = None
+        self.merged_meshes = []
 
     def add_part(self, part: PartBuilder):
         """Appends target_model with newly constructed part
@@ -127,6 +152,64 @@ class Target:
         """
         del self.target_model[part]
 
+    def merge_parts(self, cache_directory: str):
+        """Merges the meshes of parts sharing a material
+
+        Each group of parts with the same material becomes a single binary
+        PLY mesh with vertex normals, so Mitsuba loads one shape per
+        material instead of parsing every part file. Merged meshes are
+        stored in the cache directory keyed on the contents of the part
+        files and are only built again when a part file changes.
+
+        Parameters
+        ----------
+        cache_directory : str
+            Path to directory holding merged meshes
+        """
+        groups = {}
+        for part in self.target_model:
+            material_key = json.dumps(
+                part.material, sort_keys=True, default=repr
+            )
+            groups.setdefault(material_key, []).append(part)
+
+        self.merged_meshes = []
+        for index, parts in enumerate(groups.values()):
+            mesh_files = [part.mesh_file for part in parts]
+            key = hashlib.sha256(
+                json.dumps(
+                    [
+                        MESH_CACHE_VERSION,
+                        [render_cache.hash_file(path) for path in mesh_files],
+                    ]
+                ).encode("utf-8")
+            ).hexdigest()
+            path = os.path.join(cache_directory, key + ".ply")
+
+            if not os.path.exists(path):
+                logging.info(
+                    "Merging target parts %s",
+                    ", ".join(part.name for part in parts),
+                )
+                mesh = meshes.merge_meshes(mesh_files)
+                cache.write_atomic(
+                    path, lambda file: meshes.write_ply(file, *mesh)
+                )
+
+            self.merged_meshes.append((f"target_mesh_{index}", path, parts))
+
+    def shape_names(self) -> list:
+        """Returns the names of the target shapes in the scene dictionary
+
+        Returns
+        -------
+        list
+            Part names, or merged mesh names if the parts are merged
+        """
+        if self.merged_meshes:
+            return [name for name, _, _ in self.merged_meshes]
+        return [part.name for part in self.target_model]
+
     # TODO: Refactor this and chaser function into positioning module
     def __transform(self):
         """Makes mitsuba transform to position mesh in scene
@@ -143,10 +226,30 @@ class Target:
             .rotate(axis=[0, 0, 1], angle=np.rad2deg(self.attitude[2]))
         )
 
+    def to_world(self):
+        """Returns the transform placing the target in the scene
+
+        Returns
+        -------
+        mi.ScalarTransform4f
+            Target transform
+        """
+        return self.__transform()
+
     def build_dict(self):
         """Builds target dictionary"""
         self.target_dict = {}
 
-        for part in self.target_model:
-            self.target_dict.update({part.name: part.part_dict})
-            self.target_dict[part.name]["to_world"] = self.__transform()
+        for name, mesh_file, parts in self.merged_meshes:
+            self.target_dict[name] = {
+                "type": "ply",
+                "filename": mesh_file,
+                name + "_material": parts[0].material,
+            }
+
+        if not self.merged_meshes:
+            for part in self.target_model:
+                self.target_dict.update({part.name: part.part_dict})
+
+        for shape_dict in self.target_dict.values():
+            shape_dict["to_world"] = self.__transform()
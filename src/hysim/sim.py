@@ -7,10 +7,12 @@ handle Mitsuba.
 # import pretty_errors
 
 # Logging
+import time
 import logging
 
 # Packages
 import mitsuba as mi
+import numpy as np
 
 # I/O
 from hysim import input_data
@@ -20,8 +22,86 @@ from hysim.data import data_handling as dh
 
 # Simulator
 from hysim import output_data
+from hysim import telemetry
+from hysim.render_cache import RenderCache
 from hysim.scene import simulator_scene as sc
 from hysim.scene import frame_transforms as frames
+from hysim.scene import projection
+from hysim import tiling
+from hysim import synthesis
+
+# Default settings of progressive rendering (case_config entry progressive)
+PROGRESSIVE_DEFAULTS = {
+    "pass_sample_count": 16,
+    "tolerance": 0.01,
+    "max_sample_count": 4096,
+    "max_time": None,
+    "footprint_margin": 2,
+}
+
+# Default settings of tiled rendering (case_config entry tiled)
+TILED_DEFAULTS = {
+    "tile_size": 128,
+    "workers": None,
+    "seed": 0,
+}
+
+# Default settings of band group rendering (case_config entry band_groups)
+BAND_GROUP_DEFAULTS = {
+    "group_size": None,
+    "memory_budget_mb": None,
+}
+
+# Film buffers holding every band of a pass (film storage, render tensor)
+FILM_BUFFERS = 2
+
+# Default settings of region of interest rendering (case_config entry
+# region_of_interest)
+REGION_OF_INTEREST_DEFAULTS = {
+    "margin": 4,
+    "pad": True,
+}
+
+
+def band_group_size(
+    band_count: int,
+    width: int,
+    height: int,
+    group_size: int = None,
+    memory_budget_mb: float = None,
+) -> int:
+    """Returns the number of bands rendered per band group pass
+
+    Parameters
+    ----------
+    band_count : int
+        Number of film bands
+    width : int
+        Width of the rendered film window in pixels
+    height : int
+        Height of the rendered film window in pixels
+    group_size : int, optional
+        Maximum number of bands per pass, by default None (all bands)
+    memory_budget_mb : float, optional
+        Film memory allowed per pass [MB], by default None (no limit)
+
+    Returns
+    -------
+    int
+        Bands per pass (at least 1)
+    """
+    group_size = group_size or band_count
+
+    if memory_budget_mb is not None:
+        band_size = width * height * np.dtype(np.float32).itemsize
+        group_size = min(
+            group_size,
+            max(
+                1,
+                int(memory_budget_mb * 1024**2 // (band_size * FILM_BUFFERS)),
+            ),
+        )
+    return group_size
 
 
 class NoSceneLoaded(Exception):
@@ -41,13 +121,39 @@ class RendererControl:
         Parameters in the scene represented by SceneParameters object
     render : TensorXf
         Output data from render represented by floating point tensor
+    render_info : dict
+        Sample count, timing and convergence of the last render
+    crop_window : tuple
+        Film window (offset_x, offset_y, size_x, size_y) rendered, None
+        for the whole film
+    pad_crop : bool
+        Place cropped renders in an empty full size film
+    band_group_size : int
+        Maximum number of bands rendered per pass, None for all bands
+    memory_budget_mb : float
+        Film memory allowed per pass [MB], None for no limit
 
     Methods
     -------
     load_scene(scene_dict)
         Loads scene dict into mitsuba and gets scene parameters
-    run()
+    update_transforms(transforms)
+        Moves objects in the loaded scene without reloading it
+    footprint(object_ids, margin)
+        Returns the window of the film covered by objects in the scene
+    set_crop(window, pad)
+        Restricts rendering to a window of the film
+    set_band_groups(group_size, memory_budget_mb)
+        Splits the film bands into groups rendered in separate passes
+    run(spp, seed)
         Renders the scene using the loaded scene data
+    run_tiled(spp, tile_size, workers, seed)
+        Renders the film as tiles in a pool of worker processes
+    run_progressive(pass_sample_count, tolerance, max_sample_count,
+                    max_time, window)
+        Renders the scene in passes until the render converges
+    close()
+        Stops tile worker processes
 
     """
 
@@ -56,6 +162,19 @@ class RendererControl:
         self.mitsuba_scene = None
         self.params = None
         self.render = None
+        self.render_info = {}
+        self.crop_window = None
+        self.pad_crop = True
+        self.band_group_size = None
+        self.memory_budget_mb = None
+        self._crop_sensor = None
+        self._sensor_dict = None
+        self._scene_dict = None
+        self._tile_pool = None
+        self._tile_workers = None
+        self._camera = None
+        self._transforms = {}
+        self._mesh_positions = {}
 
     def load_scene(self, scene_dict: dict):
         """Loads scene dict into mitsuba and gets scene parameters
@@ -66,12 +185,371 @@ class RendererControl:
             Dictionary containing all scene information
         """
 
+        self.close()
         self.mitsuba_scene = mi.load_dict(scene_dict)
+        self._scene_dict = scene_dict
         self.params = mi.traverse(self.mitsuba_scene)
+        self._transforms = {
+            object_id: np.array(object_dict["to_world"].matrix)
+            for object_id, object_dict in scene_dict.items()
+            if isinstance(object_dict, dict) and "to_world" in object_dict
+        }
+        self._mesh_positions = {}
+
+        sensor_dict = scene_dict["sensor"]
+        self._sensor_dict = sensor_dict
+        self.set_crop(None)
+        self._camera = (
+            sensor_dict["fov"],
+            sensor_dict.get("fov_axis", "x"),
+            sensor_dict["film"]["width"],
+            sensor_dict["film"]["height"],
+        )
+
+    def _transform_mesh(self, object_id: str, matrix: np.array):
+        """Moves mesh vertices from their loaded position to a transform
+
+        Mitsuba bakes the transform of a mesh into its vertex positions
+        when the scene is loaded. The loaded vertex positions are kept so
+        each new transform is applied relative to the loaded state.
+
+        Parameters
+        ----------
+        object_id : str
+            Name of the mesh in the scene dictionary
+        matrix : np.array
+            4x4 transform matrix of the mesh
+        """
+        key = f"{object_id}.vertex_positions"
+        if object_id not in self._mesh_positions:
+            self._mesh_positions[object_id] = (
+                np.array(self.params[key], dtype=np.float64).reshape(-1, 3),
+                np.linalg.inv(self._transforms[object_id]),
+            )
+        positions, inverse_loaded = self._mesh_positions[object_id]
+
+        relative = matrix @ inverse_loaded
+        moved = positions @ relative[:3, :3].T + relative[:3, 3]
+        self.params[key] = type(self.params[key])(
+            moved.astype(np.float32).ravel()
+        )
+
+    def update_transforms(self, transforms: dict):
+        """Moves objects in the loaded scene without reloading it
+
+        Sensor and emitter transforms are set directly, meshes have their
+        vertex positions moved. Objects that have not moved are skipped.
+
+        Parameters
+        ----------
+        transforms : dict
+            New transforms keyed by object name in the scene dictionary
+
+        Raises
+        -------
+        NoSceneLoaded
+            If the mitsuba_scene attribute is None
+        KeyError
+            If an object was not loaded with a to_world transform
+        """
+        if self.mitsuba_scene is None:
+            raise NoSceneLoaded("No scene to update")
+
+        for object_id, to_world in transforms.items():
+            if object_id not in self._transforms:
+                raise KeyError(
+                    f"{object_id} has no transform in the loaded scene"
+                )
+
+            matrix = np.array(to_world.matrix)
+            if np.array_equal(matrix, self._transforms[object_id]):
+                continue
+
+            if f"{object_id}.vertex_positions" in self.params:
+                self._transform_mesh(object_id, matrix)
+            else:
+                self.params[f"{object_id}.to_world"] = to_world
+            self._transforms[object_id] = matrix
+
+        self.params.update()
+
+    def footprint(self, object_ids: list, margin: int = 0) -> tuple:
+        """Returns the window of the film covered by objects in the scene
+
+        The bounding boxes of the objects in the loaded scene are
+        projected through the sensor.
+
+        Parameters
+        ----------
+        object_ids : list
+            Names of shapes in the scene dictionary (e.g. target parts)
+        margin : int, optional
+            Pixels added around the window, by default 0
+
+        Returns
+        -------
+        tuple
+            Window (offset_x, offset_y, size_x, size_y) in pixels or None
+            if the objects are not in view
+
+        Raises
+        -------
+        NoSceneLoaded
+            If the mitsuba_scene attribute is None
+        """
+        if self.mitsuba_scene is None:
+            raise NoSceneLoaded("No scene loaded")
+
+        corners = [
+            projection.bounding_box_corners(
+                np.array(shape.bbox().min), np.array(shape.bbox().max)
+            )
+            for shape in self.mitsuba_scene.shapes()
+            if shape.id() in object_ids
+        ]
+        if not corners:
+            return None
+
+        return projection.footprint_window(
+            np.concatenate(corners),
+            self._transforms["sensor"],
+            *self._camera,
+            margin=margin,
+        )
+
+    def set_crop(self, window: tuple, pad: bool = True):
+        """Restricts rendering to a window of the film
+
+        A copy of the sensor with a cropped film is loaded at the current
+        sensor transform, so the crop must be set after the sensor is
+        moved.
+
+        Parameters
+        ----------
+        window : tuple
+            Film window (offset_x, offset_y, size_x, size_y) in pixels,
+            None to render the whole film
+        pad : bool, optional
+            Place cropped renders in an empty full size film, by default
+            True
+        """
+        self.crop_window = window
+        self.pad_crop = pad
+        self._crop_sensor = None
+
+        if window is not None:
+            self._crop_sensor = self._load_sensor()
+
+    def set_band_groups(
+        self,
+        group_size: int = BAND_GROUP_DEFAULTS["group_size"],
+        memory_budget_mb: float = BAND_GROUP_DEFAULTS["memory_budget_mb"],
+    ):
+        """Splits the film bands into groups rendered in separate passes
+
+        Every pass renders the loaded scene with a copy of the sensor
+        whose film only has the bands of one group, so film memory is
+        bounded by the group size instead of the number of bands.
+
+        Parameters
+        ----------
+        group_size : int, optional
+            Maximum number of bands per pass, by default None (all bands)
+        memory_budget_mb : float, optional
+            Film memory allowed per pass [MB], used to choose the group
+            size, by default None (no limit)
+        """
+        self.band_group_size = group_size
+        self.memory_budget_mb = memory_budget_mb
 
-    def run(self):
+    def _film_bands(self) -> list:
+        """Returns names of the film bands in render channel order"""
+        # Mitsuba orders the channels of a spectral film by name
+        return sorted(
+            key
+            for key, value in self._sensor_dict["film"].items()
+            if isinstance(value, dict) and key != "rfilter"
+        )
+
+    def _band_groups(self) -> list:
+        """Returns the film bands of each band group pass
+
+        Returns
+        -------
+        list
+            Lists of band names, None to render all bands in one pass
+        """
+        bands = self._film_bands()
+        width, height = self._camera[2:]
+        if self.crop_window is not None:
+            width, height = self.crop_window[2:]
+        group_size = band_group_size(
+            len(bands),
+            width,
+            height,
+            self.band_group_size,
+            self.memory_budget_mb,
+        )
+
+        if group_size >= len(bands):
+            return None
+        return [
+            bands[start: start + group_size]
+            for start in range(0, len(bands), group_size)
+        ]
+
+    def _load_sensor(self, bands: list = None):
+        """Loads a copy of the sensor at the current sensor transform
+
+        The film of the copy is cropped to the crop window (if set) and
+        only has the given bands.
+
+        Parameters
+        ----------
+        bands : list, optional
+            Names of the film bands, by default None (all bands)
+
+        Returns
+        -------
+        Sensor
+            Mitsuba sensor
+        """
+        sensor_dict = dict(
+            self._sensor_dict,
+            to_world=mi.ScalarTransform4f(self._transforms["sensor"]),
+        )
+        film_dict = dict(sensor_dict["film"])
+
+        if self.crop_window is not None:
+            offset_x, offset_y, size_x, size_y = self.crop_window
+            film_dict.update(
+                crop_offset_x=offset_x,
+                crop_offset_y=offset_y,
+                crop_width=size_x,
+                crop_height=size_y,
+            )
+        if bands is not None:
+            for band in set(self._film_bands()) - set(bands):
+                del film_dict[band]
+
+        sensor_dict["film"] = film_dict
+        return mi.load_dict(sensor_dict)
+
+    def _render(self, spp: int, seed: int = 0) -> np.ndarray:
+        """Renders the scene with the cropped sensor if a crop is set
+
+        With band groups every group is rendered in its own pass and
+        written into the channels of the result.
+
+        Parameters
+        ----------
+        spp : int
+            Samples per pixel (0 for the sampler sample count)
+        seed : int, optional
+            Sampler seed, by default 0
+
+        Returns
+        -------
+        TensorXf
+            Rendered tensor of the film (or film window)
+        """
+        band_groups = self._band_groups()
+
+        if band_groups is not None:
+            render = None
+            channel = 0
+            for bands in band_groups:
+                group = np.array(
+                    mi.render(
+                        self.mitsuba_scene,
+                        sensor=self._load_sensor(bands),
+                        seed=seed,
+                        spp=spp,
+                    )
+                )
+                if render is None:
+                    render = np.empty(
+                        group.shape[:2] + (len(self._film_bands()),),
+                        dtype=np.float32,
+                    )
+                render[..., channel: channel + len(bands)] = group
+                channel += len(bands)
+            return render
+
+        if self._crop_sensor is not None:
+            return mi.render(
+                self.mitsuba_scene,
+                sensor=self._crop_sensor,
+                seed=seed,
+                spp=spp,
+            )
+        return mi.render(self.mitsuba_scene, seed=seed, spp=spp)
+
+    def _crop_info(self, render) -> dict:
+        """Returns the crop and band group metadata of a render
+
+        Parameters
+        ----------
+        render : TensorXf
+            Rendered tensor
+
+        Returns
+        -------
+        dict
+            Crop window, film size and padding, and number of band group
+            passes (empty without a crop or band groups)
+        """
+        info = {}
+        band_groups = self._band_groups()
+        if band_groups is not None:
+            info["band_groups"] = len(band_groups)
+
+        if self.crop_window is None:
+            return info
+
+        return {
+            "crop_window": list(self.crop_window),
+            "film_size": list(self._camera[2:]),
+            "crop_padded": self.pad_crop,
+            **info,
+        }
+
+    def _pad(self, render):
+        """Places a cropped render in an empty full size film
+
+        Parameters
+        ----------
+        render : TensorXf
+            Rendered tensor of the film window
+
+        Returns
+        -------
+        TensorXf
+            Full film tensor (or the render if no padding is needed)
+        """
+        if self.crop_window is None or not self.pad_crop:
+            return render
+
+        offset_x, offset_y, size_x, size_y = self.crop_window
+        width, height = self._camera[2:]
+        render = np.array(render)
+        film = np.zeros((height, width, render.shape[-1]), render.dtype)
+        film[offset_y: offset_y + size_y, offset_x: offset_x + size_x] = (
+            render
+        )
+        return film
+
+    def run(self, spp: int = 0, seed: int = 0):
         """Renders the loaded scene with mitsuba
 
+        Parameters
+        ----------
+        spp : int, optional
+            Samples per pixel overriding the sampler sample count, by
+            default 0 (use the sampler sample count)
+        seed : int, optional
+            Sampler seed, by default 0
+
         Raises
         -------
         NoSceneLoaded
@@ -81,7 +559,491 @@ class RendererControl:
         if self.mitsuba_scene is None:
             raise NoSceneLoaded("No scene to render")
 
-        self.render = mi.render(self.mitsuba_scene)
+        start = time.perf_counter()
+        render = self._render(spp, seed)
+        self.render = self._pad(render)
+        self.render_info = {
+            "mode": "fixed",
+            "sample_count": spp or self._sample_count(),
+            "render_time": time.perf_counter() - start,
+            **self._crop_info(render),
+        }
+
+    def _sample_count(self) -> int:
+        """Returns the sample count of the sensor sampler"""
+        return self.mitsuba_scene.sensors()[0].sampler().sample_count()
+
+    def run_tiled(
+        self,
+        spp: int = 0,
+        tile_size: int = TILED_DEFAULTS["tile_size"],
+        workers: int = TILED_DEFAULTS["workers"],
+        seed: int = TILED_DEFAULTS["seed"],
+    ):
+        """Renders the film as tiles in a pool of worker processes
+
+        The film (or crop window if set) is split into square tiles which
+        are rendered by worker processes with the seed ``seed + tile
+        index`` and stitched together. The result is the same for every
+        run with the same tile layout. Workers load the scene once and
+        are kept until the next scene is loaded, so later renders only
+        send the object transforms (see tiling.create_pool).
+
+        Parameters
+        ----------
+        spp : int, optional
+            Samples per pixel overriding the sampler sample count, by
+            default 0 (use the sampler sample count)
+        tile_size : int, optional
+            Width and height of tiles in pixels
+        workers : int, optional
+            Number of worker processes, by default None (one per CPU)
+        seed : int, optional
+            Seed of the first tile
+
+        Raises
+        -------
+        NoSceneLoaded
+            If the mitsuba_scene attribute is None
+        """
+        if self.mitsuba_scene is None:
+            raise NoSceneLoaded("No scene to render")
+
+        start = time.perf_counter()
+        if self._tile_pool is None or self._tile_workers != workers:
+            self.close()
+            self._tile_pool = tiling.create_pool(
+                mi.variant(), self._scene_dict, workers
+            )
+            self._tile_workers = workers
+
+        width, height = self._camera[2:]
+        window = self.crop_window or (0, 0, width, height)
+        offset_x, offset_y, size_x, size_y = window
+        transforms = {
+            object_id: matrix.tolist()
+            for object_id, matrix in self._transforms.items()
+        }
+
+        tile_windows = tiling.split_window(window, tile_size)
+        futures = [
+            self._tile_pool.submit(
+                tiling.render_tile,
+                transforms,
+                tile,
+                seed + index,
+                spp,
+                (self.band_group_size, self.memory_budget_mb),
+            )
+            for index, tile in enumerate(tile_windows)
+        ]
+        tiles = [future.result() for future in futures]
+
+        channels = tiles[0]["render"].shape[-1]
+        render = np.zeros((size_y, size_x, channels), dtype=np.float32)
+        for tile in tiles:
+            x, y, tile_x, tile_y = tile["window"]
+            render[
+                y - offset_y: y - offset_y + tile_y,
+                x - offset_x: x - offset_x + tile_x,
+            ] = tile.pop("render")
+
+        tile_times = [tile["render_time"] for tile in tiles]
+        logging.info(
+            "Rendered %d tiles, tile time mean %.2fs max %.2fs",
+            len(tiles),
+            np.mean(tile_times),
+            np.max(tile_times),
+        )
+
+        self.render = self._pad(render)
+        self.render_info = {
+            "mode": "tiled",
+            "sample_count": spp or self._sample_count(),
+            "render_time": time.perf_counter() - start,
+            "tile_size": tile_size,
+            "tiles": tiles,
+            **self._crop_info(render),
+        }
+
+    def close(self):
+        """Stops tile worker processes"""
+        if self._tile_pool is not None:
+            self._tile_pool.shutdown()
+            self._tile_pool = None
+
+    def run_progressive(
+        self,
+        pass_sample_count: int = PROGRESSIVE_DEFAULTS["pass_sample_count"],
+        tolerance: float = PROGRESSIVE_DEFAULTS["tolerance"],
+        max_sample_count: int = PROGRESSIVE_DEFAULTS["max_sample_count"],
+        max_time: float = PROGRESSIVE_DEFAULTS["max_time"],
+        window: tuple = None,
+    ):
+        """Renders the scene in passes until the render converges
+
+        Each pass is rendered with a new seed and the running mean and
+        variance of the passes are accumulated per pixel (Welford's
+        method). Rendering stops when the relative standard error of the
+        mean inside the window drops below the tolerance, or the sample
+        count or time limit is reached. The relative standard error in
+        render_info is None if only one pass was rendered.
+
+        Parameters
+        ----------
+        pass_sample_count : int, optional
+            Samples per pixel of each pass
+        tolerance : float, optional
+            Relative standard error at which the render has converged
+        max_sample_count : int, optional
+            Maximum total samples per pixel
+        max_time : float, optional
+            Maximum render time [s], by default None (no limit)
+        window : tuple, optional
+            Film window (offset_x, offset_y, size_x, size_y) in which the
+            error is measured, by default None (whole film or the crop
+            window if set)
+
+        Raises
+        -------
+        NoSceneLoaded
+            If the mitsuba_scene attribute is None
+        """
+        if self.mitsuba_scene is None:
+            raise NoSceneLoaded("No scene to render")
+
+        start = time.perf_counter()
+        mean = None
+        squared_deviations = None
+        passes = 0
+        error = np.inf
+
+        while True:
+            image = np.array(
+                self._render(pass_sample_count, seed=passes),
+                dtype=np.float64,
+            )
+            passes += 1
+
+            if mean is None:
+                mean = image
+                squared_deviations = np.zeros_like(image)
+            else:
+                delta = image - mean
+                mean += delta / passes
+                squared_deviations += delta * (image - mean)
+                error = relative_standard_error(
+                    mean, squared_deviations, passes, window
+                )
+
+            elapsed = time.perf_counter() - start
+            logging.info(
+                "Pass %d (%d spp): relative standard error %.4g",
+                passes,
+                passes * pass_sample_count,
+                error,
+            )
+
+            if error <= tolerance:
+                break
+            if passes * pass_sample_count >= max_sample_count:
+                break
+            if max_time is not None and elapsed >= max_time:
+                break
+
+        self.render = self._pad(mean.astype(np.float32))
+        self.render_info = {
+            "mode": "progressive",
+            "sample_count": passes * pass_sample_count,
+            "passes": passes,
+            # None when no error was measured (a single pass)
+            "relative_standard_error": (
+                float(error) if np.isfinite(error) else None
+            ),
+            "tolerance": tolerance,
+            "converged": bool(error <= tolerance),
+            "error_window": list(window) if window else None,
+            "render_time": time.perf_counter() - start,
+            **self._crop_info(mean),
+        }
+
+
+def relative_standard_error(
+    mean: np.ndarray,
+    squared_deviations: np.ndarray,
+    passes: int,
+    window: tuple = None,
+) -> float:
+    """Returns relative standard error of the mean of render passes
+
+    The root mean square standard error of the pixels in the window is
+    divided by their mean absolute value, so dark pixels do not dominate.
+
+    Parameters
+    ----------
+    mean : np.ndarray
+        Mean of the passes, shape (height, width, channels)
+    squared_deviations : np.ndarray
+        Sum of squared deviations from the mean of the passes
+    passes : int
+        Number of passes (at least 2)
+    window : tuple, optional
+        Film window (offset_x, offset_y, size_x, size_y), by default None
+        (whole film)
+
+    Returns
+    -------
+    float
+        Relative standard error
+    """
+    if window is not None:
+        offset_x, offset_y, size_x, size_y = window
+        region = np.s_[
+            offset_y: offset_y + size_y, offset_x: offset_x + size_x
+        ]
+        mean = mean[region]
+        squared_deviations = squared_deviations[region]
+
+    variance_of_mean = squared_deviations / ((passes - 1) * passes)
+    standard_error = np.sqrt(np.mean(variance_of_mean))
+    signal = np.mean(np.abs(mean))
+
+    if signal == 0:
+        return 0.0 if standard_error == 0 else np.inf
+    return float(standard_error / signal)
+
+
+def calculate_relative_distance(p1: list, p2: list):
+    """Calculates relative distance between two points
+
+    Calculates distance between two points in a 3d
+    cartesian coordinate system.
+
+    Parameters
+    ----------
+    p1 : list
+        First set of coordinates in 3 dimensions [x,y,z]
+    p2 : list
+        Second set of coordinates in 3 dimensions [x,y,z]
+
+    Returns
+    -------
+    float
+        Distance between two points
+    """
+    return (
+        (p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2 + (p2[2] - p1[2]) ** 2
+    ) ** (0.5)
+
+
+def scene_geometry(scene) -> dict:
+    """Returns the geometry of a built scene as output metadata
+
+    Parameters
+    ----------
+    scene : sc.SceneBuilder
+        Built scene
+
+    Returns
+    -------
+    dict
+        Epoch [s past J2000], chaser and target positions, sun direction,
+        relative distance and chaser to world matrix
+    """
+    return {
+        "epoch": float(scene.orbit_data.epoch),
+        "chaser_position": np.asarray(scene.chaser.position).tolist(),
+        "target_position": np.asarray(scene.target.position).tolist(),
+        "sun_direction": np.asarray(
+            scene.orbit_data.sun_direction_vector
+        ).tolist(),
+        "relative_distance": float(
+            calculate_relative_distance(
+                scene.chaser.position, scene.target.position
+            )
+        ),
+        "chaser_to_world": np.array(scene.chaser.to_world().matrix).tolist(),
+    }
+
+
+def produce_outputs(
+    render, render_info, scene, run_directory, user_inputs, frame=None
+):
+    """Produces the output files of a render
+
+    If the scene has synthesized sensors the image of each sensor is
+    derived from the render and exported (see hysim.synthesis).
+
+    Parameters
+    ----------
+    render : TensorXf
+        Rendered tensor
+    render_info : dict
+        Render metadata
+    scene : sc.SceneBuilder
+        Builder holding the scene objects and final scene dictionary
+    run_directory : str
+        Path to the case directory
+    user_inputs : input_data.Configs
+        Object containing user input data
+    frame : int, optional
+        Frame number added to output file names, by default None
+    """
+    metadata = dict(render_info, geometry=scene_geometry(scene))
+
+    with telemetry.recorder.stage("export"):
+        if scene.synthesized_sensors:
+            synthesis.produce_sensor_outputs(
+                render,
+                scene.chaser.sensor.film,
+                scene.synthesized_sensors,
+                run_directory,
+                user_inputs,
+                frame=frame,
+                metadata=metadata,
+            )
+            return
+
+        output = output_data.OutputHandler(
+            render,
+            scene.chaser.sensor.film,
+            run_directory,
+            frame=frame,
+            metadata=metadata,
+        )
+        output.produce_output_data(user_inputs)
+
+
+def build_scene(user_inputs, orbit_data):
+    """Assembles the scene from user inputs and orbit data
+
+    Parameters
+    ----------
+    user_inputs : input_data.Configs
+        Object containing user input data
+    orbit_data : frames.MissionInputProcessor
+        Orbit data converted from user inputs
+
+    Returns
+    -------
+    sc.SceneBuilder
+        Builder holding the scene objects and final scene dictionary
+    """
+    with telemetry.recorder.stage("build_scene"):
+        scene = sc.SceneBuilder(user_inputs, orbit_data)
+        scene.build_integrator()
+        scene.build_sampler()
+        scene.build_sun()
+        scene.build_chaser()
+        scene.build_target()
+        scene.build_debris()
+        scene.build_earth()
+        scene.clip_spectra()
+        scene.build_scene_dict()
+    return scene
+
+
+def render_scene(renderer, scene, render_cache=None, spp=0):
+    """Renders the scene or loads the render from the render cache
+
+    The scene is only loaded into Mitsuba when a render is needed, so
+    cached cases never load meshes. A loaded scene is moved to the
+    current object transforms of the scene builder before rendering.
+    If the case config has a ``progressive`` entry the scene is rendered
+    progressively until the error in the target footprint converges. If it
+    has a ``region_of_interest`` entry only the window of the film covering
+    the target is rendered. If it has a ``tiled`` entry the film is
+    rendered as tiles in worker processes. If it has a ``band_groups``
+    entry the film bands are rendered in groups in separate passes.
+
+    Parameters
+    ----------
+    renderer : RendererControl
+        Renderer that loads the scene when it is first rendered
+    scene : sc.SceneBuilder
+        Builder holding the scene objects and final scene dictionary
+    render_cache : RenderCache, optional
+        Cache of rendered tensors, by default None (always render)
+    spp : int, optional
+        Samples per pixel overriding the sampler sample count, by
+        default 0 (use the sampler sample count)
+
+    Returns
+    -------
+    render : TensorXf
+        Rendered tensor (numpy array when loaded from cache or rendered
+        progressively)
+    render_info : dict
+        Sample count, timing and convergence of the render
+    """
+    transforms = scene.object_transforms()
+    case_config = scene.user_inputs.case_config
+    settings = {}
+    for name, defaults in [
+        ("progressive", PROGRESSIVE_DEFAULTS),
+        ("region_of_interest", REGION_OF_INTEREST_DEFAULTS),
+        ("tiled", TILED_DEFAULTS),
+        ("band_groups", BAND_GROUP_DEFAULTS),
+    ]:
+        if name in case_config:
+            settings[name] = dict(defaults, **(case_config[name] or {}))
+    key = None
+
+    if render_cache is not None:
+        key = render_cache.key(
+            scene.scene_dict, mi.variant(), transforms, spp, settings
+        )
+        with telemetry.recorder.stage("render_cache"):
+            render, render_info = render_cache.load(key)
+        if render is not None:
+            logging.info("Render loaded from cache")
+            return render, render_info
+
+    if renderer.mitsuba_scene is None:
+        logging.info("Loading scene into Mitsuba")
+        with telemetry.recorder.stage("load_scene"):
+            renderer.load_scene(scene.scene_dict)
+        logging.info("Scene assembled successfully")
+    renderer.update_transforms(transforms)
+    renderer.set_band_groups(**settings.get("band_groups", {}))
+
+    target_parts = scene.target.shape_names()
+    error_window = None
+
+    if "region_of_interest" in settings:
+        region_of_interest = settings["region_of_interest"]
+        window = renderer.footprint(
+            target_parts, region_of_interest["margin"]
+        )
+        if window is None:
+            logging.warning("Target not in view, rendering whole film")
+        else:
+            logging.info("Rendering film window %s", window)
+        renderer.set_crop(window, region_of_interest["pad"])
+    elif "progressive" in settings:
+        error_window = renderer.footprint(
+            target_parts, settings["progressive"]["footprint_margin"]
+        )
+        logging.info("Measuring render error in film window %s", error_window)
+
+    logging.info("Running Mitsuba")
+    with telemetry.recorder.stage("render"):
+        if "progressive" in settings:
+            progressive = dict(settings["progressive"])
+            del progressive["footprint_margin"]
+            if "tiled" in settings:
+                logging.warning("Progressive renders are not tiled")
+            renderer.run_progressive(window=error_window, **progressive)
+        elif "tiled" in settings:
+            renderer.run_tiled(spp=spp, **settings["tiled"])
+        else:
+            renderer.run(spp=spp)
+    logging.info("Render complete")
+
+    if render_cache is not None:
+        render_cache.store(key, renderer.render, renderer.render_info)
+
+    return renderer.render, renderer.render_info
 
 
 def run_sim(run_directory):
@@ -93,9 +1055,17 @@ def run_sim(run_directory):
     assembled. The scene is then rendered and the output
     is converted to the format specified in the configs.
 
+    If the mission config has a trajectory entry the case is
+    run as a trajectory (see run_trajectory).
+
     The run directory must be the root of the folders
     containing all configuration files.
 
+    Unless disabled by the ``telemetry`` entry of the case
+    config, the time and memory use of each stage of the run
+    are written to metrics.json in the run directory, also
+    when the run fails (see hysim.telemetry).
+
     Parameters
     ----------
     run_directory : str
@@ -110,50 +1080,59 @@ def run_sim(run_directory):
     # ------------------------------- #
     logging.info("Getting user inputs from configuration files")
 
-    user_inputs = input_data.Configs()
-    user_inputs.load_configs(run_directory)
-    kernel_paths = dh.get_kernel_paths()
+    recorder = telemetry.recorder
+    recorder.reset()
+    with recorder.stage("load_configs"):
+        user_inputs = input_data.Configs()
+        user_inputs.load_configs(run_directory)
+        kernel_paths = dh.get_kernel_paths()
 
-    logging.info("Calculating scene geometry from orbit data")
-    orbit_data = frames.MissionInputProcessor(
-        user_inputs.mission_config, kernel_paths
-    )
-    mi.set_variant(user_inputs.case_config["mitsuba_variant"])
+    settings = telemetry.telemetry_settings(user_inputs.case_config)
+    if settings["tracemalloc"]:
+        recorder.start_tracing()
 
-    # ------------------------------- #
-    # Assemble Scene
-    # ------------------------------- #
-    logging.info("Building scene")
-    scene = sc.SceneBuilder(user_inputs, orbit_data)
-    scene.build_integrator()
-    scene.build_sampler()
-    scene.build_sun()
-    scene.build_chaser()
-    scene.build_target()
-    scene.build_earth()
-    scene.build_scene_dict()
+    try:
+        logging.info("Calculating scene geometry from orbit data")
+        with recorder.stage("orbit_geometry"):
+            orbit_data = frames.MissionInputProcessor(
+                user_inputs.mission_config, kernel_paths
+            )
 
-    def calculate_relative_distance(p1: list, p2: list):
-        """Calculates relative distance between two points
+        with orbit_data:
+            mi.set_variant(user_inputs.case_config["mitsuba_variant"])
 
-        Calculates distance between two points in a 3d
-        cartesian coordinate system.
+            if "trajectory" in user_inputs.mission_config:
+                run_trajectory(run_directory, user_inputs, orbit_data)
+            else:
+                run_single_epoch(run_directory, user_inputs, orbit_data)
+    finally:
+        if settings["enabled"]:
+            telemetry.write_metrics(
+                recorder.metrics({"case": run_directory}),
+                run_directory,
+                settings["prometheus"],
+            )
+        recorder.stop()
 
-        Parameters
-        ----------
-        p1 : list
-            First set of coordinates in 3 dimensions [x,y,z]
-        p2 : list
-            Second set of coordinates in 3 dimensions [x,y,z]
 
-        Returns
-        -------
-        float
-            Distance between two points
-        """
-        return (
-            (p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2 + (p2[2] - p1[2]) ** 2
-        ) ** (0.5)
+def run_single_epoch(run_directory, user_inputs, orbit_data):
+    """Runs a quasi-static case at the mission epoch
+
+    Parameters
+    ----------
+    run_directory : str
+        Path to the case directory containing configuration
+        files and user data.
+    user_inputs : input_data.Configs
+        Object containing user input data
+    orbit_data : frames.MissionInputProcessor
+        Orbit data converted from user inputs
+    """
+    # ------------------------------- #
+    # Assemble Scene
+    # ------------------------------- #
+    logging.info("Building scene")
+    scene = build_scene(user_inputs, orbit_data)
 
     relative_distance = calculate_relative_distance(
         scene.chaser.position, scene.target.position
@@ -171,24 +1150,77 @@ def run_sim(run_directory):
     logging.debug("Final Scene Dictionary...")
     logging.debug(scene.scene_dict)
 
-    logging.info("Loading scene into Mitsuba")
-
     sim = RendererControl()
-    sim.load_scene(scene.scene_dict)
-    logging.info("Scene assembled successfully")
-    logging.info("Running Mitsuba")
-
     print("\n")
-    sim.run()
+    render, render_info = render_scene(
+        sim, scene, RenderCache.from_config(user_inputs.case_config)
+    )
     print("\n")
 
-    logging.info("Render complete")
     # ------------------------------- #
     # Export Outputs
     # ------------------------------- #
-    output = output_data.OutputHandler(
-        sim.render,
-        scene.chaser.sensor.film,
-        run_directory,
+    produce_outputs(render, render_info, scene, run_directory, user_inputs)
+    sim.close()
+
+
+def run_trajectory(run_directory, user_inputs, orbit_data):
+    """Runs a trajectory case rendering a frame at each epoch
+
+    The scene geometry of every epoch is calculated at once, then the
+    scene is built and loaded into Mitsuba once at the first
+    epoch. For every following epoch only the sensor, target and
+    Earth transforms and the sun direction are updated in the loaded
+    scene before rendering, so meshes and acceleration structures are
+    not rebuilt. Outputs of each frame are numbered by frame.
+
+    Parameters
+    ----------
+    run_directory : str
+        Path to the case directory containing configuration
+        files and user data.
+    user_inputs : input_data.Configs
+        Object containing user input data
+    orbit_data : frames.MissionInputProcessor
+        Orbit data converted from user inputs
+    """
+    epochs = frames.get_trajectory_epochs(
+        user_inputs.mission_config["trajectory"]
     )
-    output.produce_output_data(user_inputs)
+    logging.info("Running trajectory with %d frames", len(epochs))
+    with telemetry.recorder.stage("orbit_geometry"):
+        geometry = orbit_data.compute_geometry(epochs)
+
+    sim = RendererControl()
+    render_cache = RenderCache.from_config(user_inputs.case_config)
+    scene = None
+
+    for frame in range(len(geometry)):
+        frame_geometry = geometry[frame]
+
+        if scene is None:
+            logging.info("Building scene")
+            scene = build_scene(user_inputs, frame_geometry)
+        else:
+            with telemetry.recorder.stage("update_scene"):
+                scene.orbit_data = frame_geometry
+                scene.update_geometry()
+
+        relative_distance = calculate_relative_distance(
+            scene.chaser.position, scene.target.position
+        )
+        logging.info(
+            "Frame %d/%d: relative distance to target: %0.2fm",
+            frame + 1,
+            len(epochs),
+            relative_distance,
+        )
+
+        render, render_info = render_scene(sim, scene, render_cache)
+
+        produce_outputs(
+            render, render_info, scene, run_directory, user_inputs, frame
+        )
+
+    sim.close()
+    logging.info("Trajectory complete")
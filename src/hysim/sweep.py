@@ -0,0 +1,388 @@
+"""Parameter Sweep Module
+
+Runs a base case many times with changes to selected config entries. The
+sweep is defined in a config file with the header
+``file_type: sweep_config`` that lists dotted config keys and their values,
+for example ``case_config.sampler.sample_count: [4, 16, 64]``. Runs are
+expanded in memory from the configs of the case which are loaded once.
+
+Runs that only change the mission config or the sample count share a scene:
+the scene is loaded into Mitsuba once and only object transforms and the
+sample count change between runs. Groups of runs sharing a scene are spread
+over a pool of worker processes.
+"""
+import os
+import copy
+import json
+import time
+import logging
+import itertools
+import traceback
+
+from hysim import input_data
+from hysim import batch
+
+# Default directory for sweep outputs inside the case directory
+OUTPUT_DIRECTORY = "sweep_output"
+SUMMARY_FILE = "sweep_summary.json"
+
+
+def expand_sweep(sweep_config: dict) -> list:
+    """Expands a sweep config into the config changes of each run
+
+    Parameters
+    ----------
+    sweep_config : dict
+        Sweep config with ``parameters`` (dotted key: list of values) and
+        optional ``mode`` (``product`` for the cartesian grid of values or
+        ``zip`` to pair values by position, default ``product``)
+
+    Returns
+    -------
+    list
+        Dictionary of dotted key: value for each run
+
+    Raises
+    ------
+    ValueError
+        If the mode is unknown or zipped value lists differ in length
+    """
+    parameters = sweep_config["parameters"]
+    keys = list(parameters)
+    mode = sweep_config.get("mode", "product")
+
+    if mode == "product":
+        combinations = itertools.product(*parameters.values())
+    elif mode == "zip":
+        lengths = {len(values) for values in parameters.values()}
+        if len(lengths) > 1:
+            raise ValueError("Zipped sweep parameters must be equal length")
+        combinations = zip(*parameters.values())
+    else:
+        raise ValueError(f"{mode} is an invalid sweep mode")
+
+    return [dict(zip(keys, values)) for values in combinations]
+
+
+def scene_key(user_inputs: input_data.Configs) -> str:
+    """Returns a key identifying the Mitsuba scene needed by a run
+
+    Mission config entries and the sample count can be changed in a
+    loaded scene, all other entries need the scene to be reloaded.
+
+    Parameters
+    ----------
+    user_inputs : input_data.Configs
+        Configs of the run
+
+    Returns
+    -------
+    str
+        Key shared by runs that can reuse the same loaded scene
+    """
+    case_config = copy.deepcopy(user_inputs.case_config)
+    case_config.pop("output", None)
+    case_config.get("sampler", {}).pop("sample_count", None)
+
+    return json.dumps(
+        [
+            case_config,
+            user_inputs.sensor_config,
+            user_inputs.parts_config,
+            user_inputs.additional_materials,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def create_runs(
+    base_inputs: input_data.Configs, output_directory: str = None
+) -> list:
+    """Creates the configs of each run of the sweep
+
+    Outputs of each run are written to a numbered directory inside the
+    sweep output directory.
+
+    Parameters
+    ----------
+    base_inputs : input_data.Configs
+        Configs of the base case including the sweep config
+    output_directory : str, optional
+        Directory for sweep outputs, by default the ``output_directory``
+        entry of the sweep config or OUTPUT_DIRECTORY
+
+    Returns
+    -------
+    list
+        Dictionaries with index, config changes, output directory and
+        configs of each run
+    """
+    sweep_config = base_inputs.sweep_config
+    if output_directory is None:
+        output_directory = sweep_config.get(
+            "output_directory", OUTPUT_DIRECTORY
+        )
+
+    runs = []
+    for index, changes in enumerate(expand_sweep(sweep_config)):
+        run_inputs = copy.deepcopy(base_inputs)
+        for key, value in changes.items():
+            run_inputs.set_entry(key, value)
+
+        run_directory = os.path.join(output_directory, f"run_{index:04d}")
+        run_inputs.case_config["output"] = [
+            dict(
+                output_selection,
+                file_name=os.path.join(
+                    run_directory, output_selection["file_name"]
+                ),
+            )
+            for output_selection in run_inputs.case_config["output"]
+        ]
+
+        runs.append(
+            {
+                "index": index,
+                "changes": changes,
+                "output_directory": run_directory,
+                "inputs": run_inputs,
+            }
+        )
+
+    return runs
+
+
+def plan_tasks(runs: list, workers: int) -> list:
+    """Groups runs sharing a scene into tasks for the worker pool
+
+    Groups are split in half (largest first) until there is a task for
+    every worker, so a sweep with few scenes still uses all workers.
+
+    Parameters
+    ----------
+    runs : list
+        Runs from create_runs
+    workers : int
+        Number of worker processes
+
+    Returns
+    -------
+    list
+        Lists of runs, each run by one worker with one loaded scene
+    """
+    groups = {}
+    for run in runs:
+        groups.setdefault(scene_key(run["inputs"]), []).append(run)
+
+    tasks = list(groups.values())
+    while len(tasks) < workers:
+        largest = max(tasks, key=len)
+        if len(largest) < 2:
+            break
+        tasks.remove(largest)
+        middle = len(largest) // 2
+        tasks.extend([largest[:middle], largest[middle:]])
+
+    return tasks
+
+
+def run_sweep_task(case_directory: str, runs: list) -> list:
+    """Runs a group of runs sharing one loaded scene
+
+    The scene is loaded for the first rendered run and moved to the
+    geometry of each following run. Runs found in the render cache are not
+    rendered. Failing runs are recorded rather than raised. The time and
+    memory use of each stage of a run are added to its result and written
+    to metrics.json in its output directory (see hysim.telemetry).
+
+    Parameters
+    ----------
+    case_directory : str
+        Path to the case directory
+    runs : list
+        Runs from create_runs that share a scene
+
+    Returns
+    -------
+    list
+        Status, timing and stage metrics of each run
+    """
+    import mitsuba as mi
+    from hysim import sim
+    from hysim import telemetry
+    from hysim.render_cache import RenderCache
+    from hysim.data import data_handling as dh
+    from hysim.scene import frame_transforms as frames
+
+    renderer = sim.RendererControl()
+    scene = None
+    results = []
+    working_directory = os.getcwd()
+    os.chdir(case_directory)
+
+    try:
+        for run in runs:
+            user_inputs = run["inputs"]
+            result = {
+                "index": run["index"],
+                "changes": run["changes"],
+                "output_directory": run["output_directory"],
+                "status": "success",
+                "duration": None,
+                "error": None,
+            }
+            start = time.perf_counter()
+            settings = telemetry.telemetry_settings(user_inputs.case_config)
+            telemetry.recorder.reset(settings["tracemalloc"])
+
+            try:
+                os.makedirs(run["output_directory"], exist_ok=True)
+                with telemetry.recorder.stage("orbit_geometry"):
+                    orbit_data = frames.MissionInputProcessor(
+                        user_inputs.mission_config, dh.get_kernel_paths()
+                    )
+                with orbit_data:
+                    if scene is None:
+                        mi.set_variant(
+                            user_inputs.case_config["mitsuba_variant"]
+                        )
+                        scene = sim.build_scene(user_inputs, orbit_data)
+                    else:
+                        with telemetry.recorder.stage("update_scene"):
+                            scene.user_inputs = user_inputs
+                            scene.orbit_data = orbit_data
+                            scene.update_geometry()
+
+                logging.info("Sweep run %d: %s", run["index"], run["changes"])
+                render, render_info = sim.render_scene(
+                    renderer,
+                    scene,
+                    RenderCache.from_config(user_inputs.case_config),
+                    spp=user_inputs.case_config["sampler"]["sample_count"],
+                )
+
+                sim.produce_outputs(
+                    render, render_info, scene, case_directory, user_inputs
+                )
+            except Exception as error:
+                # Failing runs are recorded rather than raised
+                result["status"] = "failed"
+                result["error"] = f"{type(error).__name__}: {error}"
+                logging.error(
+                    "Sweep run %d failed\n%s",
+                    run["index"],
+                    traceback.format_exc(),
+                )
+
+            result["duration"] = time.perf_counter() - start
+            result["metrics"] = telemetry.recorder.metrics(
+                {"case": case_directory, "run": run["index"]}
+            )
+            if settings["enabled"] and os.path.isdir(run["output_directory"]):
+                telemetry.write_metrics(
+                    result["metrics"],
+                    run["output_directory"],
+                    settings["prometheus"],
+                )
+            results.append(result)
+    finally:
+        telemetry.recorder.stop()
+        renderer.close()
+        os.chdir(working_directory)
+
+    return results
+
+
+def summarise_sweep(results: list) -> dict:
+    """Summarises the results of a sweep
+
+    Parameters
+    ----------
+    results : list
+        Result of each run from run_sweep_task
+
+    Returns
+    -------
+    dict
+        Run counts, total run time and results of each run
+    """
+    summary = batch.summarise_batch(results)
+    summary["runs"] = summary.pop("cases")
+    return summary
+
+
+def run_sweep(
+    case_directory: str,
+    workers: int = None,
+    logging_level: int = logging.INFO,
+) -> list:
+    """Runs the parameter sweep defined in a case directory
+
+    Parameters
+    ----------
+    case_directory : str
+        Path to the case directory containing a sweep config
+    workers : int, optional
+        Number of worker processes, by default None (one per CPU)
+    logging_level : int, optional
+        Logging level of the workers, by default logging.INFO
+
+    Returns
+    -------
+    list
+        Status and timing of each run ordered by run index
+
+    Raises
+    ------
+    ValueError
+        If the case has no sweep config or is a trajectory case
+    """
+    base_inputs = input_data.Configs()
+    base_inputs.load_configs(case_directory)
+
+    if not base_inputs.sweep_config:
+        raise ValueError("No sweep_config file found in case directory")
+    if "trajectory" in base_inputs.mission_config:
+        raise ValueError("Sweeps of trajectory cases are not supported")
+
+    runs = create_runs(base_inputs)
+    tasks = plan_tasks(runs, workers or os.cpu_count() or 1)
+    logging.info(
+        "Running sweep of %d runs as %d tasks", len(runs), len(tasks)
+    )
+
+    results = []
+    for index, task_results in batch.run_in_workers(
+        run_sweep_task,
+        {index: (case_directory, task) for index, task in enumerate(tasks)},
+        workers,
+        batch.initialise_worker,
+        (logging_level,),
+    ):
+        if isinstance(task_results, Exception):
+            # Raised outside run_sweep_task, e.g. the task crashed its worker
+            task_results = [
+                {
+                    "index": run["index"],
+                    "changes": run["changes"],
+                    "output_directory": run["output_directory"],
+                    "status": "failed",
+                    "duration": None,
+                    "error": f"{type(task_results).__name__}: {task_results}",
+                }
+                for run in tasks[index]
+            ]
+        results.extend(task_results)
+
+    results.sort(key=lambda result: result["index"])
+
+    summary_path = os.path.join(
+        case_directory,
+        base_inputs.sweep_config.get("output_directory", OUTPUT_DIRECTORY),
+        SUMMARY_FILE,
+    )
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    batch.write_summary(summarise_sweep(results), summary_path)
+
+    return results
@@ -0,0 +1,296 @@
+"""Sensor Synthesis Module
+
+Renders a case once with a fine hyperspectral reference film and derives
+the images of many sensors from the reference render. A film channel holds
+the integral of the spectral radiance weighted by the band response, so
+each sensor band is a weighted sum of the narrow reference bands. The
+weights of all bands of a sensor form a (reference bands, sensor bands)
+matrix, and the sensor image is a single matrix product of the reference
+render.
+
+Sensors are the case sensor and the sensors listed in the
+``sensor_synthesis`` entry of the case config, either by name from the
+sensor library (see hysim.data.sensor_library) or with an imaging mode
+and spectral response file in the case directory.
+"""
+import os
+import copy
+from dataclasses import dataclass
+
+import numpy as np
+
+from hysim import output_data
+from hysim.data import spd_reader
+from hysim.data import sensor_library
+from hysim.scene import spectra
+from hysim.scene import chaser_satellite as chas
+
+SYNTHESIS_DEFAULTS = {
+    "resolution": 1.0,
+    "sensors": [],
+}
+
+
+def sensor_file_name(file_name: str, sensor_name: str) -> str:
+    """Adds a sensor name to a file name before its extension
+
+    Parameters
+    ----------
+    file_name : str
+        Output file or directory name
+    sensor_name : str
+        Sensor name
+
+    Returns
+    -------
+    str
+        File name with sensor name e.g. results_vnir.exr
+    """
+    root, extension = os.path.splitext(file_name)
+    return f"{root}_{sensor_name}{extension}"
+
+
+@dataclass
+class SynthesizedSensor:
+    """Sensor derived from the reference render
+
+    Attributes
+    ----------
+    name : str
+        Sensor name, None for the case sensor
+    imaging_mode : str
+        Imaging mode (hyperspectral or multispectral)
+    response : spectra.Spectrum
+        Film response of the sensor
+    matrix : np.ndarray
+        Weights of the reference render channels in each sensor band,
+        shape (channels, bands)
+    band_centers : np.ndarray
+        Response weighted mean wavelength of each band [nm]
+
+    Methods
+    -------
+    set_reference(reference)
+        Computes the band weights of a reference film response
+    synthesize(render)
+        Returns the sensor image of a reference render
+    """
+
+    name: str
+    imaging_mode: str
+    response: spectra.Spectrum
+    matrix: np.ndarray = None
+    band_centers: np.ndarray = None
+
+    def set_reference(self, reference: spectra.HyperspectralFilmResponse):
+        """Computes the band weights of a reference film response
+
+        Parameters
+        ----------
+        reference : spectra.HyperspectralFilmResponse
+            Reference film response with unit sensitivity
+        """
+        response = self.response.band_response(reference.wavelengths)
+        centers = output_data.two_value_moving_average(reference.wavelengths)
+        total = response.sum(axis=0)
+        self.band_centers = np.divide(
+            np.asarray(centers) @ response,
+            total,
+            out=np.zeros_like(total),
+            where=total > 0,
+        )
+
+        # Mitsuba orders the channels of a spectral film by band name
+        order = np.argsort(list(reference.build_dict()))
+        self.matrix = response[order].astype(np.float32)
+
+    def synthesize(self, render) -> np.ndarray:
+        """Returns the sensor image of a reference render
+
+        Parameters
+        ----------
+        render : TensorXf
+            Render of the reference film, shape (height, width, channels)
+
+        Returns
+        -------
+        np.ndarray
+            Sensor image, shape (height, width, bands)
+        """
+        render = np.asarray(render, dtype=np.float32)
+        height, width, channels = render.shape
+        return (render.reshape(-1, channels) @ self.matrix).reshape(
+            height, width, -1
+        )
+
+
+def load_sensors(user_inputs, sensors: list) -> list:
+    """Returns the case sensor and the sensors to synthesize
+
+    Parameters
+    ----------
+    user_inputs : input_data.Configs
+        Object containing user input data
+    sensors : list
+        Sensor library names or dictionaries with name, imaging_mode and
+        spectrum_file entries
+
+    Returns
+    -------
+    list
+        SynthesizedSensor objects, starting with the case sensor
+
+    Raises
+    ------
+    KeyError
+        If a sensor is not in the sensor library
+    """
+    sensor_config = user_inputs.sensor_config
+    sensor_entries = [
+        {
+            "name": None,
+            "imaging_mode": sensor_config["imaging_mode"],
+            "spectrum_file": sensor_config["spectrum_file"],
+        }
+    ]
+    sensor_entries += [
+        {"name": sensor} if isinstance(sensor, str) else sensor
+        for sensor in sensors
+    ]
+
+    library = sensor_library.get_sensor_library()
+    synthesized_sensors = []
+
+    for entry in sensor_entries:
+        if "spectrum_file" in entry:
+            spectrum_data = spd_reader.SPDReader(
+                user_inputs.find_file(entry["spectrum_file"])
+            )
+            imaging_mode = entry["imaging_mode"]
+            response = spectra.film_response(
+                imaging_mode, spectrum_data.wavelengths, spectrum_data.values
+            )
+        else:
+            imaging_mode = library.sensors[entry["name"]]["imaging_mode"]
+            response = library.response(entry["name"])
+
+        synthesized_sensors.append(
+            SynthesizedSensor(entry["name"], imaging_mode, response)
+        )
+
+    return synthesized_sensors
+
+
+def reference_response(
+    sensors: list, resolution: float
+) -> spectra.HyperspectralFilmResponse:
+    """Returns the reference film response covering all sensors
+
+    Parameters
+    ----------
+    sensors : list
+        SynthesizedSensor objects
+    resolution : float
+        Maximum width of the reference bands [nm]
+
+    Returns
+    -------
+    spectra.HyperspectralFilmResponse
+        Film response of evenly spaced bands with unit sensitivity
+    """
+    lower = min(np.min(sensor.response.wavelengths) for sensor in sensors)
+    upper = max(np.max(sensor.response.wavelengths) for sensor in sensors)
+    bands = max(1, int(np.ceil((upper - lower) / resolution)))
+    wavelengths = np.round(np.linspace(lower, upper, bands + 1), 6)
+
+    return spectra.HyperspectralFilmResponse(
+        wavelengths, np.ones_like(wavelengths)
+    )
+
+
+def sensor_inputs(user_inputs, sensor: SynthesizedSensor):
+    """Returns user inputs for the outputs of a synthesized sensor
+
+    Output file names get the sensor name and multispectral outputs get
+    the band centers as reference wavelengths (unless set for the case
+    sensor).
+
+    Parameters
+    ----------
+    user_inputs : input_data.Configs
+        Object containing user input data
+    sensor : SynthesizedSensor
+        Synthesized sensor
+
+    Returns
+    -------
+    input_data.Configs
+        Copy of user inputs with the sensor imaging mode and outputs
+    """
+    outputs = []
+    for output_selection in user_inputs.case_config["output"]:
+        output_selection = dict(output_selection)
+        if sensor.name is not None:
+            output_selection["file_name"] = sensor_file_name(
+                output_selection["file_name"], sensor.name
+            )
+            output_selection.pop("reference_wavelengths", None)
+            output_selection.pop("fwhm", None)
+        if sensor.imaging_mode == "multispectral":
+            output_selection.setdefault(
+                "reference_wavelengths", sensor.band_centers.tolist()
+            )
+        outputs.append(output_selection)
+
+    inputs = copy.copy(user_inputs)
+    inputs.sensor_config = dict(
+        user_inputs.sensor_config, imaging_mode=sensor.imaging_mode
+    )
+    inputs.case_config = dict(user_inputs.case_config, output=outputs)
+    return inputs
+
+
+def produce_sensor_outputs(
+    render,
+    film: chas.SpectralFilm,
+    sensors: list,
+    case_directory: str,
+    user_inputs,
+    frame: int = None,
+    metadata: dict = None,
+):
+    """Synthesizes the image of each sensor and produces its outputs
+
+    Parameters
+    ----------
+    render : TensorXf
+        Render of the reference film
+    film : chas.SpectralFilm
+        Reference film
+    sensors : list
+        SynthesizedSensor objects
+    case_directory : str
+        Path to case directory
+    user_inputs : input_data.Configs
+        Object containing user input data
+    frame : int, optional
+        Frame number added to output file names, by default None
+    metadata : dict, optional
+        Render metadata, by default None
+    """
+    for sensor in sensors:
+        sensor_film = chas.SpectralFilm(
+            sensor.response, film.width, film.height
+        )
+        output = output_data.OutputHandler(
+            sensor.synthesize(render),
+            sensor_film,
+            case_directory,
+            frame=frame,
+            metadata=dict(
+                metadata or {},
+                sensor=sensor.name or "case",
+                reference_bands=len(film.spectrum.wavelengths) - 1,
+            ),
+        )
+        output.produce_output_data(sensor_inputs(user_inputs, sensor))
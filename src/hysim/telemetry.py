@@ -0,0 +1,456 @@
+"""Telemetry Module
+
+Records the wall time, CPU time and memory use of each stage of a run
+(reading configs, orbit geometry, building the scene, loading it into
+Mitsuba, rendering and exporting outputs). The recorder is process-wide,
+like the SPICE kernel manager, so stages are recorded wherever they run
+without passing a recorder through every function.
+
+Memory is measured as the peak resident set size of the process during
+each stage (which includes Mitsuba allocations) and, optionally, the peak
+memory traced by tracemalloc (Python and NumPy allocations only). On Linux
+the peak resident set size is reset at the start of every run and stage.
+Elsewhere it is the peak over the life of the process, so a worker running
+many cases reports the largest peak of the cases it ran so far. Tracing
+slows Python allocations down and is disabled by default.
+
+Metrics of a run are written to a json file next to the outputs and
+optionally to a Prometheus text file that a node exporter textfile
+collector can scrape.
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from hysim.data import cache
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is not recorded
+    resource = None
+
+# Metrics written next to the outputs of a run
+METRICS_FILE = "metrics.json"
+
+# Prometheus text file written when enabled without a file name
+PROMETHEUS_FILE = "metrics.prom"
+
+# Default telemetry settings (case_config entry telemetry)
+TELEMETRY_DEFAULTS = {
+    "enabled": True,
+    "tracemalloc": False,
+    "prometheus": False,
+}
+
+# Prometheus metric name, help text and stage metric of each gauge
+PROMETHEUS_METRICS = [
+    ("hysim_stage_wall_seconds", "Wall time of a stage", "wall_time"),
+    ("hysim_stage_cpu_seconds", "CPU time of a stage", "cpu_time"),
+    ("hysim_stage_calls", "Number of times a stage ran", "calls"),
+    (
+        "hysim_stage_peak_rss_bytes",
+        "Peak resident set size of the process during a stage",
+        "peak_rss_bytes",
+    ),
+    (
+        "hysim_stage_peak_traced_bytes",
+        "Peak memory traced by tracemalloc during a stage",
+        "peak_traced_bytes",
+    ),
+]
+
+
+def telemetry_settings(case_config: dict) -> dict:
+    """Returns the telemetry settings of a case
+
+    The ``telemetry`` entry of the case config is either a boolean or a
+    dictionary with ``enabled``, ``tracemalloc`` and ``prometheus``
+    entries. Telemetry is enabled by default.
+
+    Parameters
+    ----------
+    case_config : dict
+        Case config
+
+    Returns
+    -------
+    dict
+        Telemetry settings
+    """
+    settings = case_config.get("telemetry", True)
+    if not isinstance(settings, dict):
+        settings = {"enabled": bool(settings)}
+    return dict(TELEMETRY_DEFAULTS, **settings)
+
+
+def peak_rss() -> int:
+    """Returns the peak resident set size of the process
+
+    On Linux this is the peak since the last reset_peak_rss, elsewhere the
+    peak over the life of the process.
+
+    Returns
+    -------
+    int
+        Peak resident set size in bytes, None if unavailable
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Resets the peak resident set size of the process to its current size
+
+    Only supported on Linux.
+
+    Returns
+    -------
+    bool
+        Whether the peak was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+class StageRecorder:
+    """Records the time and memory use of the stages of a run
+
+    Stages that run many times (e.g. the render of every trajectory frame)
+    are accumulated: times are summed and the peaks are the largest of all
+    calls.
+
+    Attributes
+    ----------
+    stages : dict
+        Metrics of each stage keyed by stage name, in order of first run
+    start_time : float
+        Time the run started (seconds since the epoch)
+    trace_memory : bool
+        Whether Python allocations are traced with tracemalloc
+
+    Methods
+    -------
+    reset(trace_memory)
+        Clears recorded stages at the start of a run
+    start_tracing()
+        Traces Python allocations of the stages that follow
+    stage(name)
+        Context manager recording a stage
+    stop()
+        Stops memory tracing started by the recorder
+    metrics(labels)
+        Returns the recorded metrics
+    """
+
+    def __init__(self):
+        """Initializer"""
+        self.stages = {}
+        self.start_time = time.time()
+        self.trace_memory = False
+        self._started_tracing = False
+        self._open_stages = []
+        self._start = (time.perf_counter(), time.process_time())
+
+    def reset(self, trace_memory: bool = False):
+        """Clears recorded stages at the start of a run
+
+        Parameters
+        ----------
+        trace_memory : bool, optional
+            Trace Python allocations with tracemalloc, by default False
+        """
+        self.stop()
+        self.stages = {}
+        self.start_time = time.time()
+        self.trace_memory = trace_memory
+        self._open_stages = []
+        self._start = (time.perf_counter(), time.process_time())
+        reset_peak_rss()
+
+        if trace_memory:
+            self.start_tracing()
+
+    def start_tracing(self):
+        """Traces Python allocations of the stages that follow
+
+        Stages already recorded are kept, so tracing can be switched on once
+        the case config has been read.
+        """
+        self.trace_memory = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stops memory tracing started by the recorder"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager recording a stage
+
+        Stages can be nested, the peak memory of an inner stage is included
+        in the outer stage.
+
+        Parameters
+        ----------
+        name : str
+            Stage name
+        """
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if self._open_stages:
+            # Peaks are reset below, keep the peak of the outer stage so far
+            outer = self._open_stages[-1]
+            outer["peak_rss"] = max(outer["peak_rss"], peak_rss() or 0)
+            if tracing:
+                outer["peak"] = max(
+                    outer["peak"], tracemalloc.get_traced_memory()[1]
+                )
+        if tracing:
+            tracemalloc.reset_peak()
+
+        record = {"peak": 0, "peak_rss": 0}
+        self._open_stages.append(record)
+        reset_peak_rss()
+        rss_before = peak_rss()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            rss_after = peak_rss()
+            self._open_stages.pop()
+
+            if rss_after is not None:
+                rss_after = max(rss_after, record["peak_rss"])
+                if self._open_stages:
+                    outer = self._open_stages[-1]
+                    outer["peak_rss"] = max(outer["peak_rss"], rss_after)
+
+            peak_traced = None
+            if tracing:
+                peak_traced = max(
+                    record["peak"], tracemalloc.get_traced_memory()[1]
+                )
+                if self._open_stages:
+                    outer = self._open_stages[-1]
+                    outer["peak"] = max(outer["peak"], peak_traced)
+
+            metrics = self.stages.setdefault(
+                name,
+                {
+                    "calls": 0,
+                    "wall_time": 0.0,
+                    "cpu_time": 0.0,
+                    "peak_rss_bytes": None,
+                    "rss_increase_bytes": None,
+                    "peak_traced_bytes": None,
+                },
+            )
+            metrics["calls"] += 1
+            metrics["wall_time"] += wall_time
+            metrics["cpu_time"] += cpu_time
+            if rss_after is not None:
+                metrics["peak_rss_bytes"] = max(
+                    metrics["peak_rss_bytes"] or 0, rss_after
+                )
+                metrics["rss_increase_bytes"] = max(
+                    metrics["rss_increase_bytes"] or 0,
+                    rss_after - rss_before,
+                )
+            if peak_traced is not None:
+                metrics["peak_traced_bytes"] = max(
+                    metrics["peak_traced_bytes"] or 0, peak_traced
+                )
+
+    def metrics(self, labels: dict = None) -> dict:
+        """Returns the recorded metrics
+
+        Parameters
+        ----------
+        labels : dict, optional
+            Labels identifying the run (e.g. case directory), by default
+            None
+
+        Returns
+        -------
+        dict
+            Totals of the run and metrics of each stage
+        """
+        wall_start, cpu_start = self._start
+        peaks = [peak_rss()] + [
+            stage["peak_rss_bytes"] for stage in self.stages.values()
+        ]
+        peaks = [peak for peak in peaks if peak is not None]
+        return {
+            "labels": dict(labels or {}),
+            "start_time": self.start_time,
+            "wall_time": time.perf_counter() - wall_start,
+            "cpu_time": time.process_time() - cpu_start,
+            "peak_rss_bytes": max(peaks) if peaks else None,
+            "tracemalloc": self.trace_memory,
+            "stages": {
+                name: dict(stage) for name, stage in self.stages.items()
+            },
+        }
+
+
+# Process-wide recorder
+recorder = StageRecorder()
+
+
+def aggregate_metrics(runs: list) -> dict:
+    """Aggregates the metrics of many runs (e.g. the cases of a batch)
+
+    Times are summed and peaks are the largest of all runs.
+
+    Parameters
+    ----------
+    runs : list
+        Metrics of each run from StageRecorder.metrics
+
+    Returns
+    -------
+    dict
+        Totals and metrics of each stage over all runs
+    """
+    stages = {}
+    for run in runs:
+        for name, stage in run["stages"].items():
+            total = stages.setdefault(
+                name,
+                {
+                    "runs": 0,
+                    "calls": 0,
+                    "wall_time": 0.0,
+                    "cpu_time": 0.0,
+                    "peak_rss_bytes": None,
+                    "peak_traced_bytes": None,
+                },
+            )
+            total["runs"] += 1
+            total["calls"] += stage["calls"]
+            total["wall_time"] += stage["wall_time"]
+            total["cpu_time"] += stage["cpu_time"]
+            for peak in ("peak_rss_bytes", "peak_traced_bytes"):
+                if stage[peak] is not None:
+                    total[peak] = max(total[peak] or 0, stage[peak])
+
+    peaks = [run["peak_rss_bytes"] for run in runs if run["peak_rss_bytes"]]
+    return {
+        "runs": len(runs),
+        "wall_time": sum(run["wall_time"] for run in runs),
+        "cpu_time": sum(run["cpu_time"] for run in runs),
+        "peak_rss_bytes": max(peaks) if peaks else None,
+        "stages": stages,
+    }
+
+
+def _escape_label(value) -> str:
+    """Escapes a Prometheus label value"""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def prometheus_text(runs: list) -> str:
+    """Returns the stage metrics of runs in the Prometheus text format
+
+    Parameters
+    ----------
+    runs : list
+        Metrics of each run from StageRecorder.metrics, their labels are
+        added to every sample of the run
+
+    Returns
+    -------
+    str
+        Prometheus text exposition of the stage gauges
+    """
+    lines = []
+    for metric_name, help_text, key in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {metric_name} {help_text}")
+        lines.append(f"# TYPE {metric_name} gauge")
+        for run in runs:
+            for stage_name, stage in run["stages"].items():
+                if stage[key] is None:
+                    continue
+                labels = dict(run["labels"], stage=stage_name)
+                label_text = ",".join(
+                    f'{label}="{_escape_label(value)}"'
+                    for label, value in labels.items()
+                )
+                lines.append(f"{metric_name}{{{label_text}}} {stage[key]}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(metrics: dict, directory: str, prometheus=False):
+    """Writes the metrics of a run to a directory
+
+    Parameters
+    ----------
+    metrics : dict
+        Metrics of the run from StageRecorder.metrics
+    directory : str
+        Directory of the run outputs
+    prometheus : bool or str, optional
+        Also write a Prometheus text file, to this path (relative to the
+        directory) if a string is given, by default False
+    """
+    with open(
+        os.path.join(directory, METRICS_FILE), "w", encoding="utf-8"
+    ) as file:
+        json.dump(metrics, file, indent=4)
+
+    if prometheus:
+        write_prometheus(
+            [metrics],
+            os.path.join(
+                directory,
+                prometheus if isinstance(prometheus, str) else PROMETHEUS_FILE,
+            ),
+        )
+
+
+def write_prometheus(runs: list, path: str):
+    """Writes the stage metrics of runs to a Prometheus text file
+
+    The file is replaced atomically so a scraper never reads a partial
+    file.
+
+    Parameters
+    ----------
+    runs : list
+        Metrics of each run from StageRecorder.metrics
+    path : str
+        Path to text file (e.g. in the textfile collector directory)
+    """
+    text = prometheus_text(runs)
+    cache.write_atomic(path, lambda file: file.write(text.encode("utf-8")))
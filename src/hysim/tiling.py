@@ -0,0 +1,201 @@
+"""Tiled Rendering Module
+
+Functions to render the film of a scene as tiles in a pool of worker
+processes. Every worker loads the scene once when it starts and renders
+crop windows of the film with the seed of each tile, so the stitched
+result only depends on the tile layout and not on which worker renders a
+tile or in which order.
+"""
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Scene loaded by a worker process (RendererControl)
+_worker_renderer = None
+
+
+def encode_scene_dict(value):
+    """Replaces transforms in a scene dictionary by their matrices
+
+    Mitsuba transforms cannot be pickled, so the scene dictionary is
+    encoded before it is sent to worker processes.
+
+    Parameters
+    ----------
+    value : object
+        Scene dictionary (or value in it)
+
+    Returns
+    -------
+    object
+        Scene dictionary with transforms as {"to_world_matrix": matrix}
+    """
+    if isinstance(value, dict):
+        return {key: encode_scene_dict(item) for key, item in value.items()}
+    if hasattr(value, "matrix"):
+        return {"to_world_matrix": np.array(value.matrix).tolist()}
+    return value
+
+
+def decode_scene_dict(value):
+    """Restores transforms in a scene dictionary from encode_scene_dict
+
+    Parameters
+    ----------
+    value : object
+        Encoded scene dictionary (or value in it)
+
+    Returns
+    -------
+    object
+        Scene dictionary with Mitsuba transforms
+    """
+    import mitsuba as mi
+
+    if isinstance(value, dict):
+        if list(value) == ["to_world_matrix"]:
+            return mi.ScalarTransform4f(np.array(value["to_world_matrix"]))
+        return {key: decode_scene_dict(item) for key, item in value.items()}
+    return value
+
+
+def split_window(window: tuple, tile_size: int) -> list:
+    """Splits a film window into tiles
+
+    Parameters
+    ----------
+    window : tuple
+        Film window (offset_x, offset_y, size_x, size_y) in pixels
+    tile_size : int
+        Width and height of tiles in pixels (edge tiles can be smaller)
+
+    Returns
+    -------
+    list
+        Tile windows in row major order
+    """
+    offset_x, offset_y, size_x, size_y = window
+    return [
+        (
+            x,
+            y,
+            min(tile_size, offset_x + size_x - x),
+            min(tile_size, offset_y + size_y - y),
+        )
+        for y in range(offset_y, offset_y + size_y, tile_size)
+        for x in range(offset_x, offset_x + size_x, tile_size)
+    ]
+
+
+def initialise_worker(variant: str, scene_dict: dict, threads: int):
+    """Loads the scene in a worker process
+
+    Parameters
+    ----------
+    variant : str
+        Mitsuba variant
+    scene_dict : dict
+        Scene dictionary encoded with encode_scene_dict
+    threads : int
+        Number of render threads of the worker
+    """
+    global _worker_renderer
+
+    import mitsuba as mi
+    import drjit as dr
+
+    mi.set_variant(variant)
+    dr.set_thread_count(threads)
+
+    from hysim.sim import RendererControl
+
+    _worker_renderer = RendererControl()
+    _worker_renderer.load_scene(decode_scene_dict(scene_dict))
+
+
+def render_tile(
+    transforms: dict,
+    window: tuple,
+    seed: int,
+    spp: int,
+    band_groups: tuple = (None, None),
+) -> dict:
+    """Renders a tile of the film in a worker process
+
+    Parameters
+    ----------
+    transforms : dict
+        4x4 transform matrices of objects keyed by object name
+    window : tuple
+        Tile window (offset_x, offset_y, size_x, size_y) in pixels
+    seed : int
+        Sampler seed of the tile
+    spp : int
+        Samples per pixel (0 for the sampler sample count)
+    band_groups : tuple, optional
+        Band group size and memory budget of the tile (see
+        RendererControl.set_band_groups), by default (None, None)
+
+    Returns
+    -------
+    dict
+        Tile window, seed, rendered tensor, render time and worker process
+    """
+    import mitsuba as mi
+
+    start = time.perf_counter()
+    _worker_renderer.update_transforms(
+        {
+            object_id: mi.ScalarTransform4f(np.array(matrix))
+            for object_id, matrix in transforms.items()
+        }
+    )
+    _worker_renderer.set_band_groups(*band_groups)
+    _worker_renderer.set_crop(window, pad=False)
+    _worker_renderer.run(spp=spp, seed=seed)
+
+    return {
+        "window": list(window),
+        "seed": seed,
+        "render": np.array(_worker_renderer.render),
+        "render_time": time.perf_counter() - start,
+        "worker": os.getpid(),
+    }
+
+
+def create_pool(variant: str, scene_dict: dict, workers: int = None):
+    """Creates a pool of worker processes that have loaded the scene
+
+    Workers are started (not forked) so they do not inherit the Mitsuba
+    thread pool of the parent process. Cores are shared between workers.
+
+    Parameters
+    ----------
+    variant : str
+        Mitsuba variant
+    scene_dict : dict
+        Scene dictionary
+    workers : int, optional
+        Number of worker processes, by default None (one per CPU)
+
+    Returns
+    -------
+    ProcessPoolExecutor
+        Pool of worker processes
+    """
+    cores = os.cpu_count() or 1
+    workers = workers or cores
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initialise_worker,
+        initargs=(
+            variant,
+            encode_scene_dict(scene_dict),
+            max(1, cores // workers),
+        ),
+    )
@@ -0,0 +1,59 @@
+import os
+import time
+import unittest
+from unittest import mock
+from concurrent.futures.process import (
+    BrokenProcessPool,
+    ProcessPoolExecutor,
+)
+
+from hysim import batch
+
+
+def square(value):
+    if value is None:
+        # Hard death of the worker, as in a crash inside Mitsuba
+        os._exit(1)
+    if value < 0:
+        raise ValueError("negative value")
+    return value**2
+
+
+class TestRunInWorkers(unittest.TestCase):
+
+    def test_results(self):
+        results = dict(
+            batch.run_in_workers(square, {"a": (2,), "b": (-1,)}, workers=2)
+        )
+        self.assertEqual(results["a"], 4)
+        self.assertIsInstance(results["b"], ValueError)
+
+    def test_worker_death_fails_only_crashing_task(self):
+        # Submitted first so the other tasks are pending when it crashes
+        tasks = {"crash": (None,)}
+        tasks.update({index: (index,) for index in range(6)})
+        results = dict(batch.run_in_workers(square, tasks, workers=2))
+
+        self.assertEqual(set(results), set(tasks))
+        self.assertIsInstance(results.pop("crash"), BrokenProcessPool)
+        self.assertEqual(results, {index: index**2 for index in range(6)})
+
+    def test_worker_death_while_submitting(self):
+        submit = ProcessPoolExecutor.submit
+
+        def slow_submit(executor, *args):
+            # The crash breaks the pool before the next task is submitted
+            future = submit(executor, *args)
+            time.sleep(0.2)
+            return future
+
+        tasks = {"crash": (None,), 0: (0,), 1: (1,)}
+        with mock.patch.object(ProcessPoolExecutor, "submit", slow_submit):
+            results = dict(batch.run_in_workers(square, tasks, workers=2))
+
+        self.assertIsInstance(results.pop("crash"), BrokenProcessPool)
+        self.assertEqual(results, {0: 0, 1: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
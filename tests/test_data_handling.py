@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from hysim.data import data_handling as dh
+
+
+class TestCaseFileIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for path in [
+            "sensor/film.spd",
+            "target/mesh/body.ply",
+            "target/mesh/panel.ply",
+            "target/old/panel.ply",
+            "results/body.ply",
+            "sweep_output/run_0000/film.spd",
+        ]:
+            path = os.path.join(self.directory.name, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+        self.index = dh.CaseFileIndex(self.directory.name)
+
+    def test_find(self):
+        path = self.index.find("film.spd")
+        self.assertTrue(path.endswith("sensor/film.spd"))
+
+    def test_relative_path(self):
+        path = self.index.find("target/old/panel.ply")
+        self.assertTrue(path.endswith("target/old/panel.ply"))
+
+    def test_missing_file(self):
+        with self.assertRaises(dh.DataFileNotFoundError):
+            self.index.find("missing.ply")
+
+    def test_duplicate_file(self):
+        with self.assertRaises(dh.DuplicateDataFileError):
+            self.index.find("panel.ply")
+
+    def test_exclude(self):
+        with self.assertRaises(dh.DuplicateDataFileError):
+            self.index.find("body.ply")
+        self.index.exclude("results")
+        path = self.index.find("body.ply")
+        self.assertTrue(path.endswith("target/mesh/body.ply"))
+
+
+if __name__ == "__main__":
+    unittest.main()
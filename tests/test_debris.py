@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+import mitsuba as mi
+import numpy as np
+
+from hysim import sim
+from hysim.scene import debris
+from hysim.scene import target_satellite as targ
+
+TRIANGLE_PLY = """ply
+format ascii 1.0
+element vertex 3
+property float x
+property float y
+property float z
+element face 1
+property list uchar int vertex_indices
+end_header
+0 0 0
+1 0 0
+0 1 0
+3 0 1 2
+"""
+
+
+class TestPlacements(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_positions_only(self):
+        path = os.path.join(self.directory.name, "placements.csv")
+        with open(path, "w") as file:
+            file.write("1,2,3\n4,5,6\n")
+        placements = debris.load_placements(path)
+        np.testing.assert_array_equal(
+            placements, [[1, 2, 3, 0, 0, 0], [4, 5, 6, 0, 0, 0]]
+        )
+
+    def test_invalid_columns(self):
+        path = os.path.join(self.directory.name, "placements.npy")
+        np.save(path, np.zeros((4, 5)))
+        with self.assertRaises(ValueError):
+            debris.load_placements(path)
+
+
+class TestDebrisField(unittest.TestCase):
+
+    def setUp(self):
+        mi.set_variant("scalar_rgb")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        part = targ.PartBuilder("plate_panel")
+        part.mesh_file = os.path.join(self.directory.name, "plate.ply")
+        with open(part.mesh_file, "w") as file:
+            file.write(TRIANGLE_PLY)
+        part.set_user_material({"type": "diffuse"})
+        part.build_dict()
+
+        group = debris.InstanceGroup(
+            "plates",
+            np.array([[0, 0, 0, 0, 0, 0], [5, 0, 0, 0, 0, np.pi / 2]]),
+        )
+        group.add_part(part)
+        self.field = debris.DebrisField()
+        self.field.add_group(group)
+        self.field.build_dict()
+
+    def load_scene(self):
+        scene_dict = {"type": "scene", **self.field.debris_dict}
+        scene_dict["sensor"] = {
+            "type": "perspective",
+            "fov": 40,
+            "film": {"type": "hdrfilm", "width": 8, "height": 8},
+            "to_world": mi.ScalarTransform4f.look_at(
+                origin=[0, 0, 10], target=[0, 0, 0], up=[0, 1, 0]
+            ),
+        }
+        renderer = sim.RendererControl()
+        renderer.load_scene(scene_dict)
+        return renderer
+
+    def bounding_boxes(self, renderer):
+        return {
+            shape.id(): (
+                np.array(shape.bbox().min),
+                np.array(shape.bbox().max),
+            )
+            for shape in renderer.mitsuba_scene.shapes()
+        }
+
+    def test_instances(self):
+        self.assertEqual(
+            list(self.field.debris_dict),
+            ["plates", "plates_0", "plates_1"],
+        )
+        boxes = self.bounding_boxes(self.load_scene())
+        np.testing.assert_allclose(boxes["plates_0"][1], [1, 1, 0])
+        np.testing.assert_allclose(
+            boxes["plates_1"][0], [4, 0, 0], atol=1e-6
+        )
+
+    def test_move_instances(self):
+        renderer = self.load_scene()
+        self.field.position = [0, 0, 2]
+        renderer.update_transforms(self.field.to_world())
+        boxes = self.bounding_boxes(renderer)
+        np.testing.assert_allclose(boxes["plates_0"][0], [0, 0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
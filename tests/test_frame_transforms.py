@@ -0,0 +1,198 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from hysim.data import kernel_manager
+from hysim.data.kernel_manager import spice_kernels
+from hysim.scene import frame_transforms as frames
+
+LEAP_SECONDS_KERNEL = os.path.join(
+    os.path.dirname(kernel_manager.__file__), "kernels", "naif0012.tls"
+)
+
+
+class TestTrajectoryEpochs(unittest.TestCase):
+
+    def setUp(self):
+        spice_kernels.furnish([LEAP_SECONDS_KERNEL])
+        self.addCleanup(spice_kernels.release, [LEAP_SECONDS_KERNEL])
+
+    def test_range_includes_stop(self):
+        epochs = frames.get_trajectory_epochs(
+            {
+                "start": "12/22/2022 14:15:53 utc",
+                "stop": "12/22/2022 14:16:53 utc",
+                "step": 10,
+            }
+        )
+        self.assertEqual(len(epochs), 7)
+        self.assertAlmostEqual(epochs[-1] - epochs[0], 60)
+
+    def test_stop_before_start(self):
+        with self.assertRaises(ValueError):
+            frames.get_trajectory_epochs(
+                {
+                    "start": "12/22/2022 14:16:53 utc",
+                    "stop": "12/22/2022 14:15:53 utc",
+                    "step": 10,
+                }
+            )
+
+    def test_empty_epoch_list(self):
+        with self.assertRaises(ValueError):
+            frames.get_trajectory_epochs({"epochs": []})
+
+
+class TestStateVectorUnits(unittest.TestCase):
+
+    def setUp(self):
+        # The sun is not checked, so only the leap seconds kernel is needed
+        for method in ("get_sun_location", "get_sun_locations"):
+            patcher = mock.patch.object(
+                frames.MissionInputProcessor,
+                method,
+                return_value=np.zeros(6),
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # ISS orbit given as keplerian elements and as state vectors [km]
+        elements = [6796, 0.000553, 0.9013, 2.1511, 3.0664, 4.8458]
+        self.kepler = self.create_processor("kep", elements)
+        state = self.kepler.target_state_vectors / 1000
+        self.state = self.create_processor("state", state.tolist())
+
+    def create_processor(self, position_frame, position):
+        scene_object = {
+            "position_frame": position_frame,
+            "position": position,
+            "attitude": "lookat",
+        }
+        processor = frames.MissionInputProcessor(
+            {
+                "datetime": "12/22/2022 14:15:53 utc",
+                "target": scene_object,
+                "chaser": scene_object,
+            },
+            [LEAP_SECONDS_KERNEL],
+        )
+        self.addCleanup(processor.release_kernels)
+        return processor
+
+    def test_reference_epoch(self):
+        np.testing.assert_allclose(
+            self.state.target_state_vectors, self.kepler.target_state_vectors
+        )
+
+    def test_propagated(self):
+        epoch = self.kepler.reference_epoch + 1800
+        for processor in (self.kepler, self.state):
+            processor.set_epoch(epoch)
+        # About a third of an orbit later
+        np.testing.assert_allclose(
+            self.state.target_state_vectors,
+            self.kepler.target_state_vectors,
+            rtol=1e-6,
+        )
+
+    def test_propagated_at_epochs(self):
+        epochs = self.kepler.reference_epoch + np.array([0, 600, 1800])
+        np.testing.assert_allclose(
+            self.state.convert_input_at_epochs("target", epochs),
+            self.kepler.convert_input_at_epochs("target", epochs),
+            rtol=1e-6,
+        )
+
+
+class TestBatchedGeometry(unittest.TestCase):
+
+    def setUp(self):
+        # Sun moving with the epoch, so only the leap seconds kernel is
+        # needed
+        patcher = mock.patch.object(
+            frames.spice,
+            "spkez",
+            lambda target, epoch, *_: (
+                np.array([-1.5e8, -2e7 + epoch, -1e7, 0, 0, 0]),
+                0.0,
+            ),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.processor = frames.MissionInputProcessor(
+            {
+                "datetime": "12/22/2022 14:15:53 utc",
+                "target": {
+                    "position_frame": "kep",
+                    "position": [
+                        6796, 0.000553, 0.9013, 2.1511, 3.0664, 4.8458
+                    ],
+                    "attitude": [0, 0, 0],
+                },
+                "chaser": {
+                    "position_frame": "kep",
+                    "position": [
+                        6796, 0.000553, 0.9013, 2.1511, 3.0664, 4.8456
+                    ],
+                    "attitude": "lookat",
+                },
+            },
+            [LEAP_SECONDS_KERNEL],
+        )
+        self.addCleanup(self.processor.release_kernels)
+
+    def assert_matches_epoch(self, geometry, index, epoch):
+        self.processor.set_epoch(epoch)
+        np.testing.assert_allclose(
+            geometry.local_frame_transforms[index],
+            self.processor.local_frame_transform,
+        )
+        for name in (
+            "target_position",
+            "chaser_position",
+            "earth_position",
+            "sun_direction_vector",
+        ):
+            np.testing.assert_allclose(
+                getattr(geometry[index], name),
+                getattr(self.processor, name),
+                atol=1e-6,
+                err_msg=name,
+            )
+
+    def test_matches_epochs(self):
+        epochs = self.processor.reference_epoch + np.array(
+            [0, 60, 600, 3000]
+        )
+        geometry = self.processor.compute_geometry(epochs)
+        self.assertEqual(len(geometry), len(epochs))
+        for index, epoch in enumerate(epochs):
+            self.assert_matches_epoch(geometry, index, epoch)
+
+    def test_single_epoch(self):
+        epoch = self.processor.reference_epoch + 600
+        geometry = self.processor.compute_geometry(epoch)
+        self.assertEqual(len(geometry), 1)
+        self.assert_matches_epoch(geometry, 0, epoch)
+
+    def test_batched_frame_functions(self):
+        states = self.processor.convert_input_at_epochs(
+            "chaser", self.processor.reference_epoch + np.array([0, 600])
+        )
+        origins = states[:, :3] + 20
+        transforms = frames.compute_eci_to_lvlh_rotation_matrix(states)
+        positions = frames.convert_eci_to_lvlh(states, transforms, origins)
+        for index, state in enumerate(states):
+            transform = frames.compute_eci_to_lvlh_rotation_matrix(state)
+            np.testing.assert_allclose(transforms[index], transform)
+            np.testing.assert_allclose(
+                positions[index],
+                frames.convert_eci_to_lvlh(state, transform, origins[index]),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import unittest
+from hysim.data import kernel_manager
+
+LEAP_SECONDS_KERNEL = os.path.join(
+    os.path.dirname(kernel_manager.__file__), "kernels", "naif0012.tls"
+)
+
+
+class TestKernelManager(unittest.TestCase):
+
+    def setUp(self):
+        self.kernels = kernel_manager.KernelManager()
+
+    def test_furnish_once(self):
+        self.kernels.furnish([LEAP_SECONDS_KERNEL])
+        self.kernels.furnish([LEAP_SECONDS_KERNEL])
+        self.assertEqual(self.kernels.loaded_kernels, [LEAP_SECONDS_KERNEL])
+
+        self.kernels.release([LEAP_SECONDS_KERNEL])
+        self.assertEqual(self.kernels.loaded_kernels, [LEAP_SECONDS_KERNEL])
+        self.kernels.release([LEAP_SECONDS_KERNEL])
+        self.assertEqual(self.kernels.loaded_kernels, [])
+
+    def test_loaded_str2et(self):
+        with self.kernels.loaded([LEAP_SECONDS_KERNEL]):
+            epoch = self.kernels.str2et("12/22/2022 14:15:53 utc")
+            self.assertAlmostEqual(epoch, 724990622.1836, places=3)
+            self.assertIn("12/22/2022 14:15:53 utc", self.kernels._epochs)
+        self.assertEqual(self.kernels.loaded_kernels, [])
+        self.assertEqual(self.kernels._epochs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
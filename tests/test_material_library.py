@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from hysim.data import data_handling as dh
+from hysim.data import material_library
+from hysim.data import spd_reader
+
+
+class TestMaterialLibrary(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.library = material_library.MaterialLibrary(use_cache=False)
+
+    def test_list_defined_materials(self):
+        materials = dh.list_defined_materials()
+        self.assertIn("black_paint", materials)
+        self.assertEqual(materials, sorted(self.library.names))
+
+    def test_spectrum_matches_file(self):
+        file_data = spd_reader.read_spd_file(
+            dh.get_data_path(dh.MaterialsData.PATH.value, "black_paint.spd")
+        )
+        file_data = file_data[np.argsort(file_data[:, 0])]
+        spectrum = self.library.spectrum("black_paint")
+        # Only the points of the file are returned
+        np.testing.assert_array_equal(spectrum.wavelengths, file_data[:, 0])
+        np.testing.assert_array_equal(spectrum.reflectance, file_data[:, 1])
+
+    def test_every_spectrum_matches_file(self):
+        for name in self.library.names:
+            file = self.library._spectrum_file(self.library.materials[name])
+            if file is None:
+                continue
+            file_data = spd_reader.read_spd_file(
+                dh.get_data_path(dh.MaterialsData.PATH.value, file)
+            )
+            spectrum = self.library.spectrum(name)
+            self.assertEqual(len(spectrum.wavelengths), len(file_data))
+
+    def test_material_has_spectrum(self):
+        material = self.library.material("black_paint")
+        reflectance = material["material"]["reflectance"]
+        self.assertEqual(reflectance["type"], "irregular")
+        self.assertNotIn("filename", reflectance)
+
+    def test_unknown_material(self):
+        with self.assertRaises(dh.DataFileNotFoundError):
+            dh.get_material_from_database("unobtainium")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import mitsuba as mi
+
+from hysim.scene import meshes
+from hysim.scene import target_satellite as targ
+from hysim.scene import simulator_environment as env
+
+TRIANGLE_PLY = """ply
+format ascii 1.0
+element vertex 3
+property float x
+property float y
+property float z
+element face 1
+property list uchar int vertex_indices
+end_header
+0 0 0
+1 0 0
+0 1 0
+3 0 1 2
+"""
+
+
+class TestSphereMesh(unittest.TestCase):
+
+    def test_uv_sphere(self):
+        vertices, faces, normals, texcoords = meshes.uv_sphere(16)
+        self.assertEqual(vertices.shape, (17 * 9, 3))
+        # Pole rows have one triangle per segment, the others two
+        self.assertEqual(len(faces), 2 * 16 * 8 - 2 * 16)
+        np.testing.assert_allclose(np.linalg.norm(vertices, axis=1), 1)
+        np.testing.assert_array_equal(normals, vertices)
+        self.assertTrue(np.all((texcoords >= 0) & (texcoords <= 1)))
+
+    def test_write_ply(self):
+        mi.set_variant("scalar_rgb")
+        vertices, faces, normals, texcoords = meshes.uv_sphere(64)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sphere.ply")
+            with open(path, "wb") as file:
+                meshes.write_ply(file, vertices, faces, normals, texcoords)
+            mesh = mi.load_dict({"type": "ply", "filename": path})
+
+        self.assertEqual(mesh.vertex_count(), len(vertices))
+        self.assertEqual(mesh.face_count(), len(faces))
+        self.assertAlmostEqual(mesh.surface_area(), 4 * np.pi, delta=0.1)
+
+
+class TestMergeParts(unittest.TestCase):
+
+    def setUp(self):
+        mi.set_variant("scalar_rgb")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.target = targ.Target()
+        self.target.position = [0, 0, 0]
+        self.target.attitude = [0, 0, 0]
+        for name, reflectance in (("a", 0.2), ("b", 0.8), ("c", 0.2)):
+            part = targ.PartBuilder(name)
+            part.mesh_file = os.path.join(self.directory.name, name + ".ply")
+            with open(part.mesh_file, "w") as file:
+                file.write(TRIANGLE_PLY)
+            part.set_user_material(
+                {"type": "diffuse", "reflectance": reflectance}
+            )
+            part.build_dict()
+            self.target.add_part(part)
+
+    def test_merge_meshes(self):
+        vertices, faces, normals, texcoords = meshes.merge_meshes(
+            [part.mesh_file for part in self.target.target_model]
+        )
+        self.assertEqual(vertices.shape, (9, 3))
+        np.testing.assert_array_equal(faces[2], [6, 7, 8])
+        np.testing.assert_allclose(normals, np.tile([0, 0, 1], (9, 1)))
+        self.assertIsNone(texcoords)
+
+    def test_parts_merged_by_material(self):
+        cache_directory = os.path.join(self.directory.name, "meshes")
+        self.target.merge_parts(cache_directory)
+        self.target.build_dict()
+
+        self.assertEqual(
+            self.target.shape_names(), ["target_mesh_0", "target_mesh_1"]
+        )
+        mesh = mi.load_dict(self.target.target_dict["target_mesh_0"])
+        self.assertEqual(mesh.face_count(), 2)
+        self.assertEqual(len(os.listdir(cache_directory)), 2)
+
+        # Unchanged parts reuse the merged meshes
+        paths = [path for _, path, _ in self.target.merged_meshes]
+        modified = [os.path.getmtime(path) for path in paths]
+        self.target.merge_parts(cache_directory)
+        self.assertEqual(
+            [os.path.getmtime(path) for path in paths], modified
+        )
+
+
+class TestEarthLevelOfDetail(unittest.TestCase):
+
+    def test_finer_mesh_when_closer(self):
+        far = env.earth_mesh_segments(env.EARTH_RADIUS, 4e8, 1000)
+        near = env.earth_mesh_segments(env.EARTH_RADIUS, 2e7, 1000)
+        self.assertIn(far, env.EARTH_LOD_SEGMENTS)
+        self.assertLess(far, near)
+
+    def test_mesh_within_tolerance(self):
+        distance, pixels_per_radian = 4e7, 2000
+        segments = env.earth_mesh_segments(
+            env.EARTH_RADIUS, distance, pixels_per_radian
+        )
+        limb_distance = np.sqrt(distance**2 - env.EARTH_RADIUS**2)
+        sagitta = env.EARTH_RADIUS * (1 - np.cos(np.pi / segments))
+        self.assertLessEqual(
+            sagitta / limb_distance * pixels_per_radian,
+            env.EARTH_LOD_TOLERANCE,
+        )
+
+    def test_low_orbit(self):
+        # 640 pixel film with a 20 degree field of view at ISS altitude
+        segments = env.earth_mesh_segments(
+            env.EARTH_RADIUS, env.EARTH_RADIUS + 4e5, 640 / np.deg2rad(20)
+        )
+        self.assertEqual(segments, 256)
+
+    def test_sphere_when_no_mesh_is_fine_enough(self):
+        earth = env.Earth()
+        earth.model = "lod"
+        earth.set_level_of_detail(env.EARTH_RADIUS + 4e5, 1e5)
+        self.assertEqual(earth.model, "sphere")
+
+
+class TestEarthScale(unittest.TestCase):
+
+    def setUp(self):
+        mi.set_variant("scalar_rgb")
+
+    def test_subtended_angle(self):
+        # Seen from 12742 km (scene units are metres) the Earth subtends
+        # 60 deg
+        earth = env.Earth()
+        earth.model = "sphere"
+        earth.position = [0, 0, 1.2742e7]
+        scene = mi.load_dict(
+            {
+                "type": "scene",
+                "integrator": {"type": "path"},
+                "earth": {
+                    "type": "sphere",
+                    "to_world": earth.to_world(),
+                    "bsdf": {"type": "diffuse"},
+                },
+                "light": {"type": "directional", "direction": [0, 0, 1]},
+                "sensor": {
+                    "type": "perspective",
+                    "fov": 90,
+                    "far_clip": 1e8,
+                    "to_world": mi.ScalarTransform4f.look_at(
+                        origin=[0, 0, 0], target=[0, 0, 1], up=[0, 1, 0]
+                    ),
+                    "film": {
+                        "type": "hdrfilm",
+                        "width": 101,
+                        "height": 101,
+                        "rfilter": {"type": "box"},
+                    },
+                },
+            }
+        )
+        render = np.array(mi.render(scene, spp=4))
+
+        # Film spans tan(45 deg) either side, the Earth tan(30 deg)
+        width = np.count_nonzero(render[50, :, 0])
+        self.assertAlmostEqual(width, 101 * np.tan(np.pi / 6), delta=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
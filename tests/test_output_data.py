@@ -0,0 +1,142 @@
+import os
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from hysim import output_data
+from hysim.scene import spectra
+
+
+def create_formatter(render):
+    wavelengths = np.arange(render.shape[2] + 1) * 10.0 + 400.0
+    film = SimpleNamespace(
+        spectrum=spectra.HyperspectralFilmResponse(
+            wavelengths, np.ones_like(wavelengths)
+        )
+    )
+    return output_data.OutputFormatter(render, film)
+
+
+class TestEnviExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.render = np.arange(4 * 5 * 3, dtype=np.float32).reshape(4, 5, 3)
+        self.user_inputs = SimpleNamespace(
+            sensor_config={"imaging_mode": "hyperspectral"}
+        )
+
+    def export(self, interleave):
+        file_name = os.path.join(self.directory.name, f"cube_{interleave}.img")
+        create_formatter(self.render).export_as_envi(
+            {"file_name": file_name, "interleave": interleave},
+            self.user_inputs,
+        )
+        return file_name
+
+    def test_interleaves(self):
+        for interleave, shape, axes in [
+            ("bsq", (3, 4, 5), (2, 0, 1)),
+            ("bil", (4, 3, 5), (0, 2, 1)),
+            ("bip", (4, 5, 3), (0, 1, 2)),
+        ]:
+            data = np.fromfile(self.export(interleave), dtype="<f4")
+            np.testing.assert_array_equal(
+                data.reshape(shape), self.render.transpose(axes)
+            )
+
+    def test_header(self):
+        file_name = self.export("bil")
+        with open(file_name.replace(".img", ".hdr")) as file:
+            header = file.read().splitlines()
+
+        self.assertEqual(header[0], "ENVI")
+        self.assertIn("samples = 5", header)
+        self.assertIn("lines = 4", header)
+        self.assertIn("bands = 3", header)
+        self.assertIn("interleave = bil", header)
+        self.assertIn("wavelength = {405, 415, 425}", header)
+        self.assertIn("fwhm = {10, 10, 10}", header)
+
+    def test_invalid_interleave(self):
+        with self.assertRaises(ValueError):
+            self.export("bxl")
+
+
+class TestArrayExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.render = np.random.default_rng(0).random((4, 5, 3))
+        self.formatter = create_formatter(self.render.astype(np.float32))
+        self.formatter.metadata = {"sample_count": 16}
+        self.user_inputs = SimpleNamespace(
+            sensor_config={"imaging_mode": "hyperspectral"}
+        )
+
+    def test_npy(self):
+        file_name = os.path.join(self.directory.name, "results.npy")
+        self.formatter.export_as_npy(
+            {"file_name": file_name}, self.user_inputs
+        )
+
+        render = np.load(file_name, mmap_mode="r")
+        np.testing.assert_allclose(render, self.render, rtol=1e-6)
+        with open(file_name.replace(".npy", ".json")) as file:
+            metadata = json.load(file)
+        self.assertEqual(metadata["shape"], [4, 5, 3])
+        self.assertEqual(metadata["wavelengths"], [405.0, 415.0, 425.0])
+        self.assertEqual(metadata["render"]["sample_count"], 16)
+
+    def test_npz(self):
+        file_name = os.path.join(self.directory.name, "results.npz")
+        self.formatter.export_as_npz(
+            {"file_name": file_name, "compress": True}, self.user_inputs
+        )
+
+        with np.load(file_name) as archive:
+            np.testing.assert_allclose(
+                archive["render"], self.render, rtol=1e-6
+            )
+            np.testing.assert_array_equal(archive["fwhm"], [10, 10, 10])
+        self.assertTrue(
+            os.path.isfile(file_name.replace(".npz", ".json"))
+        )
+
+
+class TestPngExport(unittest.TestCase):
+
+    def setUp(self):
+        self.render = np.stack(
+            [np.full((4, 5), 0.5), np.linspace(0, 2, 20).reshape(4, 5)],
+            axis=-1,
+        ).astype(np.float32)
+
+    def test_global_scaling(self):
+        images = output_data.scale_to_integers(self.render, np.uint8)
+        self.assertEqual(images.dtype, np.uint8)
+        self.assertEqual(images[0, 0, 1], 0)
+        self.assertEqual(images[-1, -1, 1], 255)
+        np.testing.assert_array_equal(images[:, :, 0], 64)
+
+    def test_band_scaling(self):
+        images = output_data.scale_to_integers(
+            self.render, np.uint16, "band"
+        )
+        self.assertEqual(images[-1, -1, 1], 65535)
+        np.testing.assert_array_equal(images[:, :, 0], 0)
+
+    def test_export(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        create_formatter(self.render).export_as_png(
+            {"file_name": directory.name, "bit_depth": 16}, None
+        )
+        self.assertEqual(
+            sorted(os.listdir(directory.name)), ["Band_0.png", "Band_1.png"]
+        )
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import mitsuba as mi
+
+from hysim import plan
+from hysim import sim
+
+TRIANGLE_PLY = """ply
+format ascii 1.0
+element vertex 3
+property float x
+property float y
+property float z
+element face 1
+property list uchar int vertex_indices
+end_header
+0 0 0
+1 0 0
+0 1 0
+3 0 1 2
+"""
+
+PROFILE = {
+    "variant": "scalar_spectral",
+    "max_depth": 8,
+    "overhead": 0.5,
+    "per_sample": 1e-6,
+    "per_sample_band": 1e-7,
+}
+
+
+class TestRenderTime(unittest.TestCase):
+
+    def test_single_pass(self):
+        self.assertAlmostEqual(
+            plan.predict_render_time(PROFILE, 1000, 10, 50),
+            0.5 + 1e4 * 1e-6 + 1e4 * 50 * 1e-7,
+        )
+
+    def test_band_passes(self):
+        # Every pass traces all samples again
+        single = plan.predict_render_time(PROFILE, 1000, 10, 50)
+        grouped = plan.predict_render_time(PROFILE, 1000, 10, 50, passes=5)
+        self.assertAlmostEqual(grouped - single, 4 * (0.5 + 1e4 * 1e-6))
+
+    def test_band_group_size(self):
+        self.assertEqual(sim.band_group_size(100, 64, 64), 100)
+        self.assertEqual(sim.band_group_size(100, 64, 64, group_size=8), 8)
+        # 64 x 64 float32 band in two film buffers is 32 KiB
+        self.assertEqual(
+            sim.band_group_size(100, 64, 64, memory_budget_mb=0.5), 16
+        )
+
+    def test_profile_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile", plan.PROFILE_FILE)
+            self.assertIsNone(plan.load_profile(path))
+            plan.save_profile(PROFILE, path)
+            self.assertEqual(plan.load_profile(path), PROFILE)
+
+
+class TestShapeStatistics(unittest.TestCase):
+
+    def setUp(self):
+        mi.set_variant("scalar_spectral")
+
+    def test_mesh(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "triangle.ply")
+            with open(path, "w") as file:
+                file.write(TRIANGLE_PLY)
+            statistics = plan.shape_statistics(
+                {
+                    "type": "ply",
+                    "filename": path,
+                    "to_world": mi.ScalarTransform4f.scale(2),
+                    "panel_material": {"type": "diffuse"},
+                }
+            )
+        self.assertEqual(statistics["triangles"], 1)
+        self.assertEqual(statistics["vertices"], 3)
+        self.assertEqual(list(statistics["bbox"][1]), [2, 2, 0])
+
+    def test_analytic_shape(self):
+        statistics = plan.shape_statistics({"type": "sphere"})
+        self.assertEqual(statistics["triangles"], 0)
+        self.assertEqual(statistics["memory_bytes"], 0)
+
+    def test_calibration_scene(self):
+        scene = mi.load_dict(plan.calibration_scene(4, 2))
+        self.assertEqual(len(scene.shapes()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
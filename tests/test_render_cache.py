@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hysim import render_cache
+
+
+def create_scene_dict(mesh_file):
+    return {
+        "type": "scene",
+        "sampler": {"type": "independent", "sample_count": 4},
+        "body": {"type": "ply", "filename": mesh_file, "to_world": None},
+    }
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.mesh_file = os.path.join(self.directory.name, "body.ply")
+        with open(self.mesh_file, "w") as file:
+            file.write("mesh")
+        self.cache = render_cache.RenderCache(
+            os.path.join(self.directory.name, "renders"), max_size_mb=1
+        )
+
+    def test_key_is_stable(self):
+        scene_dict = create_scene_dict(self.mesh_file)
+        self.assertEqual(
+            self.cache.key(scene_dict, "scalar_spectral"),
+            self.cache.key(dict(scene_dict), "scalar_spectral"),
+        )
+
+    def test_key_changes(self):
+        scene_dict = create_scene_dict(self.mesh_file)
+        key = self.cache.key(scene_dict, "scalar_spectral")
+        self.assertNotEqual(key, self.cache.key(scene_dict, "llvm_spectral"))
+        self.assertNotEqual(
+            key, self.cache.key(scene_dict, "scalar_spectral", spp=16)
+        )
+        self.assertNotEqual(
+            key,
+            self.cache.key(
+                scene_dict, "scalar_spectral", {"body": np.eye(4)}
+            ),
+        )
+
+        with open(self.mesh_file, "w") as file:
+            file.write("edited mesh")
+        self.assertNotEqual(key, self.cache.key(scene_dict, "scalar_spectral"))
+
+    def test_store_and_load(self):
+        render = np.random.rand(4, 5, 3).astype(np.float32)
+        self.assertEqual(self.cache.load("key"), (None, None))
+        self.cache.store("key", render, {"spp": 4})
+        cached_render, metadata = self.cache.load("key")
+        np.testing.assert_array_equal(cached_render, render)
+        self.assertEqual(metadata, {"spp": 4})
+
+    def test_least_recently_used_evicted(self):
+        render = np.zeros((96, 1024), dtype=np.float32)  # 384 KiB
+        self.cache.store("first", render)
+        os.utime(self.cache._path("first"), (0, 0))
+        self.cache.store("second", render)
+        self.cache.store("third", render)
+
+        self.assertIsNone(self.cache.load("first")[0])
+        self.assertIsNotNone(self.cache.load("third")[0])
+
+    def test_disabled_in_config(self):
+        self.assertIsNone(
+            render_cache.RenderCache.from_config({"render_cache": False})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
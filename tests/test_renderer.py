@@ -0,0 +1,292 @@
+import json
+import unittest
+
+import mitsuba as mi
+import numpy as np
+
+from hysim import sim
+from hysim import tiling
+from hysim.scene import projection
+from hysim.scene import spectra
+from hysim.scene import simulator_environment as env
+
+
+def create_scene_dict():
+    return {
+        "type": "scene",
+        "integrator": {"type": "path"},
+        "body": {
+            "type": "sphere",
+            "center": [0, 0, 0],
+            "radius": 0.5,
+            "bsdf": {"type": "diffuse"},
+        },
+        "light": {"type": "constant"},
+        "sensor": {
+            "type": "perspective",
+            "fov": 40,
+            "to_world": mi.ScalarTransform4f.look_at(
+                origin=[10, 0, 0], target=[0, 0, 0], up=[0, 0, 1]
+            ),
+            "film": {"type": "hdrfilm", "width": 32, "height": 24},
+            "sampler": {"type": "independent", "sample_count": 4},
+        },
+    }
+
+
+class TestRelativeStandardError(unittest.TestCase):
+
+    def test_known_noise(self):
+        generator = np.random.default_rng(0)
+        passes = generator.normal(2.0, 0.5, size=(400, 8, 8, 1))
+        mean = passes.mean(axis=0)
+        squared_deviations = ((passes - mean) ** 2).sum(axis=0)
+
+        error = sim.relative_standard_error(mean, squared_deviations, 400)
+        self.assertAlmostEqual(error, 0.5 / 20 / 2.0, delta=1e-3)
+
+    def test_window(self):
+        mean = np.ones((4, 4, 1))
+        squared_deviations = np.zeros((4, 4, 1))
+        squared_deviations[0, 0] = 100
+        self.assertGreater(
+            sim.relative_standard_error(mean, squared_deviations, 2), 0
+        )
+        self.assertEqual(
+            sim.relative_standard_error(
+                mean, squared_deviations, 2, window=(1, 1, 3, 3)
+            ),
+            0,
+        )
+
+
+class TestRendererControl(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        mi.set_variant("scalar_rgb")
+
+    def setUp(self):
+        self.renderer = sim.RendererControl()
+        self.renderer.load_scene(create_scene_dict())
+
+    def test_footprint(self):
+        window = self.renderer.footprint(["body"])
+        offset_x, offset_y, size_x, size_y = window
+        self.assertLess(size_x, 32)
+        self.assertLess(size_y, 24)
+        self.assertAlmostEqual(offset_x + size_x / 2, 16, delta=1)
+        self.assertAlmostEqual(offset_y + size_y / 2, 12, delta=1)
+        self.assertIsNone(self.renderer.footprint(["missing"]))
+
+    def test_progressive_stops_at_sample_limit(self):
+        self.renderer.run_progressive(
+            pass_sample_count=2, tolerance=0, max_sample_count=8
+        )
+        self.assertEqual(self.renderer.render_info["passes"], 4)
+        self.assertFalse(self.renderer.render_info["converged"])
+        self.assertEqual(self.renderer.render.shape, (24, 32, 3))
+
+    def test_progressive_converges(self):
+        self.renderer.run_progressive(
+            pass_sample_count=4, tolerance=0.5, max_sample_count=1024
+        )
+        self.assertTrue(self.renderer.render_info["converged"])
+        self.assertLess(self.renderer.render_info["sample_count"], 1024)
+
+    def test_progressive_single_pass(self):
+        self.renderer.run_progressive(
+            pass_sample_count=8, tolerance=0, max_sample_count=8
+        )
+        self.assertEqual(self.renderer.render_info["passes"], 1)
+        self.assertIsNone(
+            self.renderer.render_info["relative_standard_error"]
+        )
+        # Written to the metadata and render cache as strict json
+        json.dumps(self.renderer.render_info, allow_nan=False)
+
+    def test_crop(self):
+        self.renderer.run(spp=64)
+        full_render = np.array(self.renderer.render)
+
+        window = self.renderer.footprint(["body"], margin=1)
+        offset_x, offset_y, size_x, size_y = window
+        region = np.s_[
+            offset_y: offset_y + size_y, offset_x: offset_x + size_x
+        ]
+
+        self.renderer.set_crop(window, pad=False)
+        self.renderer.run(spp=64)
+        self.assertEqual(self.renderer.render.shape, (size_y, size_x, 3))
+        self.assertEqual(
+            self.renderer.render_info["crop_window"], list(window)
+        )
+
+        self.renderer.set_crop(window)
+        self.renderer.run(spp=64)
+        render = np.array(self.renderer.render)
+        self.assertEqual(render.shape, (24, 32, 3))
+        self.assertEqual(render[0, 0].tolist(), [0, 0, 0])
+        np.testing.assert_allclose(
+            render[region].mean(), full_render[region].mean(), rtol=0.05
+        )
+
+    def test_tiled_is_deterministic(self):
+        self.renderer.run_tiled(spp=4, tile_size=16, workers=2)
+        first_render = np.array(self.renderer.render)
+        self.assertEqual(first_render.shape, (24, 32, 3))
+        self.assertEqual(len(self.renderer.render_info["tiles"]), 4)
+
+        self.renderer.run_tiled(spp=4, tile_size=16, workers=1)
+        np.testing.assert_array_equal(self.renderer.render, first_render)
+        self.renderer.close()
+
+
+class TestUpdateTransforms(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        mi.set_variant("scalar_spectral")
+
+    @classmethod
+    def tearDownClass(cls):
+        mi.set_variant("scalar_rgb")
+
+    def create_scene_dict(self, sun_direction, position):
+        sun = env.Sun(
+            spectra.IrradianceSpectrum(
+                np.array([400.0, 900.0]), np.array([1.0, 1.0])
+            )
+        )
+        sun.position_sun_in_simple_3d(sun_direction)
+        sun.build_dict()
+
+        scene_dict = create_scene_dict()
+        del scene_dict["light"]
+        scene_dict["body"] = {
+            "type": "cube",
+            "to_world": mi.ScalarTransform4f.translate(position),
+            "bsdf": {"type": "diffuse"},
+        }
+        scene_dict.update(sun.sun_dict)
+        transforms = {
+            "body": scene_dict["body"]["to_world"],
+            "sun_emitter": sun.to_world(),
+        }
+        return scene_dict, transforms
+
+    def render(self, renderer):
+        renderer.run(spp=4)
+        return np.array(renderer.render)
+
+    def test_moved_frame_matches_fresh_load(self):
+        first, _ = self.create_scene_dict([-1, 0, 0], [0, 0, 0])
+        moved, transforms = self.create_scene_dict([0, -1, -1], [0, 0.5, 0])
+
+        renderer = sim.RendererControl()
+        renderer.load_scene(first)
+        first_render = self.render(renderer)
+        renderer.update_transforms(transforms)
+        moved_render = self.render(renderer)
+
+        fresh = sim.RendererControl()
+        fresh.load_scene(moved)
+        fresh_render = self.render(fresh)
+
+        self.assertGreater(np.abs(fresh_render - first_render).max(), 0.1)
+        np.testing.assert_allclose(moved_render, fresh_render, atol=1e-4)
+
+    def test_unknown_object(self):
+        renderer = sim.RendererControl()
+        renderer.load_scene(self.create_scene_dict([-1, 0, 0], [0, 0, 0])[0])
+        with self.assertRaises(KeyError):
+            renderer.update_transforms(
+                {"missing": mi.ScalarTransform4f.translate([1, 0, 0])}
+            )
+
+
+class TestBandGroups(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        mi.set_variant("scalar_spectral")
+
+    @classmethod
+    def tearDownClass(cls):
+        mi.set_variant("scalar_rgb")
+
+    def setUp(self):
+        scene_dict = create_scene_dict()
+        del scene_dict["body"]
+        scene_dict["sensor"]["film"] = {
+            "type": "specfilm",
+            "width": 32,
+            "height": 24,
+        }
+        for band in range(5):
+            scene_dict["sensor"]["film"][f"band_{band}"] = {
+                "type": "irregular",
+                "wavelengths": "500, 600",
+                "values": f"{band + 1}, {band + 1}",
+            }
+        self.renderer = sim.RendererControl()
+        self.renderer.load_scene(scene_dict)
+
+    def test_grouped_render_matches(self):
+        self.renderer.run(spp=4)
+        full_render = np.array(self.renderer.render)
+
+        self.renderer.set_band_groups(group_size=2)
+        self.renderer.run(spp=4)
+        self.assertEqual(self.renderer.render_info["band_groups"], 3)
+        np.testing.assert_allclose(
+            self.renderer.render, full_render, rtol=1e-4
+        )
+
+    def test_memory_budget(self):
+        # Two bands of a 32x24 float32 film in each of the film buffers
+        band_size = 32 * 24 * 4 * sim.FILM_BUFFERS
+        self.renderer.set_band_groups(memory_budget_mb=2 * band_size / 2**20)
+        self.assertEqual(
+            self.renderer._band_groups(),
+            [["band_0", "band_1"], ["band_2", "band_3"], ["band_4"]],
+        )
+
+
+class TestTiling(unittest.TestCase):
+
+    def test_split_window(self):
+        tiles = tiling.split_window((2, 3, 20, 10), 8)
+        self.assertEqual(len(tiles), 6)
+        self.assertEqual(tiles[0], (2, 3, 8, 8))
+        self.assertEqual(tiles[-1], (18, 11, 4, 2))
+        self.assertEqual(sum(tile[2] * tile[3] for tile in tiles), 200)
+
+    def test_encode_scene_dict(self):
+        scene_dict = create_scene_dict()
+        encoded = tiling.encode_scene_dict(scene_dict)
+        decoded = tiling.decode_scene_dict(encoded)
+        np.testing.assert_array_equal(
+            np.array(decoded["sensor"]["to_world"].matrix),
+            np.array(scene_dict["sensor"]["to_world"].matrix),
+        )
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_behind_camera_is_whole_film(self):
+        points = np.array([[0, 0, -1.0], [0, 0, 5.0]])
+        window = projection.footprint_window(
+            points, np.eye(4), 40, "x", 32, 24
+        )
+        self.assertEqual(window, (0, 0, 32, 24))
+
+    def test_outside_film(self):
+        points = np.array([[100.0, 0, 5.0], [101.0, 0, 5.0]])
+        self.assertIsNone(
+            projection.footprint_window(points, np.eye(4), 40, "x", 32, 24)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,50 @@
-
 import unittest
-from hysim.scene import sensors as sens
 
-class TestSpectralBands(unittest.TestCase):
+import numpy as np
+
+from hysim.scene import spectra
+from hysim.scene import chaser_satellite as chas
+
+
+class TestSpectralSensor(unittest.TestCase):
+
+    def test_hyperspectral_film(self):
+        response = spectra.film_response(
+            "hyperspectral", np.linspace(400, 900, 51), np.ones(51)
+        )
+        film = chas.SpectralFilm(response, 32, 24)
+        film.build_dict()
+        self.assertEqual(film.film_dict["type"], "specfilm")
+        self.assertEqual(len(film.film_dict) - 4, 50)
+        self.assertIn("400.0_410.0", film.film_dict)
+
+    def test_multispectral_film(self):
+        response = spectra.film_response(
+            "multispectral", np.linspace(400, 900, 51), np.ones((51, 3))
+        )
+        film = chas.SpectralFilm(response, 32, 24)
+        film.build_dict()
+        self.assertEqual(
+            [key for key in film.film_dict if key.startswith("Band_")],
+            ["Band_0", "Band_1", "Band_2"],
+        )
+
+    def test_sensor_dict(self):
+        response = spectra.film_response(
+            "hyperspectral", np.linspace(400, 900, 11), np.ones(11)
+        )
+        sensor = chas.SpectralSensor(
+            chas.SpectralFilm(response, 32, 24),
+            chas.PerspectiveCamera(field_of_view=20),
+            {"sampler": {"type": "independent", "sample_count": 4}},
+        )
+        sensor.build_dict()
+        sensor_dict = sensor.sensor_dict["sensor"]
+        self.assertEqual(sensor_dict["type"], "perspective")
+        self.assertEqual(sensor_dict["fov"], 20)
+        self.assertEqual(sensor_dict["film"]["width"], 32)
+        self.assertEqual(sensor_dict["sampler"]["sample_count"], 4)
 
-    def test(self):
-        return sens.SpectralBands(51,"")
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from hysim.data import cache
+from hysim.data import spd_reader
+
+
+class TestSPDReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        environment = mock.patch.dict(
+            os.environ,
+            {cache.CACHE_DIRECTORY_VARIABLE: self.directory.name + "/cache"},
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        self.file_path = os.path.join(self.directory.name, "film.spd")
+        self.write_file("400\t0.1\t0.5\n410\t0.2\t0.6\n420\t0.3\t0.7\n")
+
+    def write_file(self, contents):
+        with open(self.file_path, "w", encoding="utf_8") as file:
+            file.write(contents)
+
+    def test_multiple_columns(self):
+        data = spd_reader.SPDReader(self.file_path)
+        np.testing.assert_array_equal(data.wavelengths, [400, 410, 420])
+        np.testing.assert_array_equal(
+            data.values, [[0.1, 0.5], [0.2, 0.6], [0.3, 0.7]]
+        )
+
+    def test_single_column(self):
+        self.write_file("400 0.1\n410 0.2\n")
+        data = spd_reader.SPDReader(self.file_path, use_cache=False)
+        np.testing.assert_array_equal(data.values, [0.1, 0.2])
+
+    def test_cached_load(self):
+        spd_reader.SPDReader(self.file_path)
+        data = spd_reader.SPDReader(self.file_path)
+        self.assertIsInstance(data._file_data, np.memmap)
+        np.testing.assert_array_equal(data.values[:, 1], [0.5, 0.6, 0.7])
+
+    def test_modified_file(self):
+        spd_reader.SPDReader(self.file_path)
+        self.write_file("400 1.0\n410 2.0\n420 3.0\n430 4.0\n")
+        data = spd_reader.SPDReader(self.file_path)
+        np.testing.assert_array_equal(data.values, [1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
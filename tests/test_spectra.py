@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from hysim.scene import spectra
+
+
+class TestSpectrum(unittest.TestCase):
+
+    def setUp(self):
+        self.spectrum = spectra.IrradianceSpectrum(
+            np.array([300.0, 400.0, 500.0, 600.0, 700.0]),
+            np.array([1.0, 2.0, 4.0, 3.0, 1.0]),
+        )
+
+    def test_crop_spectrum(self):
+        cropped = self.spectrum.crop_spectrum(350, 650)
+        self.assertIsInstance(cropped, spectra.IrradianceSpectrum)
+        np.testing.assert_array_equal(
+            cropped.wavelengths, [350, 400, 500, 600, 650]
+        )
+        np.testing.assert_array_equal(cropped.irradiance, [1.5, 2, 4, 3, 2])
+
+    def test_crop_outside_range(self):
+        with self.assertRaises(ValueError):
+            self.spectrum.crop_spectrum(800, 900)
+
+    def test_resize_conserves_integral(self):
+        resized = self.spectrum.resize_spectrum(9)
+        np.testing.assert_array_equal(
+            resized.wavelengths, np.linspace(300, 700, 9)
+        )
+        bin_widths = np.full(9, 50.0)
+        bin_widths[[0, -1]] = 25.0
+        self.assertAlmostEqual(
+            np.sum(resized.irradiance * bin_widths),
+            np.trapz(self.spectrum.irradiance, self.spectrum.wavelengths),
+        )
+
+    def test_multiple_bands(self):
+        film = spectra.MultispectralFilmResponse(
+            self.spectrum.wavelengths,
+            np.stack([self.spectrum.irradiance] * 2, axis=1) * [1, 2],
+        )
+        cropped = film.crop_spectrum(350, 650)
+        np.testing.assert_array_equal(
+            cropped.sensitivities[:, 1], 2 * cropped.sensitivities[:, 0]
+        )
+        self.assertEqual(film.resize_spectrum(3).sensitivities.shape, (3, 2))
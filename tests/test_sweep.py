@@ -0,0 +1,256 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import yaml
+
+from hysim import input_data
+from hysim import sweep
+from hysim.data import data_handling as dh
+
+# ISS orbit with the chaser trailing the target by about 20 m
+TARGET_ELEMENTS = [6796, 0.000553, 0.9013, 2.1511, 3.0664, 4.8458]
+CHASER_ELEMENTS = [6796, 0.000553, 0.9013, 2.1511, 3.0664, 4.845797]
+
+CUBE_PLY = """ply
+format ascii 1.0
+element vertex 8
+property float x
+property float y
+property float z
+element face 12
+property list uchar int vertex_indices
+end_header
+-1 -1 -1
+1 -1 -1
+1 1 -1
+-1 1 -1
+-1 -1 1
+1 -1 1
+1 1 1
+-1 1 1
+3 0 2 1
+3 0 3 2
+3 4 5 6
+3 4 6 7
+3 0 1 5
+3 0 5 4
+3 2 3 7
+3 2 7 6
+3 1 2 6
+3 1 6 5
+3 0 4 7
+3 0 7 3
+"""
+
+
+def write_yaml(path, config):
+    with open(path, "w") as file:
+        file.write("---\n")
+        yaml.safe_dump(config, file)
+
+
+def create_case(case_directory):
+    for directory in ("sensor", "target"):
+        os.makedirs(os.path.join(case_directory, directory))
+
+    write_yaml(
+        os.path.join(case_directory, "case_settings.yml"),
+        {
+            "file_type": "case_config",
+            "mitsuba_variant": "scalar_spectral",
+            "sampler": {"type": "independent", "sample_count": 4},
+            "integrator": {"type": "path", "max_depth": 4},
+            "earth": {"model": "sphere"},
+            "render_cache": False,
+            "telemetry": False,
+            "output": [{"format": "npy", "file_name": "results.npy"}],
+        },
+    )
+    write_yaml(
+        os.path.join(case_directory, "mission.yml"),
+        {
+            "file_type": "mission_config",
+            "datetime": "12/22/2022 14:15:53 utc",
+            "target": {
+                "position_frame": "kep",
+                "position": TARGET_ELEMENTS,
+                "attitude": [0.3, 0.2, 0.1],
+            },
+            "chaser": {
+                "position_frame": "kep",
+                "position": CHASER_ELEMENTS,
+                "attitude": "lookat",
+            },
+        },
+    )
+
+    wavelengths = np.linspace(400, 900, 6)
+    np.savetxt(
+        os.path.join(case_directory, "sensor", "film.spd"),
+        np.column_stack([wavelengths, np.ones_like(wavelengths)]),
+        delimiter="\t",
+    )
+    write_yaml(
+        os.path.join(case_directory, "sensor", "sensor.yml"),
+        {
+            "file_type": "sensor_config",
+            "camera": {"field_of_view": 20},
+            "film": {"width": 32, "height": 24},
+            "imaging_mode": "hyperspectral",
+            "spectrum_file": "film.spd",
+        },
+    )
+
+    with open(os.path.join(case_directory, "target", "cube.ply"), "w") as file:
+        file.write(CUBE_PLY)
+    write_yaml(
+        os.path.join(case_directory, "target", "parts.yml"),
+        {
+            "file_type": "parts_config",
+            "components": {
+                "body": {"file": "cube.ply", "user_material": "paint"}
+            },
+        },
+    )
+    write_yaml(
+        os.path.join(case_directory, "target", "materials.yml"),
+        {
+            "file_type": "material_config",
+            "materials": {
+                "paint": {
+                    "type": "diffuse",
+                    "reflectance": {"type": "spectrum", "value": 0.5},
+                }
+            },
+        },
+    )
+
+
+def kernels_available():
+    return all(os.path.isfile(path) for path in dh.get_kernel_paths())
+
+
+def create_base_inputs():
+    configs = input_data.Configs()
+    configs.case_config = {
+        "mitsuba_variant": "scalar_spectral",
+        "sampler": {"type": "independent", "sample_count": 4},
+        "output": [{"format": "exr", "file_name": "results.exr"}],
+    }
+    configs.mission_config = {"chaser": {"attitude": "lookat"}}
+    configs.sensor_config = {"film": {"width": 64, "height": 48}}
+    return configs
+
+
+class TestExpandSweep(unittest.TestCase):
+
+    def test_product(self):
+        runs = sweep.expand_sweep(
+            {"parameters": {"a.b": [1, 2], "c.d": [3, 4, 5]}}
+        )
+        self.assertEqual(len(runs), 6)
+        self.assertEqual(runs[0], {"a.b": 1, "c.d": 3})
+
+    def test_zip(self):
+        runs = sweep.expand_sweep(
+            {"mode": "zip", "parameters": {"a.b": [1, 2], "c.d": [3, 4]}}
+        )
+        self.assertEqual(runs, [{"a.b": 1, "c.d": 3}, {"a.b": 2, "c.d": 4}])
+
+    def test_zip_unequal_lengths(self):
+        with self.assertRaises(ValueError):
+            sweep.expand_sweep(
+                {"mode": "zip", "parameters": {"a.b": [1, 2], "c.d": [3]}}
+            )
+
+
+class TestCreateRuns(unittest.TestCase):
+
+    def test_entries_and_outputs(self):
+        configs = create_base_inputs()
+        configs.sweep_config = {
+            "parameters": {"case_config.sampler.sample_count": [1, 16]}
+        }
+        runs = sweep.create_runs(configs, "sweep")
+
+        self.assertEqual(
+            runs[1]["inputs"].get_entry("case_config.sampler.sample_count"),
+            16,
+        )
+        self.assertEqual(configs.case_config["sampler"]["sample_count"], 4)
+        self.assertTrue(
+            runs[0]["inputs"]
+            .case_config["output"][0]["file_name"]
+            .startswith("sweep")
+        )
+
+    def test_runs_sharing_scene_are_grouped(self):
+        configs = create_base_inputs()
+        configs.sweep_config = {
+            "parameters": {
+                "case_config.sampler.sample_count": [1, 4],
+                "mission_config.chaser.attitude": ["lookat", [0, 0, 0]],
+                "sensor_config.film.width": [32, 64],
+            }
+        }
+        runs = sweep.create_runs(configs, "sweep")
+
+        self.assertEqual(len(sweep.plan_tasks(runs, 1)), 2)
+        self.assertEqual(len(sweep.plan_tasks(runs, 4)), 4)
+
+
+@unittest.skipUnless(kernels_available(), "SPICE kernels not downloaded")
+class TestRunSweepTask(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.case_directory = self.directory.name.replace("\\", "/")
+        create_case(self.case_directory)
+
+    def test_orbit_positions_move_the_sun(self):
+        configs = input_data.Configs()
+        configs.load_configs(self.case_directory)
+        # Both spacecraft a quarter of an orbit further on
+        anomaly = 1.5
+        configs.sweep_config = {
+            "mode": "zip",
+            "parameters": {
+                "mission_config.target.position": [
+                    TARGET_ELEMENTS,
+                    TARGET_ELEMENTS[:5] + [TARGET_ELEMENTS[5] + anomaly],
+                ],
+                "mission_config.chaser.position": [
+                    CHASER_ELEMENTS,
+                    CHASER_ELEMENTS[:5] + [CHASER_ELEMENTS[5] + anomaly],
+                ],
+            },
+        }
+        runs = sweep.create_runs(configs, "sweep")
+        # Both runs share a scene, the second moves the loaded scene
+        self.assertEqual(len(sweep.plan_tasks(runs, 1)), 1)
+
+        def load_render(run):
+            return np.load(
+                os.path.join(
+                    self.case_directory, run["output_directory"], "results.npy"
+                )
+            )
+
+        results = sweep.run_sweep_task(self.case_directory, runs)
+        self.assertEqual(
+            [result["status"] for result in results], ["success"] * 2
+        )
+        first_render, moved_render = map(load_render, runs)
+
+        # The second run loaded on its own
+        sweep.run_sweep_task(self.case_directory, runs[1:])
+        fresh_render = load_render(runs[1])
+
+        self.assertGreater(np.abs(first_render - fresh_render).max(), 1e-3)
+        np.testing.assert_allclose(moved_render, fresh_render, atol=1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
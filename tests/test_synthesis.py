@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from hysim import synthesis
+from hysim.data import data_handling as dh
+from hysim.data import sensor_library
+from hysim.scene import spectra
+
+
+def mitsuba_channel_order(reference):
+    # Mitsuba orders the channels of a spectral film by band name
+    return np.argsort(list(reference.build_dict()))
+
+
+class TestSynthesizedSensor(unittest.TestCase):
+
+    def setUp(self):
+        response = spectra.MultispectralFilmResponse(
+            np.array([980.0, 1000.0, 1020.0]),
+            np.array([[1.0, 0.0], [1.0, 1.0], [0.0, 1.0]]),
+        )
+        self.sensor = synthesis.SynthesizedSensor(
+            "test", "multispectral", response
+        )
+        self.reference = synthesis.reference_response([self.sensor], 5)
+        self.sensor.set_reference(self.reference)
+
+    def test_reference_response(self):
+        np.testing.assert_array_equal(
+            self.reference.wavelengths, np.arange(980, 1021, 5)
+        )
+
+    def test_synthesize(self):
+        # Radiance of 1 in each reference band (in wavelength order)
+        radiance = np.arange(1.0, 9.0)
+        render = np.tile(
+            radiance[mitsuba_channel_order(self.reference)], (2, 3, 1)
+        )
+
+        image = self.sensor.synthesize(render)
+        self.assertEqual(image.shape, (2, 3, 2))
+        # Band 0 is 1 below 1000nm and falls to 0 at 1020nm
+        expected = radiance @ self.sensor.response.band_response(
+            self.reference.wavelengths
+        )
+        np.testing.assert_allclose(image[1, 2], expected, rtol=1e-6)
+        self.assertAlmostEqual(
+            expected[0],
+            np.sum(radiance[:4])
+            + np.dot([0.875, 0.625, 0.375, 0.125], radiance[4:]),
+        )
+
+
+class TestSensorLibrary(unittest.TestCase):
+
+    def test_list_defined_sensors(self):
+        self.assertIn("vnir", dh.list_defined_sensors())
+
+    def test_response(self):
+        response = sensor_library.get_sensor_library().response("vnir")
+        self.assertIsInstance(response, spectra.HyperspectralFilmResponse)
@@ -0,0 +1,201 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import yaml
+
+from hysim import sim
+from hysim import telemetry
+from test_sweep import create_case
+
+
+class TestStageRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.recorder = telemetry.StageRecorder()
+        self.addCleanup(self.recorder.stop)
+
+    def test_accumulates_calls(self):
+        self.recorder.reset()
+        for _ in range(3):
+            with self.recorder.stage("render"):
+                pass
+        with self.recorder.stage("export"):
+            pass
+
+        metrics = self.recorder.metrics({"case": "a"})
+        self.assertEqual(list(metrics["stages"]), ["render", "export"])
+        self.assertEqual(metrics["stages"]["render"]["calls"], 3)
+        self.assertEqual(metrics["labels"], {"case": "a"})
+        self.assertGreaterEqual(metrics["wall_time"], 0)
+
+    def test_failed_stage_recorded(self):
+        self.recorder.reset()
+        with self.assertRaises(RuntimeError):
+            with self.recorder.stage("render"):
+                raise RuntimeError("failed")
+        self.assertEqual(self.recorder.stages["render"]["calls"], 1)
+
+    def test_traced_memory(self):
+        self.recorder.reset(trace_memory=True)
+        with self.recorder.stage("outer"):
+            with self.recorder.stage("inner"):
+                array = np.ones(1_000_000)
+                del array
+        stages = self.recorder.stages
+        self.assertGreater(stages["inner"]["peak_traced_bytes"], 8_000_000)
+        self.assertGreaterEqual(
+            stages["outer"]["peak_traced_bytes"],
+            stages["inner"]["peak_traced_bytes"],
+        )
+
+    def test_start_tracing_keeps_stages(self):
+        self.recorder.reset()
+        with self.recorder.stage("load_configs"):
+            pass
+        self.recorder.start_tracing()
+        with self.recorder.stage("render"):
+            array = np.ones(1_000_000)
+            del array
+        stages = self.recorder.stages
+        self.assertIsNone(stages["load_configs"]["peak_traced_bytes"])
+        self.assertGreater(stages["render"]["peak_traced_bytes"], 8_000_000)
+
+    @unittest.skipUnless(
+        telemetry.reset_peak_rss(), "peak RSS cannot be reset"
+    )
+    def test_peak_rss_per_stage(self):
+        self.recorder.reset()
+        with self.recorder.stage("outer"):
+            with self.recorder.stage("inner"):
+                # 160 MB written so the pages are resident
+                array = np.ones(20_000_000)
+                del array
+            with self.recorder.stage("after"):
+                pass
+        stages = self.recorder.stages
+        self.assertGreater(
+            stages["inner"]["peak_rss_bytes"],
+            stages["after"]["peak_rss_bytes"] + 100_000_000,
+        )
+        self.assertGreaterEqual(
+            stages["outer"]["peak_rss_bytes"],
+            stages["inner"]["peak_rss_bytes"],
+        )
+
+        # A later run (e.g. the next case of a batch worker) does not report
+        # the peak of the earlier run
+        self.recorder.reset()
+        with self.recorder.stage("inner"):
+            pass
+        metrics = self.recorder.metrics()
+        self.assertLess(
+            metrics["peak_rss_bytes"],
+            stages["inner"]["peak_rss_bytes"] - 100_000_000,
+        )
+
+    def test_settings(self):
+        self.assertFalse(
+            telemetry.telemetry_settings({"telemetry": False})["enabled"]
+        )
+        settings = telemetry.telemetry_settings(
+            {"telemetry": {"prometheus": True}}
+        )
+        self.assertTrue(settings["enabled"])
+        self.assertTrue(settings["prometheus"])
+
+
+class TestRunSim(unittest.TestCase):
+
+    def test_tracemalloc_keeps_load_configs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            create_case(directory)
+            path = os.path.join(directory, "case_settings.yml")
+            with open(path) as file:
+                case_config = yaml.safe_load(file)
+            case_config["telemetry"] = {"tracemalloc": True}
+            with open(path, "w") as file:
+                yaml.safe_dump(case_config, file)
+
+            # Metrics are written when the run fails after loading configs
+            with mock.patch.object(
+                sim.frames,
+                "MissionInputProcessor",
+                side_effect=RuntimeError("orbit"),
+            ):
+                with self.assertRaises(RuntimeError):
+                    sim.run_sim(directory)
+
+            with open(os.path.join(directory, telemetry.METRICS_FILE)) as file:
+                metrics = json.load(file)
+        self.assertTrue(metrics["tracemalloc"])
+        self.assertEqual(
+            list(metrics["stages"]), ["load_configs", "orbit_geometry"]
+        )
+
+
+class TestMetricsOutput(unittest.TestCase):
+
+    def setUp(self):
+        stage = {
+            "calls": 2,
+            "wall_time": 1.5,
+            "cpu_time": 1.0,
+            "peak_rss_bytes": 100,
+            "rss_increase_bytes": 10,
+            "peak_traced_bytes": None,
+        }
+        self.runs = [
+            {
+                "labels": {"case": case},
+                "start_time": 0.0,
+                "wall_time": 2.0,
+                "cpu_time": 1.0,
+                "peak_rss_bytes": peak,
+                "tracemalloc": False,
+                "stages": {"render": dict(stage, peak_rss_bytes=peak)},
+            }
+            for case, peak in [("a", 100), ('b"\\', 300)]
+        ]
+
+    def test_aggregate(self):
+        metrics = telemetry.aggregate_metrics(self.runs)
+        self.assertEqual(metrics["runs"], 2)
+        self.assertEqual(metrics["wall_time"], 4.0)
+        self.assertEqual(metrics["peak_rss_bytes"], 300)
+        render = metrics["stages"]["render"]
+        self.assertEqual(render["calls"], 4)
+        self.assertEqual(render["wall_time"], 3.0)
+        self.assertEqual(render["peak_rss_bytes"], 300)
+        self.assertIsNone(render["peak_traced_bytes"])
+
+    def test_prometheus_text(self):
+        lines = telemetry.prometheus_text(self.runs).splitlines()
+        self.assertIn("# TYPE hysim_stage_wall_seconds gauge", lines)
+        self.assertIn(
+            'hysim_stage_wall_seconds{case="a",stage="render"} 1.5', lines
+        )
+        self.assertIn(
+            'hysim_stage_calls{case="b\\"\\\\",stage="render"} 2', lines
+        )
+        self.assertFalse(
+            [line for line in lines if line.startswith("hysim_stage_peak_tr")]
+        )
+
+    def test_write_metrics(self):
+        with tempfile.TemporaryDirectory() as directory:
+            telemetry.write_metrics(self.runs[0], directory, prometheus=True)
+            with open(os.path.join(directory, telemetry.METRICS_FILE)) as file:
+                self.assertEqual(json.load(file), self.runs[0])
+            self.assertTrue(
+                os.path.isfile(
+                    os.path.join(directory, telemetry.PROMETHEUS_FILE)
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()